@@ -5,6 +5,7 @@ import os
 import logging
 import datetime
 from typing import List, Dict, Any, Optional
+import event_engine
 from shared.logging_contracts import emit_log
 
 logger = logging.getLogger("AnalysisSnapshotEngine")
@@ -55,7 +56,7 @@ class AnalysisSnapshotEngine:
         # 1. Grouping & Counting
         event_types = {}
         composite_events = []
-        involved_entities = set() # Placeholder for entity tracking
+        involved_entities = set()
         
         for evt in sorted_events:
             etype = evt.get("event_type", "unknown")
@@ -64,10 +65,8 @@ class AnalysisSnapshotEngine:
             if evt.get("event_category") == "composite":
                 composite_events.append(evt)
             
-            # Extract entities if available (future proofing)
-            # if "person_id" in evt.get("signals", {})... 
-            # For now, we assume single subject context implied
-            involved_entities.add("person_0") 
+            # Events from the pipeline carry the track id; older ones imply a single subject
+            involved_entities.add(evt.get("entity_id", "person_0"))
 
         # 2. Pattern Detection & Reasoning
         world_state = "normal"
@@ -191,7 +190,7 @@ class AnalysisSnapshotEngine:
             "world_state": world_state,
             "confidence": snapshot_confidence,
             "risk_level": risk_level,
-            "involved_entities": list(involved_entities),
+            "involved_entities": sorted(involved_entities),
             "supporting_events": supporting_events_summary,
             "detected_patterns": detected_patterns,
             "reasoning_trace": "; ".join(reasoning_trace),
@@ -278,8 +277,19 @@ class AnalysisSnapshotEngine:
 
     def persist_snapshot(self, snapshot: Dict[str, Any]) -> Optional[str]:
         """
-        Saves the snapshot to analysis_snapshots/YYYY-MM-DD/
+        Saves the snapshot to analysis_snapshots/YYYY-MM-DD/ (or the snapshots table with
+        EVENT_STORE=sqlite, in event_engine's database). Returns where it was written.
         """
+        if event_engine.EVENT_STORE == "sqlite":
+            try:
+                from storage.sqlite_store import shared_store
+                db_path = shared_store(event_engine.event_db_path()).insert_snapshot(snapshot)
+                logger.info(f"Snapshot persisted: {db_path} ({snapshot['snapshot_id']})")
+                return db_path
+            except Exception as e:
+                logger.error(f"Failed to persist snapshot: {e}")
+                return None
+
         try:
             ts = snapshot["timestamp"]
             date_str = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
@@ -13,6 +13,8 @@ class FrameBuffer:
     def __init__(self, max_size: int = 1):
         self._queue = queue.Queue(maxsize=max_size)
         self._lock = threading.Lock()
+        # Number of frames discarded by the drop-oldest policy
+        self.dropped = 0
 
     def put(self, frame: Any) -> None:
         """
@@ -27,6 +29,7 @@ class FrameBuffer:
                     # Double check if full inside lock and remove one
                     if self._queue.full():
                         _ = self._queue.get_nowait()
+                        self.dropped += 1
                 except queue.Empty:
                     pass # Someone else emptied it, proceed to put
                 
@@ -35,6 +38,7 @@ class FrameBuffer:
                     self._queue.put_nowait(frame)
                 except queue.Full:
                     # Should be rare if max_size >= 1
+                    self.dropped += 1
                     logger.warning("FrameBuffer full even after dropping")
 
     def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
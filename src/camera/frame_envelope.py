@@ -0,0 +1,27 @@
+import numpy as np
+from typing import Tuple
+
+
+class FrameEnvelope:
+    """
+    Lightweight container carrying a frame through the pipeline together with
+    the metadata stamped at capture time.
+
+    capture_time: wall-clock time (time.time()) right after the frame was read.
+    source_id: camera / source identifier.
+    seq: per-source monotonic sequence number; gaps mean the frame was dropped.
+    """
+    __slots__ = ("image", "capture_time", "source_id", "seq")
+
+    def __init__(self, image: np.ndarray, capture_time: float, source_id: str, seq: int):
+        self.image = image
+        self.capture_time = capture_time
+        self.source_id = source_id
+        self.seq = seq
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    def __repr__(self) -> str:
+        return f"FrameEnvelope(source_id={self.source_id!r}, seq={self.seq}, capture_time={self.capture_time:.3f})"
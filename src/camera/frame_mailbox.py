@@ -0,0 +1,97 @@
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+from .frame_buffer import FrameBuffer
+
+
+class LatestFrameMailbox:
+    """
+    Single-slot 'latest value' frame holder for the --buffer-size 1 case.
+
+    put() never blocks and never raises: it replaces the held frame under one
+    condition-variable lock. Consumers either take the frame with get() (same
+    contract as FrameBuffer.get) or wait for a version newer than one they
+    already saw with wait_newer().
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame: Any = None
+        self._fresh = False  # True until the held frame has been handed out
+        self._version = 0    # Number of frames put so far
+
+        # Counters (readable from other threads)
+        self.produced = 0
+        self.consumed = 0
+        self.overwritten = 0
+
+    def put(self, frame: Any) -> None:
+        """
+        Publish a frame, replacing (and counting) any frame nobody consumed.
+        """
+        with self._cond:
+            if self._fresh:
+                self.overwritten += 1
+            self._frame = frame
+            self._fresh = True
+            self._version += 1
+            self.produced += 1
+            self._cond.notify_all()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Take the latest unconsumed frame. Raises queue.Empty if none arrives in time.
+        """
+        with self._cond:
+            if not self._fresh:
+                if not block or not self._cond.wait_for(lambda: self._fresh, timeout=timeout):
+                    raise queue.Empty
+            return self._take()
+
+    def wait_newer(self, seq: int, timeout: Optional[float] = None) -> Tuple[int, Any]:
+        """
+        Wait for a frame whose version is greater than `seq`.
+        Returns (version, frame). Pass the returned version on the next call.
+        Raises queue.Empty on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._version > seq, timeout=timeout):
+                raise queue.Empty
+            return self._version, self._take()
+
+    def _take(self) -> Any:
+        if self._fresh:
+            self._fresh = False
+            self.consumed += 1
+        return self._frame
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def dropped(self) -> int:
+        """Alias of `overwritten`, for parity with FrameBuffer.dropped."""
+        return self.overwritten
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "produced": self.produced,
+                "consumed": self.consumed,
+                "overwritten": self.overwritten
+            }
+
+    def empty(self) -> bool:
+        return not self._fresh
+
+    def qsize(self) -> int:
+        return 1 if self._fresh else 0
+
+
+def create_frame_buffer(max_size: int = 1) -> Union[LatestFrameMailbox, FrameBuffer]:
+    """
+    LatestFrameMailbox for the single-frame case, drop-oldest FrameBuffer otherwise.
+    """
+    if max_size == 1:
+        return LatestFrameMailbox()
+    return FrameBuffer(max_size=max_size)
@@ -0,0 +1,57 @@
+import cv2
+import logging
+from typing import Iterator, Optional
+from .frame_envelope import FrameEnvelope
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineVideoSource:
+    """
+    Reads every frame of a recorded video as fast as the consumer pulls them.
+
+    Unlike RTSPReader there is no thread and no drop-oldest buffer: iteration is
+    synchronous, so nothing is lost. Each FrameEnvelope is stamped with media time
+    (epoch + CAP_PROP_POS_MSEC) instead of wall-clock time, which makes re-analysis
+    of the same file produce the same results on every run.
+    """
+    def __init__(self, path: str, source_id: Optional[str] = None, epoch: float = 0.0):
+        """
+        :param path: Video file path.
+        :param source_id: Id stamped on envelopes (default: the path).
+        :param epoch: Added to media time; use the recording's start time to get
+            wall-clock-like timestamps, or keep 0.0 for pure media time.
+        """
+        self.path = path
+        self.source_id = source_id or path
+        self.epoch = epoch
+        self.frames_read = 0
+        self.media_seconds = 0.0
+
+    def __iter__(self) -> Iterator[FrameEnvelope]:
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            raise IOError(f"Failed to open video file: {self.path}")
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        logger.info(f"Offline source opened: {self.path} ({fps:.2f} FPS)")
+        last_ms = -1.0
+
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+                if pos_ms <= last_ms and fps > 0:
+                    # Some backends do not report a usable position; derive it from the frame index
+                    pos_ms = self.frames_read * 1000.0 / fps
+                last_ms = pos_ms
+
+                self.media_seconds = pos_ms / 1000.0
+                yield FrameEnvelope(frame, self.epoch + self.media_seconds, self.source_id, self.frames_read)
+                self.frames_read += 1
+        finally:
+            cap.release()
+            logger.info(f"Offline source finished: {self.frames_read} frames, {self.media_seconds:.1f}s of media")
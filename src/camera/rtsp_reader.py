@@ -4,6 +4,7 @@ import threading
 import logging
 from typing import Optional
 from .frame_buffer import FrameBuffer
+from .frame_envelope import FrameEnvelope
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +12,37 @@ class RTSPReader:
     """
     Reads frames from an RTSP stream in a separate thread.
     Handles connection loss and automatic reconnection.
+    Frames are delivered as FrameEnvelope (capture time, source id, sequence number).
+
+    Decimation: with target_fps and/or skip_when_busy, frames that would only be thrown
+    away by the buffer are advanced with cap.grab() and never retrieve()d, which skips
+    the BGR conversion and copy for them.
     """
-    def __init__(self, rtsp_url: str, frame_buffer: FrameBuffer, reconnect_delay: int = 5):
+    def __init__(
+        self,
+        rtsp_url: str,
+        frame_buffer: FrameBuffer,
+        reconnect_delay: int = 5,
+        source_id: Optional[str] = None,
+        target_fps: Optional[float] = None,
+        skip_when_busy: bool = False
+    ):
+        """
+        :param target_fps: Deliver at most this many frames per second (None = every frame).
+        :param skip_when_busy: Only deliver when the consumer has taken the previous frame.
+        """
         self.rtsp_url = rtsp_url
         self.frame_buffer = frame_buffer
         self.reconnect_delay = reconnect_delay
+        self.source_id = source_id or rtsp_url
+        # Monotonic across reconnects so consumers can detect drops from gaps
+        self.seq = 0
+        self.target_fps = target_fps
+        self.skip_when_busy = skip_when_busy
+        self._next_delivery = 0.0
+        # Decimation counters
+        self.frames_grabbed = 0
+        self.frames_skipped = 0
         self.running = False
         self.thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
@@ -67,7 +94,12 @@ class RTSPReader:
                     
                     logger.info("Source connected.")
 
-                ret, frame = cap.read()
+                # grab() always; retrieve() only for frames we will deliver
+                ret = cap.grab()
+                capture_time = time.time()
+                frame = None
+                if ret and self._should_deliver():
+                    ret, frame = cap.retrieve()
                 
                 if not ret:
                     if self.is_stream:
@@ -81,8 +113,14 @@ class RTSPReader:
                         self.running = False
                         break
 
+                self.frames_grabbed += 1
+                if frame is None:
+                    self.frames_skipped += 1
+                    continue
+
                 # Valid frame, put into buffer
-                self.frame_buffer.put(frame)
+                self.frame_buffer.put(FrameEnvelope(frame, capture_time, self.source_id, self.seq))
+                self.seq += 1
 
             except Exception as e:
                 logger.exception(f"Error in RTSPReader loop: {e}")
@@ -97,3 +135,22 @@ class RTSPReader:
 
         if cap:
             cap.release()
+
+    def _should_deliver(self) -> bool:
+        """
+        Decides whether the frame just grabbed is worth decoding to BGR.
+        """
+        if self.skip_when_busy and not self.frame_buffer.empty():
+            return False
+
+        if self.target_fps:
+            now = time.monotonic()
+            if now < self._next_delivery:
+                return False
+            interval = 1.0 / self.target_fps
+            self._next_delivery += interval
+            if self._next_delivery <= now:
+                # Fell behind (or first frame): restart the schedule from now
+                self._next_delivery = now + interval
+
+        return True
@@ -0,0 +1,293 @@
+import os
+import time
+import queue
+import logging
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Tuple, Union
+from .frame_envelope import FrameEnvelope
+
+logger = logging.getLogger(__name__)
+
+# Slot states
+SLOT_EMPTY = 0
+SLOT_READY = 1
+SLOT_READING = 2
+SLOT_WRITING = 3
+
+# Header layout (int64): global counters, then (seq, state, frame_seq, reader pid) per
+# slot, followed by one float64 capture time per slot
+_HDR_NEXT_SEQ = 0
+_HDR_PRODUCED = 1
+_HDR_CONSUMED = 2
+_HDR_DROPPED = 3
+_HDR_FIELDS = 4
+_SLOT_FIELDS = 4
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # Python 3.13+: only the creating process should track (and unlink) the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # No signal-0 probe elsewhere: never reclaim
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedFrame:
+    """
+    A frame slot checked out of a SharedFrameBuffer.
+    `frame` is a view into shared memory (no copy); call release() (or use as a
+    context manager) as soon as the consumer is done with the pixels.
+    `seq` and `capture_time` are the source's FrameEnvelope metadata.
+    """
+    def __init__(self, buffer: "SharedFrameBuffer", slot: int):
+        self._buffer = buffer
+        self.slot = slot
+        self.seq = int(buffer._slot_frame_seq[slot])
+        self.capture_time = float(buffer._capture_times[slot])
+        self.source_id = buffer.source_id
+        self.frame = buffer._frames[slot]
+
+    def release(self) -> None:
+        if self._buffer is not None:
+            self._buffer._release(self.slot)
+            self._buffer = None
+            self.frame = None
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class SharedFrameBuffer:
+    """
+    A FrameBuffer variant backed by multiprocessing.shared_memory so that a reader in
+    one process can feed pose workers in other processes without pickling pixels.
+
+    Frames live in a fixed ring of preallocated slots of a fixed shape. Like FrameBuffer,
+    it implements a 'drop oldest' strategy: when every slot holds an unconsumed frame,
+    the oldest one is overwritten. Slots being read are never overwritten, so the ring
+    needs at least one more slot than concurrent consumers. A slot still checked out by
+    a consumer process that has exited (e.g. crashed before release()) is reclaimed by
+    put() once no empty slot is left (POSIX only; the dead process must have been
+    reaped, as Process.join() does).
+
+    Instances can be passed as multiprocessing.Process arguments; the child re-attaches
+    to the same shared memory block. A buffer carries frames of a single source.
+    """
+    def __init__(
+        self,
+        frame_shape: Tuple[int, ...],
+        max_size: int = 2,
+        dtype=np.uint8,
+        ctx: Optional[multiprocessing.context.BaseContext] = None,
+        source_id: str = "shared"
+    ):
+        """
+        :param frame_shape: Shape of every frame, e.g. (1080, 1920, 3).
+        :param max_size: Number of frame slots in the ring.
+        :param dtype: Pixel dtype.
+        :param ctx: multiprocessing context used to create the shared condition variable.
+        :param source_id: Source id reported on the envelopes returned by get().
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+
+        self.frame_shape = tuple(frame_shape)
+        self.max_size = max_size
+        self.dtype = np.dtype(dtype)
+        self.source_id = source_id
+        self._owner = True
+
+        ctx = ctx or multiprocessing.get_context()
+        self._cond = ctx.Condition(ctx.Lock())
+
+        header_bytes = (_HDR_FIELDS + (_SLOT_FIELDS + 1) * max_size) * 8
+        frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes * max_size)
+        self._map_views()
+        self._header[:] = 0
+        self._capture_times[:] = 0.0
+
+    def _map_views(self) -> None:
+        header_len = _HDR_FIELDS + _SLOT_FIELDS * self.max_size
+        self._header = np.ndarray((header_len,), dtype=np.int64, buffer=self._shm.buf)
+        self._slot_seq = self._header[_HDR_FIELDS::_SLOT_FIELDS]
+        self._slot_state = self._header[_HDR_FIELDS + 1::_SLOT_FIELDS]
+        self._slot_frame_seq = self._header[_HDR_FIELDS + 2::_SLOT_FIELDS]
+        self._slot_reader = self._header[_HDR_FIELDS + 3::_SLOT_FIELDS]
+        self._capture_times = np.ndarray(
+            (self.max_size,), dtype=np.float64, buffer=self._shm.buf, offset=header_len * 8
+        )
+        self._frames = np.ndarray(
+            (self.max_size,) + self.frame_shape,
+            dtype=self.dtype,
+            buffer=self._shm.buf,
+            offset=(header_len + self.max_size) * 8
+        )
+
+    # --- Pickling (for multiprocessing.Process args) ---
+
+    def __getstate__(self):
+        return {
+            "name": self._shm.name,
+            "frame_shape": self.frame_shape,
+            "max_size": self.max_size,
+            "dtype": self.dtype.str,
+            "source_id": self.source_id,
+            "cond": self._cond
+        }
+
+    def __setstate__(self, state):
+        self.frame_shape = state["frame_shape"]
+        self.max_size = state["max_size"]
+        self.dtype = np.dtype(state["dtype"])
+        self.source_id = state["source_id"]
+        self._cond = state["cond"]
+        self._owner = False
+        self._shm = _attach(state["name"])
+        self._map_views()
+
+    # --- Producer ---
+
+    def put(self, frame: Union[FrameEnvelope, np.ndarray]) -> None:
+        """
+        Copy a frame into a free slot. If full, drop the oldest unconsumed frame.
+        Bare arrays are stamped with the put time and the ring's own sequence number.
+        """
+        if isinstance(frame, FrameEnvelope):
+            capture_time, frame_seq, frame = frame.capture_time, frame.seq, frame.image
+        else:
+            capture_time, frame_seq = time.time(), None
+
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match buffer shape {self.frame_shape}")
+
+        with self._cond:
+            slot = self._pick_write_slot()
+            if slot is None:
+                # Every slot is checked out by a consumer; drop the new frame
+                self._header[_HDR_DROPPED] += 1
+                logger.warning("SharedFrameBuffer has no writable slot, frame dropped")
+                return
+            if self._slot_state[slot] == SLOT_READY:
+                self._header[_HDR_DROPPED] += 1
+            self._slot_state[slot] = SLOT_WRITING
+
+        # Pixel copy happens outside the lock; no consumer can see a WRITING slot
+        np.copyto(self._frames[slot], frame)
+
+        with self._cond:
+            seq = self._header[_HDR_NEXT_SEQ]
+            self._slot_seq[slot] = seq
+            self._slot_frame_seq[slot] = seq if frame_seq is None else frame_seq
+            self._capture_times[slot] = capture_time
+            self._header[_HDR_NEXT_SEQ] += 1
+            self._header[_HDR_PRODUCED] += 1
+            self._slot_state[slot] = SLOT_READY
+            self._cond.notify()
+
+    def _pick_write_slot(self) -> Optional[int]:
+        oldest = None
+        reading = []
+        for slot in range(self.max_size):
+            state = self._slot_state[slot]
+            if state == SLOT_EMPTY:
+                return slot
+            if state == SLOT_READY and (oldest is None or self._slot_seq[slot] < self._slot_seq[oldest]):
+                oldest = slot
+            elif state == SLOT_READING:
+                reading.append(slot)
+        for slot in reading:
+            pid = int(self._slot_reader[slot])
+            if not _pid_alive(pid):
+                logger.warning(f"SharedFrameBuffer slot {slot} reclaimed from exited reader {pid}")
+                return slot
+        return oldest
+
+    # --- Consumer ---
+
+    def acquire(self, block: bool = True, timeout: Optional[float] = None) -> SharedFrame:
+        """
+        Check out the oldest ready frame without copying it.
+        Raises queue.Empty if no frame is available (like FrameBuffer.get).
+        """
+        with self._cond:
+            slot = self._pick_read_slot()
+            if slot is None and block:
+                self._cond.wait_for(lambda: self._pick_read_slot() is not None, timeout=timeout)
+                slot = self._pick_read_slot()
+            if slot is None:
+                raise queue.Empty
+            self._slot_state[slot] = SLOT_READING
+            self._slot_reader[slot] = os.getpid()
+            self._header[_HDR_CONSUMED] += 1
+            return SharedFrame(self, slot)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> FrameEnvelope:
+        """
+        Get the next frame as a FrameEnvelope holding a private copy (drop-in for FrameBuffer.get).
+        """
+        with self.acquire(block=block, timeout=timeout) as shared:
+            return FrameEnvelope(shared.frame.copy(), shared.capture_time, shared.source_id, shared.seq)
+
+    def _pick_read_slot(self) -> Optional[int]:
+        oldest = None
+        for slot in range(self.max_size):
+            if self._slot_state[slot] == SLOT_READY and (oldest is None or self._slot_seq[slot] < self._slot_seq[oldest]):
+                oldest = slot
+        return oldest
+
+    def _release(self, slot: int) -> None:
+        with self._cond:
+            self._slot_state[slot] = SLOT_EMPTY
+
+    # --- Introspection ---
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def qsize(self) -> int:
+        with self._cond:
+            return int(np.count_nonzero(self._slot_state == SLOT_READY))
+
+    @property
+    def dropped(self) -> int:
+        return int(self._header[_HDR_DROPPED])
+
+    @property
+    def produced(self) -> int:
+        return int(self._header[_HDR_PRODUCED])
+
+    @property
+    def consumed(self) -> int:
+        return int(self._header[_HDR_CONSUMED])
+
+    # --- Lifecycle ---
+
+    def close(self) -> None:
+        """Detach this process from the shared memory block."""
+        self._header = self._slot_seq = self._slot_state = self._slot_frame_seq = self._slot_reader = None
+        self._capture_times = self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory block (creating process only, after close())."""
+        if self._owner:
+            self._shm.unlink()
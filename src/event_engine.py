@@ -1,10 +1,12 @@
 import json
-import uuid
 import time
 import os
+import atexit
 import logging
 import datetime
 from typing import Dict, Optional, List, Any, Union
+from shared.ids import uuid7
+from storage.layout import event_filename, node_shard, shard_name
 
 # Configure local logger for the event engine
 logger = logging.getLogger("EventEngine")
@@ -14,6 +16,31 @@ if not logger.handlers:
 
 EVENTS_DIR = "events"
 
+# Persistence backend: "jsonl" (append-only segmented log), "sqlite" (indexed database,
+# see storage.sqlite_store) or "files" (one JSON file per event)
+EVENT_STORE = os.getenv("EVENT_STORE", "jsonl").lower()
+# sqlite backend database (default: <EVENTS_DIR>/events.db)
+EVENT_DB_PATH = os.getenv("EVENT_DB_PATH")
+# Fixed shard directory (node_<EVENT_SHARD>) inside each day for every event of this process;
+# default: cam_<camera_id> or src_<module> from the event source
+EVENT_SHARD = os.getenv("EVENT_SHARD")
+# Group-commit settings of the jsonl backend (0 disables one; with EVENT_LOG_FSYNC_MS=0
+# every batch is flushed to the OS and only EVENT_LOG_FSYNC_EVERY fsyncs)
+EVENT_LOG_FSYNC_MS = float(os.getenv("EVENT_LOG_FSYNC_MS", "200"))
+EVENT_LOG_FSYNC_EVERY = int(os.getenv("EVENT_LOG_FSYNC_EVERY", "100"))
+EVENT_LOG_SEGMENT_MB = float(os.getenv("EVENT_LOG_SEGMENT_MB", "64"))
+# Per-day manifest (storage.manifest) maintained by the jsonl and files backends
+EVENT_MANIFEST = os.getenv("EVENT_MANIFEST", "1") == "1"
+# "sync" writes on the caller's thread; "async" queues events for a background writer
+EVENT_WRITER = os.getenv("EVENT_WRITER", "sync").lower()
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "10000"))
+# Full queue: "drop_oldest", "drop_newest" or "block" (see storage.async_writer)
+EVENT_QUEUE_OVERFLOW = os.getenv("EVENT_QUEUE_OVERFLOW", "drop_oldest").lower()
+
+_event_log = None
+_event_writer = None
+_manifest = None
+
 # --- Taxonomy Constants ---
 CATEGORY_MOTION = "motion"
 CATEGORY_POSTURE = "posture"
@@ -31,6 +58,93 @@ def _ensure_directory(path: str):
     except OSError as e:
         logger.error(f"Failed to create directory {path}: {e}")
 
+def event_db_path() -> str:
+    from storage.sqlite_store import DB_FILENAME
+    return EVENT_DB_PATH or os.path.join(EVENTS_DIR, DB_FILENAME)
+
+def _get_manifest():
+    global _manifest
+    if _manifest is None and EVENT_MANIFEST:
+        from storage.manifest import ManifestWriter
+        _manifest = ManifestWriter()
+        atexit.register(_manifest.close)
+    return _manifest
+
+def _get_event_log():
+    """The append target of the jsonl or sqlite backend (both expose append/extend/flush/close)."""
+    global _event_log
+    if _event_log is None and EVENT_STORE == "sqlite":
+        from storage.sqlite_store import shared_store
+        _event_log = shared_store(event_db_path())
+    elif _event_log is None:
+        from storage.jsonl_log import SegmentedEventLog
+        _get_manifest()
+        _event_log = SegmentedEventLog(
+            EVENTS_DIR,
+            max_segment_bytes=int(EVENT_LOG_SEGMENT_MB * 1024 * 1024),
+            fsync_interval_ms=EVENT_LOG_FSYNC_MS,
+            fsync_every=EVENT_LOG_FSYNC_EVERY,
+            shard_of=_event_shard,
+            on_write=_manifest_add
+        )
+        atexit.register(_event_log.close)
+    return _event_log
+
+def _get_event_writer():
+    global _event_writer
+    if _event_writer is None:
+        from storage.async_writer import AsyncEventWriter
+        # Open the log and manifest first: atexit runs in reverse order, so the writer
+        # drains before they close
+        _get_manifest()
+        if EVENT_STORE != "files":
+            _get_event_log()
+        _event_writer = AsyncEventWriter(_persist_batch, max_queue=EVENT_QUEUE_SIZE, overflow=EVENT_QUEUE_OVERFLOW)
+        atexit.register(_event_writer.close)
+    return _event_writer
+
+def _manifest_add(written) -> None:
+    manifest = _get_manifest()
+    if manifest is not None:
+        manifest.add(written)
+
+def _persist_batch(events: List[Dict[str, Any]]) -> None:
+    if EVENT_STORE == "files":
+        _manifest_add([(event, _write_event_file(event), -1, -1) for event in events])
+    else:
+        _get_event_log().extend(events)
+
+def flush_events(timeout: Optional[float] = None) -> bool:
+    """
+    Blocks until every emitted event is on disk (async writer drained, log synced).
+    Returns False if the writer did not drain within timeout.
+    """
+    drained = _event_writer.flush(timeout) if _event_writer is not None else True
+    if _event_log is not None:
+        _event_log.flush()
+    return drained
+
+def event_writer_stats() -> Optional[Dict[str, Any]]:
+    """Queue/drop counters and queue-depth and write-latency histograms (None in sync mode)."""
+    return _event_writer.stats() if _event_writer is not None else None
+
+def _event_shard(event: Dict[str, Any]) -> Optional[str]:
+    return node_shard(EVENT_SHARD) if EVENT_SHARD else shard_name(event.get("source"))
+
+def _write_event_file(event: Dict[str, Any]) -> str:
+    """One file per event: events/<date>/<shard>/<timestamp>_<id>_<EVENT_TYPE>.json"""
+    current_time = event["timestamp"]
+    date_str = datetime.datetime.fromtimestamp(current_time).strftime('%Y-%m-%d')
+    date_dir = os.path.join(EVENTS_DIR, date_str, _event_shard(event) or "")
+    _ensure_directory(date_dir)
+
+    # The time-ordered id keeps names unique within a millisecond and across processes
+    filepath = os.path.join(date_dir, event_filename(event))
+
+    with open(filepath, 'w') as f:
+        json.dump(event, f, indent=2)
+    return filepath
+
 def emit_event(
     event_type: str,
     event_category: str,
@@ -56,9 +170,13 @@ def emit_event(
         event_chain: List of UUIDs of atomic events that led to this event (for composite events).
         severity_hint: visual severity indication.
         confidence_hint: generic confidence score of the detection.
+
+    With EVENT_WRITER=async the event is queued and persisted by a background thread;
+    the returned dict is the queued object and should be treated as read-only.
     """
     current_time = time.time()
-    event_id = str(uuid.uuid4())
+    # Time-ordered (UUIDv7): ids sort like their timestamps and can be range-scanned
+    event_id = uuid7(current_time)
     
     # Default source structure if not provided
     final_source = {
@@ -85,19 +203,23 @@ def emit_event(
         "version": "1.2"
     }
     
+    # Async mode: serialization and disk I/O happen on the writer thread, which gets
+    # its own copy so the caller can keep using the returned event
+    if EVENT_WRITER == "async":
+        if _get_event_writer().submit(dict(event)):
+            logger.info(f"Event emitted: {event_type} (ID: {event_id}) -> queued")
+        else:
+            logger.warning(f"Event dropped (writer queue full): {event_type} (ID: {event_id})")
+        return event
+
     # Persist to Disk
     try:
-        date_str = datetime.datetime.fromtimestamp(current_time).strftime('%Y-%m-%d')
-        date_dir = os.path.join(EVENTS_DIR, date_str)
-        _ensure_directory(date_dir)
-
-        # Filename: <timestamp>_<EVENT_TYPE>.json
-        filename = f"{current_time:.3f}_{event_type}.json"
-        filepath = os.path.join(date_dir, filename)
+        if EVENT_STORE == "files":
+            filepath = _write_event_file(event)
+            _manifest_add([(event, filepath, -1, -1)])
+        else:
+            filepath = _get_event_log().append(event)
 
-        with open(filepath, 'w') as f:
-            json.dump(event, f, indent=2)
-            
         logger.info(f"Event emitted: {event_type} (ID: {event_id}) -> {filepath}")
 
     except Exception as e:
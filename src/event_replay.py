@@ -1,71 +1,340 @@
 import os
 import json
+import heapq
+import bisect
 import argparse
 import datetime
-from typing import List, Dict
+import functools
+from typing import Any, Dict, Iterator, List, Optional
+from storage.jsonl_log import SEGMENT_SUFFIX, read_segment, segment_offset
+from storage.layout import file_timestamp, list_day_files, parse_event_filename
+from storage.sqlite_store import SqliteEventStore
+from storage import manifest
+from storage.manifest import BodyReader, ManifestEntry
+from storage import bulk_load
+# Store settings (EVENTS_DIR, EVENT_STORE, event_db_path) are event_engine's, read at call time
+import event_engine
 
-EVENTS_DIR = "events"
+def day_range(target_date: str) -> tuple:
+    """[start, end) epoch bounds of a local calendar day YYYY-MM-DD."""
+    day = datetime.datetime.strptime(target_date, "%Y-%m-%d")
+    return day.timestamp(), (day + datetime.timedelta(days=1)).timestamp()
 
-def load_events(target_date: str = None) -> List[Dict]:
+def parse_time(value: str) -> float:
     """
-    Load all events from the events directory, optionally filtered by date.
+    Epoch seconds from an epoch number or an ISO 8601 date/time ("2025-12-29T22:30",
+    "2025-12-29 22:30:05", "2025-12-29T22:30:00+00:00"). Without an offset, ISO values
+    are local time, like the day directories.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an epoch or ISO 8601 time: {value!r}")
+
+def _event_type(event: Dict[str, Any]) -> Optional[str]:
+    # Pre-v1.2 events use "type"
+    return event.get("event_type") or event.get("type")
+
+def _matches(event: Dict[str, Any], event_type: Optional[str], start: Optional[float], end: Optional[float]) -> bool:
+    ts = event.get("timestamp", 0)
+    return (
+        (not event_type or _event_type(event) == event_type)
+        and (start is None or ts >= start)
+        and (end is None or ts < end)
+    )
+
+def _day_dirs(start: Optional[float], end: Optional[float]) -> List[str]:
+    """Day directories overlapping [start, end), oldest first."""
+    events_dir = event_engine.EVENTS_DIR
+    if not os.path.isdir(events_dir):
+        return []
+    days = []
+    for name in sorted(os.listdir(events_dir)):
+        try:
+            day_start, day_end = day_range(name)
+        except ValueError:
+            continue  # Not a day directory (e.g. events.db)
+        if (start is not None and day_end <= start) or (end is not None and day_start >= end):
+            continue
+        days.append(os.path.join(events_dir, name))
+    return days
+
+def _name_timestamp(filepath: str) -> float:
+    ts = file_timestamp(os.path.basename(filepath))
+    # Non-numeric names sort after the digits
+    return ts if ts is not None else float("inf")
+
+def _file_slice(paths: List[str], event_type, start, end) -> List[str]:
+    """
+    Per-event files that may match, by filename alone (type and time, without opening).
+    paths are sorted by filename (= time), so the range is located by bisection.
+    """
+    # Filename timestamps are rounded to the millisecond: keep a 1 ms margin
+    lo = bisect.bisect_left(paths, start - 0.001, key=_name_timestamp) if start is not None else 0
+    hi = bisect.bisect_left(paths, end + 0.001, key=_name_timestamp) if end is not None else len(paths)
+    if not event_type:
+        return paths[lo:hi]
+    kept = []
+    for filepath in paths[lo:hi]:
+        parsed = parse_event_filename(os.path.basename(filepath))
+        if parsed is None or parsed[1] == event_type:
+            kept.append(filepath)
+    return kept
+
+def _file_events(paths: List[str], event_type, start, end) -> Iterator[Dict[str, Any]]:
+    """
+    One-file-per-event stream in timestamp order; only files kept by _file_slice are
+    opened. Filenames order events to the millisecond only, so each run of files with
+    the same filename timestamp is sorted by the exact timestamp before it is yielded.
+    """
+    run: List[Dict[str, Any]] = []
+    run_ts = None
+    for filepath in _file_slice(paths, event_type, start, end):
+        name_ts = _name_timestamp(filepath)
+        if name_ts != run_ts:
+            run.sort(key=lambda e: e.get("timestamp", 0))
+            yield from run
+            run, run_ts = [], name_ts
+        try:
+            with open(filepath, 'r') as f:
+                event = json.load(f)
+        except Exception as e:
+            print(f"Error reading {filepath}: {e}")
+            continue
+        if _matches(event, event_type, start, end):
+            run.append(event)
+    run.sort(key=lambda e: e.get("timestamp", 0))
+    yield from run
+
+def _type_needle(event_type: Optional[str]) -> Optional[bytes]:
+    # The quoted type must appear in a matching line: skip the others without decoding
+    return json.dumps(event_type).encode("utf-8") if event_type else None
+
+def _segment_events(filepath: str, event_type, start, end) -> Iterator[Dict[str, Any]]:
+    contains = _type_needle(event_type)
+    try:
+        # Lines are in time order: bisect to the range instead of reading the whole segment
+        start_offset = segment_offset(filepath, start) if start is not None else 0
+        end_offset = segment_offset(filepath, end) if end is not None else None
+        for event in read_segment(filepath, contains=contains, start_offset=start_offset, end_offset=end_offset):
+            if _matches(event, event_type, start, end):
+                yield event
+    except Exception as e:
+        print(f"Error reading {filepath}: {e}")
+
+def _day_events(day_dir: str, event_type, start, end) -> Iterator[Dict[str, Any]]:
+    """
+    Lazy k-way merge of one day: per-event files (already in time order by filename,
+    across shards) and every .jsonl segment (in append order) are merged by timestamp.
+    """
+    streams = [_file_events(list_day_files(day_dir, ".json"), event_type, start, end)]
+    for filepath in _day_segments(day_dir, end):
+        streams.append(_segment_events(filepath, event_type, start, end))
+    return heapq.merge(*streams, key=lambda e: e.get("timestamp", 0))
+
+def _day_segments(day_dir: str, end: Optional[float]) -> List[str]:
+    """Segments of a day, minus those starting after the range."""
+    segments = []
+    for filepath in list_day_files(day_dir, SEGMENT_SUFFIX):
+        first_ts = file_timestamp(os.path.basename(filepath))
+        if end is not None and first_ts is not None and first_ts >= end:
+            continue
+        segments.append(filepath)
+    return segments
+
+def _bulk_tasks(day_dir: str, event_type, start, end) -> List[bulk_load.Task]:
+    """The reads of _day_events, split into tasks for storage.bulk_load."""
+    tasks = bulk_load.file_tasks(_file_slice(list_day_files(day_dir, ".json"), event_type, start, end))
+    for filepath in _day_segments(day_dir, end):
+        try:
+            start_offset = segment_offset(filepath, start) if start is not None else 0
+            end_offset = segment_offset(filepath, end) if end is not None else None
+            tasks.extend(bulk_load.segment_tasks(filepath, start_offset, end_offset, _type_needle(event_type)))
+        except OSError as e:
+            print(f"Error reading {filepath}: {e}")
+    return tasks
+
+def _narrow(target_date: Optional[str], start: Optional[float], end: Optional[float]) -> tuple:
+    if target_date:
+        day_start, day_end = day_range(target_date)
+        start = day_start if start is None else max(start, day_start)
+        end = day_end if end is None else min(end, day_end)
+    return start, end
+
+def _manifest_events(day_dir: str, entries, event_type, start, end) -> Iterator[Dict[str, Any]]:
+    """Bodies of the manifest entries in range: only matching events are read."""
+    with BodyReader(day_dir) as reader:
+        for entry in manifest.select(entries, event_type, start, end):
+            event = reader.load(entry)
+            if event is not None:
+                yield event
+
+def iter_events(
+    target_date: str = None,
+    event_type: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    store: Optional[str] = None,
+    use_manifest: bool = True
+) -> Iterator[Dict]:
+    """
+    Streams events in timestamp order, optionally filtered by date, exact type and
+    time range (start <= ts < end). Memory stays bounded by one day's file listing and
+    one open reader per segment, whatever the range.
+    With the sqlite store the filters run as an indexed SQL query; otherwise day
+    directories are read one at a time. A day with a manifest (storage.manifest) is
+    filtered on the manifest and only matching bodies are read; other days skip files
+    by name before opening them.
+    Within a day the range is located by bisection (over the manifest, the sorted
+    filenames or each segment's byte offsets), so the work follows the window, not the day.
     Args:
         target_date: Date string YYYY-MM-DD
+        event_type: Exact event type
+        start, end: Epoch seconds
+        store: "sqlite" or a file layout (default: event_engine.EVENT_STORE)
+        use_manifest: False to ignore manifests and read the data directly
     """
-    all_events = []
-    
-    # If date is not provided, look at all folders
-    if target_date:
-        dirs_to_scan = [os.path.join(EVENTS_DIR, target_date)]
-    else:
-        if not os.path.exists(EVENTS_DIR):
-            return []
-        dirs_to_scan = [os.path.join(EVENTS_DIR, d) for d in os.listdir(EVENTS_DIR) 
-                        if os.path.isdir(os.path.join(EVENTS_DIR, d))]
+    start, end = _narrow(target_date, start, end)
 
-    for day_dir in dirs_to_scan:
-        if not os.path.exists(day_dir):
-            continue
-            
-        for filename in os.listdir(day_dir):
-            if filename.endswith(".json"):
-                filepath = os.path.join(day_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        event = json.load(f)
-                        all_events.append(event)
-                except Exception as e:
-                    print(f"Error reading {filepath}: {e}")
-    
-    return all_events
+    if (store or event_engine.EVENT_STORE) == "sqlite":
+        db_path = event_engine.event_db_path()
+        if not os.path.exists(db_path):
+            return
+        with SqliteEventStore(db_path) as db:
+            yield from db.iter_query(start=start, end=end, event_types=[event_type] if event_type else None)
+        return
+
+    # Day directories cover disjoint time ranges: chain them, merging within each day
+    for day_dir in _day_dirs(start, end):
+        entries = manifest.read_manifest(day_dir, event_type, start, end) if use_manifest else None
+        if entries is not None:
+            yield from _manifest_events(day_dir, entries, event_type, start, end)
+        else:
+            yield from _day_events(day_dir, event_type, start, end)
+
+def iter_entries(
+    target_date: str = None,
+    event_type: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    store: Optional[str] = None
+) -> Iterator[ManifestEntry]:
+    """
+    Manifest entries (id, timestamp, type, category, severity, chain) in timestamp
+    order, without reading event bodies for days that have a manifest. Days without
+    one are scanned (the manifest is not written; see python -m storage.manifest).
+    """
+    if (store or event_engine.EVENT_STORE) == "sqlite":
+        for event in iter_events(target_date, event_type, start, end, store):
+            yield manifest.entry_of(event)
+        return
+
+    start, end = _narrow(target_date, start, end)
+    for day_dir in _day_dirs(start, end):
+        entries = manifest.read_manifest(day_dir, event_type, start, end)
+        if entries is None:
+            entries = manifest.scan_entries(day_dir)
+        yield from manifest.select(entries, event_type, start, end)
+
+def load_events(
+    target_date: str = None,
+    event_type: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    store: Optional[str] = None,
+    use_manifest: bool = True,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    All events matching the filters as a list, in timestamp order (see iter_events).
+    Args:
+        target_date: Date string YYYY-MM-DD
+        workers: If set, files and segments are decoded by that many processes
+            (storage.bulk_load; 1 = in this process), for loads that need most bodies
+            of many days. Manifests are not used on this path.
+    """
+    if not workers or (store or event_engine.EVENT_STORE) == "sqlite":
+        return list(iter_events(target_date, event_type, start, end, store, use_manifest))
+
+    start, end = _narrow(target_date, start, end)
+    tasks = [task for day_dir in _day_dirs(start, end) for task in _bulk_tasks(day_dir, event_type, start, end)]
+    keep = functools.partial(_matches, event_type=event_type, start=start, end=end)
+    return bulk_load.load_parallel(tasks, keep, workers)
 
 def format_timestamp(ts: float) -> str:
     dt = datetime.datetime.fromtimestamp(ts)
     return dt.strftime("%H:%M:%S.%f")[:-3]
 
+def print_entries(entries: Iterator[ManifestEntry], args) -> None:
+    """--count / --histogram / --list output: manifest fields only, no event bodies."""
+    if args.list:
+        n = 0
+        for e in entries:
+            n += 1
+            print(f"[{format_timestamp(e.timestamp)}] {e.event_type:<25} ({e.category or 'unknown'}) | severity={e.severity or 'unknown':<6} | {e.id}")
+        print(f"{n} events")
+    elif args.histogram:
+        for bucket, per_type in sorted(manifest.histogram(entries, args.histogram).items()):
+            types = " ".join(f"{t}={n}" for t, n in per_type.most_common())
+            print(f"{datetime.datetime.fromtimestamp(bucket).strftime('%Y-%m-%d %H:%M:%S')} total={sum(per_type.values())} {types}")
+    else:
+        per_type = manifest.counts(entries)
+        for event_type, n in per_type.most_common():
+            print(f"{event_type:<25} {n}")
+        print(f"{'TOTAL':<25} {sum(per_type.values())}")
+
 def main():
     parser = argparse.ArgumentParser(description="Event Replay Mode for Offline Analysis")
     parser.add_argument("--date", type=str, help="Filter by date (YYYY-MM-DD), default all")
     parser.add_argument("--event-type", type=str, help="Filter by exact event type")
+    parser.add_argument("--from", dest="time_from", type=parse_time, help="Start time, inclusive (ISO 8601 or epoch)")
+    parser.add_argument("--to", dest="time_to", type=parse_time, help="End time, exclusive (ISO 8601 or epoch)")
+    parser.add_argument("--last-days", type=float, help="Only events of the last N days")
+    parser.add_argument("--store", type=str, choices=["files", "jsonl", "sqlite"], default=event_engine.EVENT_STORE,
+                        help="Event store to replay from (default: EVENT_STORE env, jsonl)")
     parser.add_argument("--generate-snapshot", action="store_true", help="Generate Analysis Snapshot from replayed events")
+    parser.add_argument("--count", action="store_true", help="Only print event counts per type (from the manifests)")
+    parser.add_argument("--histogram", type=float, metavar="SECONDS", help="Only print counts per type in time buckets of SECONDS")
+    parser.add_argument("--list", action="store_true", help="Only list id/type/category/severity (from the manifests)")
+    parser.add_argument("--no-manifest", action="store_true", help="Ignore manifests and read event files directly")
+    parser.add_argument("--workers", type=int, help="Decode with N processes (loads everything into memory first)")
     
     args = parser.parse_args()
     
-    events = load_events(args.date)
-    
-    # Sort by timestamp
-    events.sort(key=lambda x: x.get("timestamp", 0))
-    
-    if not events:
-        print("No events found.")
+    start = args.time_from
+    if args.last_days:
+        since = datetime.datetime.now().timestamp() - args.last_days * 86400
+        start = since if start is None else max(start, since)
+    if args.count or args.histogram or args.list:
+        print_entries(iter_entries(args.date, args.event_type, start, args.time_to, args.store), args)
         return
 
-    print(f"--- REPLAY START ({len(events)} events) ---")
-    
+    if args.workers:
+        events = load_events(
+            args.date, event_type=args.event_type, start=start, end=args.time_to,
+            store=args.store, workers=args.workers
+        )
+    else:
+        events = iter_events(
+            args.date, event_type=args.event_type, start=start, end=args.time_to,
+            store=args.store, use_manifest=not args.no_manifest
+        )
+
+    # Only a snapshot needs the events kept in memory
+    kept = [] if args.generate_snapshot else None
+    count = 0
+
     for evt in events:
-        if args.event_type and evt.get("event_type") != args.event_type:
-            continue
-            
+        if count == 0:
+            print("--- REPLAY START ---")
+        count += 1
+        if kept is not None:
+            kept.append(evt)
+
         ts_str = format_timestamp(evt.get("timestamp", 0))
         etype = evt.get("event_type", "UNKNOWN")
         ecat = evt.get("event_category", "unknown")
@@ -86,7 +355,11 @@ def main():
             
         print(f"[{ts_str}] {etype:<25} ({ecat}) | severity={severity:<6} {extra_info}")
 
-    print("--- REPLAY END ---")
+    if count == 0:
+        print("No events found.")
+        return
+
+    print(f"--- REPLAY END ({count} events) ---")
 
     # Generate Snapshot if requested
     if args.generate_snapshot:
@@ -94,8 +367,8 @@ def main():
         print("Generating Analysis Snapshot...")
         engine = AnalysisSnapshotEngine()
         # Analyze the whole sequence as one window
-        duration = events[-1].get("timestamp", 0) - events[0].get("timestamp", 0) if events else 0
-        snapshot = engine.analyze_window(events, window_seconds=duration)
+        duration = kept[-1].get("timestamp", 0) - kept[0].get("timestamp", 0)
+        snapshot = engine.analyze_window(kept, window_seconds=duration)
         
         # Save
         saved_path = engine.persist_snapshot(snapshot)
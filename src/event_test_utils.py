@@ -0,0 +1,65 @@
+"""
+Helpers shared by the event storage tests: an event factory and a TestCase that runs
+each test against a temporary EVENTS_DIR.
+"""
+
+import os
+import shutil
+import datetime
+import tempfile
+import unittest
+import event_engine
+import event_replay
+from shared.ids import uuid7
+
+DAY = "2025-12-29"
+# 01:00 local time on DAY, whatever the timezone
+BASE_TS = event_replay.day_range(DAY)[0] + 3600.0
+
+
+def make_event(i, event_type="RAPID_VERTICAL_MOVEMENT", ts=None, camera="a", chain=None, **fields):
+    """
+    Event number i, at BASE_TS + i unless ts is given, with a time-ordered id.
+    Extra fields are added to the event (or replace the defaults).
+    """
+    ts = BASE_TS + i if ts is None else ts
+    event = {
+        "id": uuid7(ts), "event_type": event_type, "event_category": "motion", "severity_hint": "medium",
+        "timestamp": ts, "source": {"camera_id": camera}, "event_chain": chain or []
+    }
+    event.update(fields)
+    return event
+
+
+class EventStoreTestCase(unittest.TestCase):
+    """
+    Points event_engine (and so event_replay and the snapshot engine) at a fresh
+    temporary directory, self.root, with the EVENT_STORE / EVENT_WRITER of the class.
+    tearDown closes the writers event_engine created lazily and restores its settings.
+    """
+    EVENT_STORE = "jsonl"
+    EVENT_WRITER = "sync"
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self._saved = (
+            event_engine.EVENTS_DIR, event_engine.EVENT_STORE, event_engine.EVENT_DB_PATH, event_engine.EVENT_WRITER
+        )
+        event_engine.EVENTS_DIR = self.root
+        event_engine.EVENT_STORE = self.EVENT_STORE
+        event_engine.EVENT_DB_PATH = None  # <root>/events.db
+        event_engine.EVENT_WRITER = self.EVENT_WRITER
+
+    def tearDown(self):
+        for attr in ("_event_writer", "_event_log", "_manifest"):
+            if getattr(event_engine, attr) is not None:
+                getattr(event_engine, attr).close()
+                setattr(event_engine, attr, None)
+        (
+            event_engine.EVENTS_DIR, event_engine.EVENT_STORE, event_engine.EVENT_DB_PATH, event_engine.EVENT_WRITER
+        ) = self._saved
+        shutil.rmtree(self.root)
+
+    def day_dir_of(self, event):
+        """Day directory of an event under self.root."""
+        return os.path.join(self.root, datetime.datetime.fromtimestamp(event["timestamp"]).strftime('%Y-%m-%d'))
@@ -1,16 +1,26 @@
 import cv2
 import time
 import sys
+import queue
 import logging
 import argparse
-import mediapipe as mp
-from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 from shared.logging_contracts import emit_log
 from simulation.simulation_runner import SimulationRunner
-from pipeline.fall_pipeline import FallDetectionPipeline
+from pipeline.fall_pipeline import FallDetectionPipeline, DEFAULT_TRACK_ID
 from camera.rtsp_reader import RTSPReader
-from camera.frame_buffer import FrameBuffer
+from camera.frame_mailbox import create_frame_buffer
+from camera.offline_video import OfflineVideoSource
+from processing.motion_gate import MotionGate
+from processing.motion_analyzer import MotionAnalyzer
+from processing.pose_estimator import PoseEstimator, LiveStreamPoseEstimator
+from processing.roi_tracker import RoiTracker
+from processing.pose_tracker import PoseTracker
+from processing.landmarks import compute_features
+from pipeline.multi_camera_supervisor import MultiCameraSupervisor
+from shared.metrics import RateMeter, StageLatencyTracker, SequenceGapTracker
+from shared.cli_args import parse_sources, parse_motion_zones
+from event_engine import event_writer_stats
 
 # Configure Logging
 logging.basicConfig(
@@ -19,103 +29,320 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Main")
 
+PERF_REPORT_INTERVAL = 10.0
+
 def main():
     parser = argparse.ArgumentParser(description="Fall Detection System - Unified Runner")
     parser.add_argument("--simulation", type=str, help="Path to scenario JSON for deterministic simulation")
     parser.add_argument("--source", type=str, default="0", help="Camera source (default: webcam 0)")
     parser.add_argument("--buffer-size", type=int, default=1, help="Size of frame buffer")
     parser.add_argument("--no-display", action="store_true", help="Disable GUI window")
+    parser.add_argument("--inference-mode", choices=["image", "live_stream"], default="image",
+                        help="image: synchronous detect(); live_stream: MediaPipe LIVE_STREAM with detect_async")
+    parser.add_argument("--motion-gate", action="store_true", help="Skip pose inference while the scene is static")
+    parser.add_argument("--static-after", type=float, default=3.0, help="Seconds without motion before the gate throttles inference")
+    parser.add_argument("--keepalive", type=float, default=1.0, help="Seconds between keep-alive inferences while static (0 = none)")
+    parser.add_argument("--motion-scale", type=float, default=0.25, help="Motion gate: analyse frames at this fraction of their size")
+    parser.add_argument("--motion-blur", choices=["gaussian", "box", "stack"], default="gaussian", help="Motion gate: blur used before frame differencing")
+    parser.add_argument("--motion-engine", choices=["diff", "mog2"], default="diff", help="Motion gate: frame differencing or MOG2 background subtraction")
+    parser.add_argument("--motion-grid", type=str, default=None, help="Motion gate: per-zone grid as ROWSxCOLS (e.g. 4x4)")
+    parser.add_argument("--motion-ignore", type=str, default=None, help="Motion gate: grid cells to ignore, as 'row,col;row,col' (e.g. a TV)")
+    parser.add_argument("--offline", action="store_true", help="Process a video file frame by frame as fast as possible, using media timestamps")
+    parser.add_argument("--media-epoch", type=float, default=0.0, help="Offline mode: value added to media time (e.g. recording start epoch)")
+    parser.add_argument("--roi-tracking", action="store_true", help="Run pose inference on a crop around the last detected subject (camera modes only)")
+    parser.add_argument("--target-fps", type=float, default=None, help="Decode at most this many frames per second (grab-skip the rest)")
+    parser.add_argument("--skip-when-busy", action="store_true", help="Only decode a frame when the consumer has taken the previous one")
+    parser.add_argument("--sources", type=str, help="Multi-camera mode: comma-separated [id=]source list")
+    parser.add_argument("--pose-workers", type=int, default=None, help="Pose worker threads in multi-camera mode (default: min(cameras, CPUs))")
+    parser.add_argument("--num-poses", type=int, default=1, help="People to detect and track per frame (>1 disables --roi-tracking)")
     
     args = parser.parse_args()
+    if args.num_poses > 1 and args.inference_mode == "live_stream":
+        parser.error("--num-poses > 1 is only supported with --inference-mode image")
+    if args.roi_tracking and args.offline:
+        # VIDEO mode tracks across frames itself and needs full frames at strictly increasing timestamps
+        parser.error("--roi-tracking is not supported with --offline")
 
     if args.simulation:
         logger.info(f"🚀 Launching in SIMULATION mode with scenario: {args.simulation}")
         runner = SimulationRunner(args.simulation)
         runner.run(speed_factor=0.0) 
+    elif args.sources:
+        try:
+            sources = parse_sources(args.sources)
+        except ValueError as e:
+            parser.error(str(e))
+        logger.info(f"🎥 Launching in MULTI-CAMERA mode ({len(sources)} sources)")
+        supervisor = MultiCameraSupervisor(
+            sources,
+            num_workers=args.pose_workers,
+            buffer_size=args.buffer_size,
+            target_fps=args.target_fps,
+            skip_when_busy=args.skip_when_busy,
+            roi_tracking=args.roi_tracking,
+            num_poses=args.num_poses,
+            gate_factory=make_gate_factory(args)
+        )
+        try:
+            supervisor.run()
+        except KeyboardInterrupt:
+            logger.info("Stopped by user.")
+    elif args.offline:
+        run_offline(args)
     else:
-        logger.info(f"🎥 Launching in CAMERA/RTSP mode (Source: {args.source})")
-        logger.info("Initializing Advanced Fall Detection Pipeline...")
-
-        # Initialize MediaPipe Pose
-        MODEL_PATH = "models/pose_landmarker_lite.task"
-        base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
-        options = vision.PoseLandmarkerOptions(
-            base_options=base_options,
-            output_segmentation_masks=False
+        run_camera(args)
+
+def feed_pipeline(pipeline: FallDetectionPipeline, tracker: PoseTracker, timestamp: float, landmarks, frame_shape: tuple) -> list:
+    """
+    Sends one frame's pose result to the pipeline and returns [(track_id, landmarks)] to draw.
+    Single subject (tracker None): landmarks is a (33, 4) array or None.
+    Multi-person: landmarks is the list of arrays from PoseEstimator.detect_all().
+    """
+    if tracker is not None:
+        return pipeline.process_poses(timestamp, landmarks or [], frame_shape, tracker)
+    if landmarks is None:
+        return []
+    pipeline.process_landmarks(timestamp, landmarks, frame_shape)
+    return [(DEFAULT_TRACK_ID, landmarks)]
+
+def draw_overlay(frame, landmarks, pipeline: FallDetectionPipeline, track_id: str = None):
+    """
+    Draws landmarks and pipeline state on the frame (in place).
+    landmarks is the (33, 4) array; hip centre and state come from the pipeline's features.
+    With track_id (multi-person), the state is labelled next to that person instead of
+    in the corner.
+    """
+    h, w = frame.shape[:2]
+
+    # Draw landmarks
+    for cx, cy in (landmarks[:, :2] * (w, h)).astype(int).tolist():
+        cv2.circle(frame, (cx, cy), 3, (0, 255, 0), -1)
+
+    # Draw State Info (reuse the features the pipeline computed for this frame)
+    track = pipeline.tracks.get(track_id) if track_id else None
+    features = (track.last_features if track else pipeline.last_features) or compute_features(landmarks)
+    state = "ON_FLOOR" if features.hip_center[1] > 0.7 else "STANDING"
+    color = (0, 0, 255) if state == "ON_FLOOR" else (0, 255, 0)
+
+    if track:
+        hx, hy = int(features.hip_center[0] * w), int(features.hip_center[1] * h)
+        cv2.putText(frame, f"{track_id}: {state}", (hx, hy), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        if track.on_floor_duration_seconds > 0:
+            cv2.putText(frame, f"{track.on_floor_duration_seconds:.1f}s", (hx, hy + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 165, 255), 2)
+        return
+
+    cv2.putText(frame, f"State: {state}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+    if pipeline.on_floor_duration_seconds > 0:
+        cv2.putText(frame, f"Time on Floor: {pipeline.on_floor_duration_seconds:.1f}s", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+
+def make_gate_factory(args):
+    """
+    Returns a MotionGate factory from CLI args, or None when gating is disabled.
+    """
+    if not args.motion_gate:
+        return None
+    grid, zone_mask = parse_motion_zones(args.motion_grid, args.motion_ignore)
+    return lambda: MotionGate(
+        analyzer=MotionAnalyzer(
+            scale=args.motion_scale,
+            blur=args.motion_blur,
+            engine=args.motion_engine,
+            grid=grid,
+            zone_mask=zone_mask
+        ),
+        static_after_seconds=args.static_after,
+        keepalive_interval=args.keepalive if args.keepalive > 0 else None
+    )
+
+def log_performance(mode: str, reader: RTSPReader, fps: RateMeter, latency: StageLatencyTracker, gaps: SequenceGapTracker, gate: MotionGate = None):
+    gate_info = f" skip_ratio={gate.skip_ratio:.2f}" if gate else ""
+    logger.info(
+        f"[perf:{mode}] fps={fps.rate():.1f} frames={gaps.received} "
+        f"dropped={gaps.missing} ({gaps.drop_ratio:.1%}) decode_skipped={reader.frames_skipped}{gate_info}"
+    )
+    # Capture -> stage latency (pose = frame-to-landmark)
+    for stage, lat in latency.summary().items():
+        logger.info(
+            f"[perf:{mode}] capture->{stage} n={lat['count']} "
+            f"latency_ms mean={lat['mean_ms']:.1f} p50={lat['p50_ms']:.1f} "
+            f"p95={lat['p95_ms']:.1f} max={lat['max_ms']:.1f}"
+        )
+    # Async event writer (EVENT_WRITER=async)
+    writer = event_writer_stats()
+    if writer:
+        depth, write = writer["queue_depth"], writer["write_latency_ms"]
+        logger.info(
+            f"[perf:{mode}] event_writer written={writer['written']} dropped={writer['dropped']} "
+            f"pending={writer['pending']} queue_depth p95={depth['p95']:g} max={depth['max']:g} "
+            f"write_ms p50={write['p50']:g} p95={write['p95']:g} max={write['max']:.1f}"
         )
-        pose_detector = vision.PoseLandmarker.create_from_options(options)
 
-        # Initialize Pipeline
-        pipeline = FallDetectionPipeline()
-        
-        # Initialize Reader
-        buffer = FrameBuffer(max_size=args.buffer_size)
-        reader = RTSPReader(rtsp_url=args.source, frame_buffer=buffer)
-        
-        # State Visualization Helpers
-        LEFT_HIP = 23
-        RIGHT_HIP = 24
+def run_offline(args):
+    """
+    Deterministic re-analysis of a recorded video: every frame, no drops, media time.
+    """
+    logger.info(f"🎞️ Launching in OFFLINE mode (File: {args.source}, media epoch: {args.media_epoch})")
+
+    pipeline = FallDetectionPipeline()
+    # VIDEO mode tracks across frames and is keyed on media timestamps
+    pose_estimator = PoseEstimator(running_mode=vision.RunningMode.VIDEO, num_poses=args.num_poses)
+    gate_factory = make_gate_factory(args)
+    gate = gate_factory() if gate_factory else None
+    tracker = PoseTracker() if args.num_poses > 1 else None
+    source = OfflineVideoSource(args.source, epoch=args.media_epoch)
+
+    wall_start = time.perf_counter()
+    last_ts_ms = -1
+
+    try:
+        for packet in source:
+            frame = packet.image
+            timestamp = packet.capture_time
+
+            if gate and not gate.should_infer(frame, timestamp):
+                landmarks = gate.last_landmarks
+            else:
+                # detect_for_video requires strictly increasing timestamps
+                ts_ms = max(int(round(source.media_seconds * 1000)), last_ts_ms + 1)
+                last_ts_ms = ts_ms
+                if tracker:
+                    landmarks = pose_estimator.detect_all(frame, ts_ms)
+                else:
+                    landmarks = pose_estimator.detect(frame, ts_ms)
+                if gate:
+                    gate.remember(landmarks)
+
+            feed_pipeline(pipeline, tracker, timestamp, landmarks, frame.shape)
+    except KeyboardInterrupt:
+        logger.info("Stopped by user.")
+    finally:
+        pose_estimator.close()
+
+    wall = time.perf_counter() - wall_start
+    speed = source.media_seconds / wall if wall > 0 else 0.0
+    gate_info = f", skip_ratio={gate.skip_ratio:.2f}" if gate else ""
+    logger.info(
+        f"Offline analysis complete: {source.frames_read} frames, {source.media_seconds:.1f}s media "
+        f"in {wall:.1f}s wall ({speed:.1f}x realtime{gate_info})"
+    )
+
+def run_camera(args):
+    logger.info(f"🎥 Launching in CAMERA/RTSP mode (Source: {args.source}, Inference: {args.inference_mode})")
+    logger.info("Initializing Advanced Fall Detection Pipeline...")
+
+    # Capture-to-stage latency and achieved result rate, comparable across modes
+    fps = RateMeter()
+    latency = StageLatencyTracker()
+    gaps = SequenceGapTracker()
+
+    # Initialize Pipeline
+    pipeline = FallDetectionPipeline(latency_tracker=latency)
+
+    live_stream = args.inference_mode == "live_stream"
+    # live_stream results arrive on the MediaPipe callback thread; they are queued and
+    # drained by the main loop, so only this thread touches the pipeline and the gate
+    results = queue.Queue()
+    last_fed = [float("-inf")]
+    latest_tracked = [[]]  # [(track_id, landmarks)] of the last frame fed, for the overlay
+
+    gate_factory = make_gate_factory(args)
+    gate = gate_factory() if gate_factory else None
+    tracker = PoseTracker() if args.num_poses > 1 else None
+
+    def drive(landmarks, timestamp: float, frame_shape: tuple):
+        # A result can complete after a later (gated) frame was fed: never go back in time
+        if timestamp < last_fed[0]:
+            return
+        last_fed[0] = timestamp
+        latest_tracked[0] = feed_pipeline(pipeline, tracker, timestamp, landmarks, frame_shape)
+
+    def on_landmarks(landmarks, timestamp: float, frame_shape: tuple):
+        if gate:
+            gate.remember(landmarks)
+        drive(landmarks, timestamp, frame_shape)
+
+    def on_result(landmarks, timestamp: float, frame_shape: tuple):
+        # MediaPipe thread: the meters are thread-safe, the rest waits for the main loop
+        latency.record("pose", timestamp)
+        fps.tick()
+        results.put((landmarks, timestamp, frame_shape))
+
+    # Initialize MediaPipe Pose
+    roi_tracker = RoiTracker() if args.roi_tracking and tracker is None else None
+    if live_stream:
+        pose_estimator = LiveStreamPoseEstimator(on_result=on_result, roi_tracker=roi_tracker)
+    else:
+        pose_estimator = PoseEstimator(num_poses=args.num_poses)
+
+    # Initialize Reader
+    buffer = create_frame_buffer(max_size=args.buffer_size)
+    reader = RTSPReader(
+        rtsp_url=args.source,
+        frame_buffer=buffer,
+        target_fps=args.target_fps,
+        skip_when_busy=args.skip_when_busy
+    )
+
+    last_report = time.monotonic()
+
+    try:
+        reader.start()
+        logger.info("Pipeline started.")
         
-        try:
-            reader.start()
-            logger.info("Pipeline started.")
+        while True:
+            if not reader.running and buffer.empty():
+                break
+            # Results of earlier live_stream submissions, in completion order
+            while not results.empty():
+                on_landmarks(*results.get_nowait())
+            try:
+                packet = buffer.get(timeout=0.1)
+            except:
+                if not args.no_display:
+                     if cv2.waitKey(10) & 0xFF == ord('q'): break
+                continue
             
-            while True:
-                if not reader.running and buffer.empty():
+            gaps.observe(packet.seq)
+            frame = packet.image
+            timestamp = packet.capture_time
+            
+            # MediaPipe Detection
+            if gate and not gate.should_infer(frame, timestamp):
+                # Static scene: reuse the last landmarks so duration timers keep running
+                drive(gate.last_landmarks, timestamp, frame.shape)
+            elif live_stream:
+                # Returns immediately; the result is queued by on_result
+                pose_estimator.submit(frame, timestamp)
+            else:
+                if tracker:
+                    landmarks = pose_estimator.detect_all(frame)
+                else:
+                    landmarks = pose_estimator.detect(frame, roi_tracker=roi_tracker)
+                latency.record("pose", timestamp)
+                fps.tick()
+                on_landmarks(landmarks, timestamp, frame.shape)
+
+            if not args.no_display:
+                for track_id, landmarks in latest_tracked[0]:
+                    draw_overlay(frame, landmarks, pipeline, track_id if tracker else None)
+                cv2.imshow("Advanced Fall Detection", frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
-                try:
-                    frame = buffer.get(timeout=0.1)
-                except:
-                    if not args.no_display:
-                         if cv2.waitKey(10) & 0xFF == ord('q'): break
-                    continue
-                
-                h, w, _ = frame.shape
-                timestamp = time.time()
-                
-                # MediaPipe Detection
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-                result = pose_detector.detect(mp_image)
-                
-                if result.pose_landmarks:
-                    landmarks = result.pose_landmarks[0]
-                    # Drive the pipeline
-                    pipeline.process_landmarks(timestamp, landmarks, frame.shape)
-                    
-                    # Visualization
-                    if not args.no_display:
-                        # Draw landmarks
-                        for lm in landmarks:
-                            cx, cy = int(lm.x * w), int(lm.y * h)
-                            cv2.circle(frame, (cx, cy), 3, (0, 255, 0), -1)
-                            
-                        # Draw State Info
-                        # Pipeline doesn't expose state easily purely via valid public API yet,
-                        # but we can infer or add getters. 
-                        # For MVP visualization:
-                        left_hip = landmarks[LEFT_HIP]
-                        right_hip = landmarks[RIGHT_HIP]
-                        center_y = (left_hip.y + right_hip.y) / 2.0
-                        state = "ON_FLOOR" if center_y > 0.7 else "STANDING"
-                        color = (0, 0, 255) if state == "ON_FLOOR" else (0, 255, 0)
-                        cv2.putText(frame, f"State: {state}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-                        
-                        if pipeline.on_floor_duration_seconds > 0:
-                             cv2.putText(frame, f"Time on Floor: {pipeline.on_floor_duration_seconds:.1f}s", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
 
-                if not args.no_display:
-                    cv2.imshow("Advanced Fall Detection", frame)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-        except KeyboardInterrupt:
-            logger.info("Stopped by user.")
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-        finally:
-            reader.stop()
-            cv2.destroyAllWindows()
-            logger.info("Shutdown complete.")
+            if time.monotonic() - last_report >= PERF_REPORT_INTERVAL:
+                log_performance(args.inference_mode, reader, fps, latency, gaps, gate)
+                last_report = time.monotonic()
+    except KeyboardInterrupt:
+        logger.info("Stopped by user.")
+    except Exception as e:
+        logger.error(f"Error in main loop: {e}")
+    finally:
+        reader.stop()
+        pose_estimator.close()
+        cv2.destroyAllWindows()
+        log_performance(args.inference_mode, reader, fps, latency, gaps, gate)
+        logger.info("Shutdown complete.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,321 @@
+import abc
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from shared.ids import uuid7
+
+logger = logging.getLogger("CompositeEngine")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+Event = Dict[str, Any]
+
+# Atomic event fed once per processed sample with the subject's coarse state
+POSTURE_STATE = "POSTURE_STATE"
+
+
+class Pattern:
+    """
+    Matches atomic events by event_type and an optional predicate.
+    """
+    __slots__ = ("event_type", "where")
+
+    def __init__(self, event_type: str, where: Optional[Callable[[Event], bool]] = None):
+        self.event_type = event_type
+        self.where = where
+
+    def matches(self, event: Event) -> bool:
+        return event.get("event_type") == self.event_type and (self.where is None or self.where(event))
+
+
+class Rule(abc.ABC):
+    """
+    A declared composite event. Subclasses define the temporal operator; compile()
+    returns a fresh incremental matcher (one per entity).
+
+    :param name: Composite event type emitted (e.g. "POTENTIAL_FALL").
+    :param confidence: confidence_hint of the emitted event.
+    :param log_state: COMPOSITE_EVENT log state ("OPEN" = needs confirmation, "CONFIRMED").
+    :param summary: reasoning_summary template, formatted with the match fields
+        (duration, count, window, threshold).
+    :param critical_reason: If set, a match forces a snapshot with this trigger reason.
+    """
+    def __init__(
+        self,
+        name: str,
+        confidence: float,
+        log_state: str = "OPEN",
+        summary: str = "",
+        critical_reason: Optional[str] = None
+    ):
+        self.name = name
+        self.confidence = confidence
+        self.log_state = log_state
+        self.summary = summary
+        self.critical_reason = critical_reason
+
+    @property
+    @abc.abstractmethod
+    def event_types(self) -> Iterable[str]:
+        """Atomic event types the rule consumes (the engine routes only these to it)."""
+
+    @abc.abstractmethod
+    def compile(self) -> "Matcher":
+        """A fresh matcher for one entity."""
+
+
+class Matcher(abc.ABC):
+    """
+    Incremental state machine of one rule for one entity.
+    feed() returns None or a match: (triggering event ids, fields for the composite event).
+    """
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def feed(self, event: Event) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+        """Advances the state machine by one event."""
+
+
+class Sequence(Rule):
+    """
+    Steps matched in order, the last one within `within` seconds of the first.
+    A single-step sequence fires on every matching event.
+    """
+    def __init__(self, name: str, steps: List[Pattern], within: float = float("inf"), max_partials: int = 32, **kwargs):
+        super().__init__(name, **kwargs)
+        if not steps:
+            raise ValueError("A sequence needs at least one step")
+        self.steps = steps
+        self.within = within
+        self.max_partials = max_partials
+
+    @property
+    def event_types(self) -> Iterable[str]:
+        return {step.event_type for step in self.steps}
+
+    def compile(self) -> Matcher:
+        return SequenceMatcher(self)
+
+
+class SequenceMatcher(Matcher):
+    __slots__ = ("rule", "partials")
+
+    def __init__(self, rule: Sequence):
+        self.rule = rule
+        # (start timestamp, matched event ids, index of the next step)
+        self.partials: deque = deque(maxlen=rule.max_partials)
+
+    def feed(self, event: Event):
+        rule = self.rule
+        now = event["timestamp"]
+        last_step = len(rule.steps) - 1
+        advanced = deque(maxlen=rule.max_partials)
+        completed = None
+
+        for start, chain, step in self.partials:
+            if now - start > rule.within:
+                continue  # Expired
+            if rule.steps[step].matches(event):
+                if step == last_step:
+                    completed = completed or (start, chain + [event.get("id")])
+                    continue
+                advanced.append((start, chain + [event.get("id")], step + 1))
+            else:
+                advanced.append((start, chain, step))
+
+        if completed is None and rule.steps[0].matches(event):
+            if last_step == 0:
+                completed = (now, [event.get("id")])
+            else:
+                advanced.append((now, [event.get("id")], 1))
+
+        self.partials = advanced
+        if completed is None:
+            return None
+        start, chain = completed
+        return chain, {"window": now - start, "threshold": rule.within}
+
+
+class Count(Rule):
+    """
+    At least `count` matching events within `within` seconds. The window restarts after a match.
+    """
+    def __init__(self, name: str, pattern: Pattern, count: int, within: float, **kwargs):
+        super().__init__(name, **kwargs)
+        self.pattern = pattern
+        self.count = count
+        self.within = within
+
+    @property
+    def event_types(self) -> Iterable[str]:
+        return {self.pattern.event_type}
+
+    def compile(self) -> Matcher:
+        return CountMatcher(self)
+
+
+class CountMatcher(Matcher):
+    __slots__ = ("rule", "seen")
+
+    def __init__(self, rule: Count):
+        self.rule = rule
+        self.seen: deque = deque()  # (timestamp, id)
+
+    def feed(self, event: Event):
+        rule = self.rule
+        if not rule.pattern.matches(event):
+            return None
+        now = event["timestamp"]
+        self.seen.append((now, event.get("id")))
+        while now - self.seen[0][0] > rule.within:
+            self.seen.popleft()
+        if len(self.seen) < rule.count:
+            return None
+        chain = [event_id for _, event_id in self.seen]
+        window = now - self.seen[0][0]
+        self.seen.clear()
+        return chain, {"count": len(chain), "window": window, "threshold": rule.count}
+
+
+class Duration(Rule):
+    """
+    A condition held continuously for `seconds` (fires once per episode).
+
+    Events of the pattern's event_type are observations: those matching the predicate
+    extend the episode, any other observation of that type ends it.
+
+    :param duration_key: Field of the composite event that carries the held duration.
+    """
+    def __init__(self, name: str, pattern: Pattern, seconds: float, duration_key: str = "duration", **kwargs):
+        super().__init__(name, **kwargs)
+        self.pattern = pattern
+        self.seconds = seconds
+        self.duration_key = duration_key
+
+    @property
+    def event_types(self) -> Iterable[str]:
+        return {self.pattern.event_type}
+
+    def compile(self) -> Matcher:
+        return DurationMatcher(self)
+
+
+class DurationMatcher(Matcher):
+    __slots__ = ("rule", "since", "fired")
+
+    def __init__(self, rule: Duration):
+        self.rule = rule
+        self.since: Optional[float] = None
+        self.fired = False
+
+    def feed(self, event: Event):
+        rule = self.rule
+        now = event["timestamp"]
+        if not rule.pattern.matches(event):
+            self.since = None
+            self.fired = False
+            return None
+        if self.since is None:
+            self.since = now
+        held = now - self.since
+        if held >= rule.seconds and not self.fired:
+            self.fired = True
+            return [], {"duration": held, "threshold": rule.seconds}
+        return None
+
+
+class CompositeMatch:
+    """
+    A fired rule: the composite event plus the match fields used for logging.
+    """
+    __slots__ = ("rule", "event", "fields")
+
+    def __init__(self, rule: Rule, event: Event, fields: Dict[str, Any]):
+        self.rule = rule
+        self.event = event
+        self.fields = fields
+
+    @property
+    def summary(self) -> str:
+        return self.rule.summary.format(**self.fields)
+
+
+class CompositeEventEngine:
+    """
+    Evaluates declared composite-event rules over the atomic event stream.
+
+    Matchers are created lazily per (rule, entity_id), so several tracked people never
+    share partial matches. Each event is only offered to the rules that reference its
+    event_type, and each matcher does work proportional to its active partial matches.
+    """
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self._by_type: Dict[str, List[int]] = {}
+        for idx, rule in enumerate(self.rules):
+            for event_type in rule.event_types:
+                self._by_type.setdefault(event_type, []).append(idx)
+        self._matchers: Dict[Tuple[int, str], Matcher] = {}
+
+    def process(self, event: Event) -> List[CompositeMatch]:
+        """
+        Feeds one atomic event; returns a CompositeMatch for every rule it completes.
+        """
+        entity_id = event.get("entity_id", "person_0")
+        results = []
+        for idx in self._by_type.get(event.get("event_type"), ()):
+            key = (idx, entity_id)
+            matcher = self._matchers.get(key)
+            if matcher is None:
+                matcher = self._matchers[key] = self.rules[idx].compile()
+            match = matcher.feed(event)
+            if match is not None:
+                results.append(self._build(self.rules[idx], event, entity_id, *match))
+        return results
+
+    def drop_entity(self, entity_id: str) -> None:
+        """Forgets all partial matches of an entity (e.g. an evicted track)."""
+        for key in [k for k in self._matchers if k[1] == entity_id]:
+            del self._matchers[key]
+
+    @staticmethod
+    def _build(rule: Rule, event: Event, entity_id: str, chain: List[str], fields: Dict[str, Any]) -> CompositeMatch:
+        composite = {
+            "id": uuid7(event["timestamp"]),
+            "event_type": rule.name,
+            "event_category": "composite",
+            "entity_id": entity_id,
+            "timestamp": event["timestamp"],
+            "event_chain": chain,
+            "confidence_hint": rule.confidence
+        }
+        if isinstance(rule, Duration):
+            composite[rule.duration_key] = fields["duration"]
+        return CompositeMatch(rule, composite, fields)
+
+
+def default_fall_rules(motion_threshold: float, t_confirm_fall: float) -> List[Rule]:
+    """
+    The pipeline's built-in composite events:
+    - POTENTIAL_FALL: a RAPID_VERTICAL_MOVEMENT whose drop exceeds 1.5x the motion threshold.
+    - CONFIRMED_FALL_BY_DURATION: ON_FLOOR held for t_confirm_fall seconds.
+    """
+    return [
+        Sequence(
+            "POTENTIAL_FALL",
+            steps=[Pattern("RAPID_VERTICAL_MOVEMENT", where=lambda e: e["raw_value"] > motion_threshold * 1.5)],
+            confidence=0.85,
+            log_state="OPEN",
+            summary="Rapid vertical movement",
+            critical_reason="CRITICAL_EVENT"
+        ),
+        Duration(
+            "CONFIRMED_FALL_BY_DURATION",
+            pattern=Pattern(POSTURE_STATE, where=lambda e: e["state"] == "ON_FLOOR"),
+            seconds=t_confirm_fall,
+            duration_key="on_floor_duration",
+            confidence=0.95,
+            log_state="CONFIRMED",
+            summary="Person on floor for {duration:.1f}s (Threshold: {threshold}s)",
+            critical_reason="CONFIRMED_FALL_BY_DURATION"
+        )
+    ]
@@ -1,8 +1,12 @@
 import time
-import uuid
 import logging
 from typing import Dict, Any, Optional, List
 from shared.logging_contracts import emit_log
+from shared.ids import uuid7
+from shared.metrics import StageLatencyTracker
+from processing.landmarks import PoseFeatures, landmarks_to_array, compute_features
+from processing.pose_tracker import PoseTracker
+from pipeline.composite_engine import CompositeEventEngine, CompositeMatch, Rule, POSTURE_STATE, default_fall_rules
 from analysis.analysis_snapshot import AnalysisSnapshotEngine
 from decision.decision_engine import DecisionEngine
 from decision.llm_arbiter import LLMDecisionArbiter
@@ -12,17 +16,52 @@ logger = logging.getLogger("FallPipeline")
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
+# Track id used when a single subject is assumed (no PoseTracker)
+DEFAULT_TRACK_ID = "person_0"
+
+
+class TrackState:
+    """
+    Per-subject motion and floor-duration state, one per track id.
+    """
+    __slots__ = (
+        "track_id", "prev_center_y", "prev_time", "last_event_time",
+        "floor_enter_time", "on_floor_duration_seconds",
+        "last_observed_state", "last_features", "last_seen"
+    )
+
+    def __init__(self, track_id: str):
+        self.track_id = track_id
+        # Atomic Events State
+        self.prev_center_y = None
+        self.prev_time = None
+        # None (not 0) so media-time clocks starting at 0 are not held back by the cooldown
+        self.last_event_time = None
+        self.last_features: Optional[PoseFeatures] = None
+        # ON_FLOOR Tracking
+        self.floor_enter_time = None
+        self.on_floor_duration_seconds = 0.0
+        self.last_observed_state = None
+        self.last_seen = None
+
+
 class FallDetectionPipeline:
     """
     Encapsulates the logic for detecting falls, managing events, and generating decisions/alerts.
     Designed to be driven by either a camera feed (real-time) or a simulation (deterministic).
     """
 
-    def __init__(self):
+    def __init__(self, latency_tracker: Optional[StageLatencyTracker] = None, rules: Optional[List[Rule]] = None):
+        """
+        :param latency_tracker: If set, records capture-to-event and capture-to-decision latency.
+            Only meaningful when timestamps are wall-clock capture times (camera mode).
+        :param rules: Composite-event rules (default: default_fall_rules for this configuration).
+        """
         # Components
         self.snapshot_engine = AnalysisSnapshotEngine()
         self.decision_engine = DecisionEngine()
         self.llm_arbiter = LLMDecisionArbiter(enabled=True)
+        self.latency_tracker = latency_tracker
 
         # State Configuration
         self.motion_threshold = 0.18
@@ -30,16 +69,19 @@ class FallDetectionPipeline:
         self.snapshot_interval = 10.0
         self.t_confirm_fall = 25.0
 
+        # Composite events are declared as rules over the atomic event stream
+        self.composite_engine = CompositeEventEngine(
+            rules if rules is not None else default_fall_rules(self.motion_threshold, self.t_confirm_fall)
+        )
+
         # Runtime State
         self.recent_events = []
         self.last_snapshot_time = 0
-        self.last_event_time = 0
         self.frame_count = 0
-        
-        # ON_FLOOR Tracking
-        self.floor_enter_time = None
-        self.on_floor_duration_seconds = 0.0
-        self.duration_fall_emitted = False
+
+        # Per-subject state, keyed by track id
+        self.tracks: Dict[str, TrackState] = {}
+        self.last_track_id: Optional[str] = None
         
         # Snapshot Deduplication
         self.last_snapshot_state = None
@@ -47,50 +89,104 @@ class FallDetectionPipeline:
         self.critical_event_occurred = False
         self.critical_event_reason = None
         self.state_change_occurred = False
-        self.last_observed_state = None
-        
-        # Atomic Events State (for Camera)
-        self.prev_center_y = None
-        self.prev_time = None
-        self.last_event_time = 0
 
-    def process_landmarks(self, timestamp: float, landmarks: Any, frame_shape: tuple):
+    @property
+    def on_floor_duration_seconds(self) -> float:
+        """Longest current time on the floor across tracked subjects."""
+        return max((t.on_floor_duration_seconds for t in self.tracks.values()), default=0.0)
+
+    @property
+    def last_features(self) -> Optional[PoseFeatures]:
+        """Features of the most recently processed subject."""
+        track = self.tracks.get(self.last_track_id)
+        return track.last_features if track else None
+
+    def _track(self, track_id: str, now: float) -> TrackState:
+        track = self.tracks.get(track_id)
+        if track is None:
+            track = self.tracks[track_id] = TrackState(track_id)
+        track.last_seen = now
+        self.last_track_id = track_id
+        return track
+
+    def drop_track(self, track_id: str):
+        """
+        Forgets a subject's state (called when the tracker evicts the track).
+        """
+        self.composite_engine.drop_entity(track_id)
+        if self.tracks.pop(track_id, None) is not None:
+            logger.info(f"Dropped state for {track_id}")
+
+    def process_landmarks(
+        self,
+        timestamp: float,
+        landmarks: Any,
+        frame_shape: tuple,
+        features: Optional[PoseFeatures] = None,
+        track_id: str = DEFAULT_TRACK_ID,
+        manage_snapshots: bool = True
+    ) -> str:
         """
         Process landmarks from a camera frame.
+        timestamp should be the frame's capture time (FrameEnvelope.capture_time) so that
+        motion math is not skewed by queueing delay.
+        landmarks is a (33, 4) landmark array (MediaPipe landmark lists are converted);
+        pass features if they were already computed for this frame.
+        track_id identifies the subject when several people are tracked (PoseTracker).
+        Returns the subject's posture state; see process_state for manage_snapshots.
         """
-        h, w = frame_shape[:2]
-        LEFT_HIP = 23
-        RIGHT_HIP = 24
-        
-        left_hip = landmarks[LEFT_HIP]
-        right_hip = landmarks[RIGHT_HIP]
-        center_y = (left_hip.y + right_hip.y) / 2.0
-        
+        if features is None:
+            features = compute_features(landmarks_to_array(landmarks))
+        track = self._track(track_id, timestamp)
+        track.last_features = features
+        center_y = features.hip_center[1]
+
         # Determine current state based on vertical position
         current_state = "ON_FLOOR" if center_y > 0.7 else "STANDING"
         
         # Atomic Logic (Motion)
-        self._process_atomic_motion(timestamp, center_y)
+        self._process_atomic_motion(track, timestamp, center_y)
         
         # Delegate to state processing
-        self.process_state(timestamp, current_state)
+        self.process_state(timestamp, current_state, track_id, manage_snapshots)
+        return current_state
 
-    def _process_atomic_motion(self, now: float, center_y: float):
-        if self.prev_center_y is not None and self.prev_time is not None:
-            dy = center_y - self.prev_center_y
-            dt = now - self.prev_time
+    def process_poses(self, timestamp: float, poses: List[Any], frame_shape: tuple, tracker: PoseTracker) -> List[tuple]:
+        """
+        Multi-person entry point: assigns each detected pose to a track and processes it
+        with that track's state, then drops the state of tracks the tracker evicted.
+        Snapshots are managed once per frame, after all tracks, and deduplicated on the
+        frame's (track_id, state) pairs so one subject's snapshot does not mask another's.
+        Frames without poses still manage snapshots (state ()), so the TIMER keeps firing
+        while a fallen subject is occluded.
+        Returns the (track_id, landmarks) assignments.
+        """
+        tracked = tracker.assign(poses, timestamp)
+        states = [
+            (track_id, self.process_landmarks(timestamp, landmarks, frame_shape, track_id=track_id, manage_snapshots=False))
+            for track_id, landmarks in tracked
+        ]
+        self._manage_snapshots(timestamp, tuple(sorted(states)))
+        for track_id in tracker.evict(timestamp):
+            self.drop_track(track_id)
+        return tracked
+
+    def _process_atomic_motion(self, track: TrackState, now: float, center_y: float):
+        if track.prev_center_y is not None and track.prev_time is not None:
+            dy = center_y - track.prev_center_y
+            dt = now - track.prev_time
             
             velocity_y = dy / dt if dt > 0 else 0
             
             threshold_passed = (
                 dy > self.motion_threshold
                 and dt < 0.6
-                and (now - self.last_event_time) > self.cooldown_seconds
+                and (track.last_event_time is None or (now - track.last_event_time) > self.cooldown_seconds)
             )
             
             # Simplified Atomic Event Emission for Pipeline
             if threshold_passed:
-                atomic_event_id = str(uuid.uuid4())
+                atomic_event_id = uuid7(now)
                 confidence = min(abs(dy) / (self.motion_threshold * 2), 1.0)
                 
                 # Emit atomic event log
@@ -99,6 +195,7 @@ class FallDetectionPipeline:
                     payload={
                         "event_id": atomic_event_id,
                         "event_type": "RAPID_VERTICAL_MOVEMENT",
+                        "entity_id": track.track_id,
                         "raw_value": float(dy),
                         "decision": "TRIGGERED"
                     },
@@ -110,116 +207,98 @@ class FallDetectionPipeline:
                     "id": atomic_event_id,
                     "event_type": "RAPID_VERTICAL_MOVEMENT",
                     "event_category": "motion",
+                    "entity_id": track.track_id,
                     "timestamp": now,
+                    "raw_value": float(dy),
                     "confidence_hint": confidence
                 }
                 self.recent_events.append(event_data)
+                if self.latency_tracker:
+                    self.latency_tracker.record("event", now)
                 
-                # Check for POTENTIAL_FALL composite
-                if dy > (self.motion_threshold * 1.5):
-                    self._trigger_potential_fall(now, atomic_event_id, dt)
+                # Composite rules (e.g. POTENTIAL_FALL)
+                self._feed_composites(event_data)
                     
-                self.last_event_time = now
+                track.last_event_time = now
                 
-        self.prev_center_y = center_y
-        self.prev_time = now
-
-    def _trigger_potential_fall(self, now: float, trigger_id: str, time_window: float):
-        composite_id = str(uuid.uuid4())
-        composite_event = {
-            "id": composite_id,
-            "event_type": "POTENTIAL_FALL",
-            "event_category": "composite",
-            "timestamp": now,
-            "event_chain": [trigger_id],
-            "confidence_hint": 0.85
-        }
+        track.prev_center_y = center_y
+        track.prev_time = now
+
+    def _feed_composites(self, event: Dict[str, Any]):
+        for match in self.composite_engine.process(event):
+            self._emit_composite(match)
+
+    def _emit_composite(self, match: CompositeMatch):
+        composite_event = match.event
+        composite_id = composite_event["id"]
         self.recent_events.append(composite_event)
-        
+
+        if match.rule.log_state == "CONFIRMED":
+            logger.info(f"⏳ {composite_event['event_type']} triggered for {composite_event['entity_id']}: {match.summary}")
+
         emit_log(
             log_type="COMPOSITE_EVENT",
             payload={
                 "composite_event_id": composite_id,
-                "composite_type": "POTENTIAL_FALL",
-                "state": "OPEN",
-                "reasoning_summary": "Rapid vertical movement"
+                "composite_type": composite_event["event_type"],
+                "entity_id": composite_event["entity_id"],
+                "triggering_events": composite_event["event_chain"],
+                "time_window_seconds": float(match.fields.get("duration", match.fields.get("window", 0.0))),
+                "confidence": composite_event["confidence_hint"],
+                "state": match.rule.log_state,
+                "reasoning_summary": match.summary
             },
             trace_id=composite_id,
             component="composite_event_detector"
         )
-        
-        self.critical_event_occurred = True
-        self.critical_event_reason = "CRITICAL_EVENT"
 
-    def process_state(self, timestamp: float, current_state: str):
+        if match.rule.critical_reason:
+            self.critical_event_occurred = True
+            self.critical_event_reason = match.rule.critical_reason
+
+    def process_state(
+        self,
+        timestamp: float,
+        current_state: str,
+        track_id: str = DEFAULT_TRACK_ID,
+        manage_snapshots: bool = True
+    ):
         """
         Process a single time step based on explicit state (e.g., from Simulation).
         Does NOT process landmarks/motion, only state-based logic (Duration).
+        manage_snapshots=False leaves snapshot management to the caller, which must then
+        run it once per frame (process_poses does, after all tracks).
         """
-        self._update_floor_duration(timestamp, current_state)
-        self._check_duration_fall(timestamp, current_state)
-        self._check_state_transition(current_state)
-        self._manage_snapshots(timestamp, current_state)
+        track = self._track(track_id, timestamp)
+        self._update_floor_duration(track, timestamp, current_state)
+        # Posture observation for duration rules (e.g. CONFIRMED_FALL_BY_DURATION)
+        self._feed_composites({
+            "event_type": POSTURE_STATE,
+            "entity_id": track_id,
+            "timestamp": timestamp,
+            "state": current_state
+        })
+        self._check_state_transition(track, current_state)
+        if manage_snapshots:
+            self._manage_snapshots(timestamp, current_state)
 
-    def _update_floor_duration(self, now: float, current_state: str):
+    def _update_floor_duration(self, track: TrackState, now: float, current_state: str):
         if current_state == "ON_FLOOR":
-            if self.floor_enter_time is None:
-                self.floor_enter_time = now
-            self.on_floor_duration_seconds = now - self.floor_enter_time
+            if track.floor_enter_time is None:
+                track.floor_enter_time = now
+            track.on_floor_duration_seconds = now - track.floor_enter_time
         else:
-            self.floor_enter_time = None
-            self.on_floor_duration_seconds = 0.0
-            self.duration_fall_emitted = False
-
-    def _check_duration_fall(self, now: float, current_state: str):
-        if (current_state == "ON_FLOOR" and 
-            self.on_floor_duration_seconds >= self.t_confirm_fall and 
-            not self.duration_fall_emitted):
-            
-            self.duration_fall_emitted = True
-            composite_id = str(uuid.uuid4())
-            
-            logger.info(f"⏳ CONFIRMED_FALL_BY_DURATION triggered ({self.on_floor_duration_seconds:.1f}s)")
-            
-            # Create event object
-            composite_event = {
-                "id": composite_id,
-                "event_type": "CONFIRMED_FALL_BY_DURATION",
-                "event_category": "composite",
-                "timestamp": now,
-                "event_chain": [], 
-                "confidence_hint": 0.95,
-                "on_floor_duration": self.on_floor_duration_seconds
-            }
-            self.recent_events.append(composite_event)
-            
-            # Emit log
-            emit_log(
-                log_type="COMPOSITE_EVENT",
-                payload={
-                    "composite_event_id": composite_id,
-                    "composite_type": "CONFIRMED_FALL_BY_DURATION",
-                    "triggering_events": [],
-                    "time_window_seconds": float(self.on_floor_duration_seconds),
-                    "confidence": 0.95,
-                    "state": "CONFIRMED",
-                    "reasoning_summary": f"Person on floor for {self.on_floor_duration_seconds:.1f}s (Threshold: {self.t_confirm_fall}s)"
-                },
-                trace_id=composite_id,
-                component="composite_event_detector"
-            )
-            
-            self.critical_event_occurred = True
-            self.critical_event_reason = "CONFIRMED_FALL_BY_DURATION"
+            track.floor_enter_time = None
+            track.on_floor_duration_seconds = 0.0
 
-    def _check_state_transition(self, current_state: str):
-        if self.last_observed_state is not None and self.last_observed_state != current_state:
-            if "ON_FLOOR" in [self.last_observed_state, current_state]:
+    def _check_state_transition(self, track: TrackState, current_state: str):
+        if track.last_observed_state is not None and track.last_observed_state != current_state:
+            if "ON_FLOOR" in [track.last_observed_state, current_state]:
                 self.state_change_occurred = True
-                logger.info(f"🔄 State transition: {self.last_observed_state} → {current_state}")
-        self.last_observed_state = current_state
+                logger.info(f"🔄 State transition ({track.track_id}): {track.last_observed_state} → {current_state}")
+        track.last_observed_state = current_state
 
-    def _manage_snapshots(self, now: float, current_state: str):
+    def _manage_snapshots(self, now: float, current_state: Any):
         trigger_reason = None
         should_generate_snapshot = False
         
@@ -298,5 +377,8 @@ class FallDetectionPipeline:
             on_floor_duration_seconds=self.on_floor_duration_seconds
         )
         
+        if self.latency_tracker:
+            self.latency_tracker.record("decision", now)
+
         # Clear/Aging logic for events could go here, for now strictly clear
         self.recent_events = []
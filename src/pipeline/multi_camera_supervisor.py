@@ -0,0 +1,255 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, List, Any, Optional
+from camera.rtsp_reader import RTSPReader
+from camera.frame_mailbox import create_frame_buffer
+from camera.frame_envelope import FrameEnvelope
+from pipeline.fall_pipeline import FallDetectionPipeline
+from processing.motion_gate import MotionGate
+from processing.roi_tracker import RoiTracker
+from processing.pose_tracker import PoseTracker
+from shared.metrics import RateMeter, StageLatencyTracker, SequenceGapTracker
+
+logger = logging.getLogger("MultiCameraSupervisor")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+
+class CameraChannel:
+    """
+    Everything owned by a single camera: reader, buffer, pipeline and counters.
+    The lock guarantees a camera's frames are processed by one worker at a time, in order.
+    """
+    def __init__(
+        self,
+        camera_id: str,
+        source: str,
+        buffer_size: int = 1,
+        gate: Optional[MotionGate] = None,
+        reader_options: Optional[Dict[str, Any]] = None,
+        roi_tracker: Optional[RoiTracker] = None,
+        pose_tracker: Optional[PoseTracker] = None
+    ):
+        self.camera_id = camera_id
+        self.source = source
+        self.buffer = create_frame_buffer(max_size=buffer_size)
+        self.reader = RTSPReader(rtsp_url=source, frame_buffer=self.buffer, source_id=camera_id, **(reader_options or {}))
+        self.latency = StageLatencyTracker()
+        self.gaps = SequenceGapTracker()
+        self.pipeline = FallDetectionPipeline(latency_tracker=self.latency)
+        self.fps = RateMeter()
+        self.gate = gate
+        self.roi_tracker = roi_tracker
+        self.pose_tracker = pose_tracker
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return not self.reader.running and self.buffer.empty()
+
+
+class MultiCameraSupervisor:
+    """
+    Runs N camera readers and fans their frames into a fixed pool of pose workers.
+
+    Each worker thread owns its own PoseLandmarker and serves every camera round-robin,
+    so throughput scales with the worker count instead of with one process per camera.
+    Each camera keeps its own FallDetectionPipeline.
+
+    Scaling limit: workers are threads. Pose inference runs in MediaPipe's native code and
+    overlaps across workers, but the per-frame Python work (landmark conversion, motion
+    gate, pipeline) holds the GIL and is serialized across all cameras. Aggregate
+    throughput therefore tops out near 1 / (Python time per frame), whatever the core
+    count. That Python time is small next to inference, so threads scale up to about
+    one worker per core; test_multi_camera_benchmark.py measures both parts. Past the
+    ceiling, run several processes (e.g. one supervisor per group of cameras).
+    """
+    def __init__(
+        self,
+        sources: Dict[str, str],
+        num_workers: Optional[int] = None,
+        buffer_size: int = 1,
+        model_path: Optional[str] = None,
+        report_interval: float = 10.0,
+        gate_factory: Optional[Callable[[], MotionGate]] = None,
+        target_fps: Optional[float] = None,
+        skip_when_busy: bool = False,
+        roi_tracking: bool = False,
+        num_poses: int = 1,
+        estimator_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        :param sources: Mapping of camera_id -> source (RTSP url, file path or webcam index).
+        :param num_workers: Pose worker threads (default: min(cameras, CPU count)).
+        :param buffer_size: Per-camera frame buffer size.
+        :param model_path: PoseLandmarker model used by every worker (default: PoseEstimator's).
+        :param report_interval: Seconds between stats reports in run().
+        :param gate_factory: Builds one MotionGate per camera (None = infer every frame).
+        :param target_fps: Per-camera decode cap passed to RTSPReader (None = every frame).
+        :param skip_when_busy: Readers only decode when the previous frame was taken.
+        :param roi_tracking: Run inference on a per-camera tracked crop (RoiTracker).
+            Ignored when num_poses > 1.
+        :param num_poses: People detected per frame; above 1 each camera tracks them
+            (PoseTracker) and keeps per-person pipeline state.
+        :param estimator_factory: Builds each worker's estimator (default: a PoseEstimator
+            for model_path and num_poses).
+        """
+        if not sources:
+            raise ValueError("At least one camera source is required.")
+
+        reader_options = {"target_fps": target_fps, "skip_when_busy": skip_when_busy}
+        self.channels: List[CameraChannel] = [
+            CameraChannel(
+                camera_id, source, buffer_size,
+                gate=gate_factory() if gate_factory else None,
+                reader_options=reader_options,
+                roi_tracker=RoiTracker() if roi_tracking and num_poses == 1 else None,
+                pose_tracker=PoseTracker() if num_poses > 1 else None
+            )
+            for camera_id, source in sources.items()
+        ]
+        self.num_workers = num_workers or min(len(self.channels), os.cpu_count() or 1)
+        self.model_path = model_path
+        self.num_poses = num_poses
+        self.estimator_factory = estimator_factory or self._create_estimator
+        self.report_interval = report_interval
+
+        self._workers: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start all readers and the pose worker pool."""
+        self._stop_event.clear()
+        for channel in self.channels:
+            channel.reader.start()
+
+        for idx in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, args=(idx,), name=f"pose-worker-{idx}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"Supervisor started: {len(self.channels)} cameras, {self.num_workers} pose workers")
+
+    def stop(self):
+        """Stop readers and workers."""
+        self._stop_event.set()
+        for channel in self.channels:
+            channel.reader.stop()
+        for worker in self._workers:
+            worker.join(timeout=2.0)
+        self._workers = []
+        logger.info("Supervisor stopped")
+
+    def run(self):
+        """
+        Blocks until every source is exhausted (or stop() is called), reporting stats periodically.
+        """
+        self.start()
+        last_report = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                if all(channel.finished for channel in self.channels):
+                    break
+                self._stop_event.wait(0.5)
+
+                if time.monotonic() - last_report >= self.report_interval:
+                    self.report()
+                    last_report = time.monotonic()
+        finally:
+            self.stop()
+            self.report()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-camera counters: achieved FPS, processed frames, dropped frames (buffer drops and
+        sequence gaps seen by the workers), frames grab-skipped before decode, reader status, the motion gate's skip ratio
+        (0.0 when gating is disabled) and capture-to-stage latency summaries.
+        """
+        return {
+            channel.camera_id: {
+                "fps": channel.fps.rate(),
+                "processed": channel.fps.total,
+                "dropped": channel.buffer.dropped,
+                "sequence_gaps": channel.gaps.missing,
+                "decode_skipped": channel.reader.frames_skipped,
+                "running": channel.reader.running,
+                "skip_ratio": channel.gate.skip_ratio if channel.gate else 0.0,
+                "latency": channel.latency.summary()
+            }
+            for channel in self.channels
+        }
+
+    def report(self):
+        for camera_id, s in self.stats().items():
+            latency = " ".join(
+                f"{stage}_p95={lat['p95_ms']:.0f}ms" for stage, lat in s["latency"].items()
+            )
+            logger.info(
+                f"[{camera_id}] fps={s['fps']:.1f} processed={s['processed']} "
+                f"dropped={s['dropped']} gaps={s['sequence_gaps']} decode_skipped={s['decode_skipped']} skip_ratio={s['skip_ratio']:.2f} "
+                f"running={s['running']} {latency}"
+            )
+
+    def _create_estimator(self):
+        from processing.pose_estimator import PoseEstimator
+        if self.model_path:
+            return PoseEstimator(self.model_path, num_poses=self.num_poses)
+        return PoseEstimator(num_poses=self.num_poses)
+
+    def _worker_loop(self, worker_idx: int):
+        # PoseLandmarker graphs are not shared between threads
+        estimator = self.estimator_factory()
+        n = len(self.channels)
+
+        try:
+            while not self._stop_event.is_set():
+                processed_any = False
+
+                # Start at a different camera per worker to spread the load
+                for offset in range(n):
+                    channel = self.channels[(worker_idx + offset) % n]
+                    if not channel.lock.acquire(blocking=False):
+                        continue
+                    try:
+                        try:
+                            packet = channel.buffer.get(block=False)
+                        except queue.Empty:
+                            continue
+                        self._process_frame(channel, estimator, packet)
+                        processed_any = True
+                    finally:
+                        channel.lock.release()
+
+                if not processed_any:
+                    self._stop_event.wait(0.005)
+        finally:
+            estimator.close()
+
+    def _process_frame(self, channel: CameraChannel, estimator: Any, packet: FrameEnvelope):
+        channel.gaps.observe(packet.seq)
+        frame = packet.image
+        timestamp = packet.capture_time
+        gate = channel.gate
+        try:
+            if gate and not gate.should_infer(frame, timestamp):
+                # Static scene: reuse the last landmarks so duration timers keep running
+                landmarks = gate.last_landmarks
+            else:
+                if channel.pose_tracker:
+                    landmarks = estimator.detect_all(frame)
+                else:
+                    landmarks = estimator.detect(frame, roi_tracker=channel.roi_tracker)
+                channel.latency.record("pose", timestamp)
+                if gate:
+                    gate.remember(landmarks)
+            if channel.pose_tracker:
+                # landmarks is a list of poses here
+                channel.pipeline.process_poses(timestamp, landmarks or [], frame.shape, channel.pose_tracker)
+            elif landmarks is not None:
+                channel.pipeline.process_landmarks(timestamp, landmarks, frame.shape)
+        except Exception as e:
+            logger.exception(f"[{channel.camera_id}] Error processing frame: {e}")
+        channel.fps.tick()
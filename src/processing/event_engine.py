@@ -1,6 +1,7 @@
 import time
 import logging
-from typing import List, Dict, Any, Set
+import numpy as np
+from typing import List, Dict, Any, Optional, Set
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +17,23 @@ class EventEngine:
     STATE_STILL = "STILL"
     STATE_MOVING = "MOVING"
 
-    def __init__(self, cooldown: float = 2.0, immobile_milestones: List[float] = None):
+    def __init__(
+        self,
+        cooldown: float = 2.0,
+        immobile_milestones: List[float] = None,
+        zone_mask: Optional[np.ndarray] = None,
+        zone_threshold: float = 0.02
+    ):
         """
         :param cooldown: Seconds of no motion required to transition from MOVING to STILL.
         :param immobile_milestones: List of seconds to trigger immobile events (e.g. [5, 10, 30]).
+        :param zone_mask: (rows, cols) booleans for process_zones(); False cells are ignored.
+        :param zone_threshold: Fraction of a cell's pixels that must change for it to count as moving.
         """
         self.cooldown = cooldown
         self.immobile_milestones = sorted(immobile_milestones) if immobile_milestones else [5.0, 10.0, 30.0, 60.0]
+        self.zone_mask = np.asarray(zone_mask, dtype=bool) if zone_mask is not None else None
+        self.zone_threshold = zone_threshold
         
         self.state = self.STATE_STILL
         self.last_motion_time = 0.0
@@ -30,6 +41,23 @@ class EventEngine:
         # Track which milestones have been emitted for the current STILL session
         self.emitted_milestones: Set[float] = set()
 
+    def process_zones(self, zone_motion: np.ndarray, timestamp: float) -> List[Dict[str, Any]]:
+        """
+        Like process(), from MotionAnalyzer.zone_motion: motion counts only in cells enabled
+        in zone_mask whose moving fraction exceeds zone_threshold.
+        MOTION_STARTED events list the moving cells as (row, col) pairs.
+        """
+        moving_cells = zone_motion > self.zone_threshold
+        if self.zone_mask is not None:
+            moving_cells &= self.zone_mask
+        is_moving = bool(moving_cells.any())
+
+        events = self.process(is_moving, timestamp)
+        for event in events:
+            if event["type"] == EVENT_MOTION_STARTED:
+                event["zones"] = [tuple(cell) for cell in np.argwhere(moving_cells).tolist()]
+        return events
+
     def process(self, is_moving: bool, timestamp: float) -> List[Dict[str, Any]]:
         """
         Process the current motion state and return generated events.
@@ -83,3 +111,90 @@ class EventEngine:
                         })
 
         return events
+
+    def process_batch(self, is_moving: np.ndarray, timestamps: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Processes a whole trace at once; returns the same events, in the same order, as
+        calling process() for every sample, and leaves the engine in the same state
+        (so a long trace can be fed in chunks).
+
+        Work is per run of equal is_moving values rather than per sample: the MOVING ->
+        STILL transition and every milestone crossing are located with searchsorted.
+        timestamps must be non-decreasing.
+        """
+        moving = np.asarray(is_moving, dtype=bool)
+        ts = np.asarray(timestamps, dtype=np.float64)
+        if moving.ndim != 1 or moving.shape != ts.shape:
+            raise ValueError("is_moving and timestamps must be 1-D arrays of the same length")
+        n = ts.shape[0]
+        if n == 0:
+            return []
+        if np.any(ts[1:] < ts[:-1]):
+            raise ValueError("timestamps must be non-decreasing")
+
+        # Run-length encoding of is_moving
+        change = np.flatnonzero(moving[1:] != moving[:-1]) + 1
+        run_starts = np.concatenate(([0], change)).tolist()
+        run_ends = np.concatenate((change, [n])).tolist()
+
+        found = []  # (sample index, order within the sample, event)
+        for start, end in zip(run_starts, run_ends):
+            if moving[start]:
+                if self.state == self.STATE_STILL:
+                    timestamp = float(ts[start])
+                    self.state = self.STATE_MOVING
+                    self.state_start_time = timestamp
+                    self.emitted_milestones.clear()
+                    found.append((start, 0, {
+                        "type": EVENT_MOTION_STARTED,
+                        "timestamp": timestamp,
+                        "message": "Motion started detected"
+                    }))
+                self.last_motion_time = float(ts[end - 1])
+                continue
+
+            still_from = start
+            if self.state == self.STATE_MOVING:
+                # First sample of the run past the cooldown (last_motion_time is fixed within it)
+                since_motion = ts[start:end] - self.last_motion_time
+                stop = start + int(np.searchsorted(since_motion, self.cooldown, side="right"))
+                if stop == end:
+                    continue
+                timestamp = float(ts[stop])
+                self.state = self.STATE_STILL
+                self.state_start_time = timestamp
+                self.emitted_milestones.clear()
+                found.append((stop, 0, {
+                    "type": EVENT_MOTION_STOPPED,
+                    "timestamp": timestamp,
+                    "duration": timestamp - self.state_start_time,
+                    "message": "Motion stopped (cooldown elapsed)"
+                }))
+                # Milestones are not checked on the transition sample itself
+                still_from = stop + 1
+
+            if still_from < end:
+                self._batch_milestones(ts, still_from, end, found)
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [event for _, _, event in found]
+
+    def _batch_milestones(self, ts: np.ndarray, start: int, end: int, found: list) -> None:
+        """
+        Appends the IMMOBILE_UPDATE events of STILL samples ts[start:end].
+        """
+        still_for = ts[start:end] - self.state_start_time
+        for order, milestone in enumerate(self.immobile_milestones):
+            if milestone in self.emitted_milestones:
+                continue
+            idx = int(np.searchsorted(still_for, milestone, side="left"))
+            if idx == still_for.shape[0]:
+                break  # Milestones are sorted: later ones are not reached either
+            self.emitted_milestones.add(milestone)
+            found.append((start + idx, order, {
+                "type": EVENT_IMMOBILE,
+                "timestamp": float(ts[start + idx]),
+                "duration": float(still_for[idx]),
+                "milestone_seconds": milestone,
+                "message": f"Immobile for {milestone} seconds"
+            }))
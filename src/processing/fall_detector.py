@@ -1,70 +1,86 @@
 import time
-import math
+import numpy as np
 from collections import deque
+from typing import Any, Callable, Dict, List
+from processing.landmarks import (
+    PoseFeatures, landmarks_to_array, compute_features,
+    Y, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP
+)
+
+# Minimum seconds between two reported falls
+REFRACTORY_SECONDS = 2.0
 
 class FallDetector:
+    """
+    Flags a fall when the body drops more than min_drop_ratio (normalized y) below
+    the highest point seen in the last window_seconds while the torso is upright-ish.
+
+    The window peak is tracked with a monotonic deque, so each update is amortized
+    O(1) whatever the frame rate.
+    """
     def __init__(
         self,
         window_seconds=1.0,
         min_drop_ratio=0.25,
-        max_angle_deg=45
+        max_angle_deg=45,
+        clock: Callable[[], float] = time.time
     ):
+        """
+        :param clock: Time source used when update() gets no timestamp.
+        """
         self.window_seconds = window_seconds
         self.min_drop_ratio = min_drop_ratio
         self.max_angle_deg = max_angle_deg
+        self.clock = clock
 
         self.history = deque()
+        # (timestamp, height) with strictly increasing heights: front is the window
+        # minimum y, i.e. the highest body position
+        self._peak = deque()
         self.last_fall_time = 0
 
     def _avg_height(self, landmarks):
-        ys = [lm.y for lm in landmarks]
-        return sum(ys) / len(ys)
+        return compute_features(landmarks_to_array(landmarks)).mean_height
 
     def _torso_angle(self, landmarks):
         # Shoulder midpoint → hip midpoint
-        ls = landmarks[11]  # left shoulder
-        rs = landmarks[12]  # right shoulder
-        lh = landmarks[23]  # left hip
-        rh = landmarks[24]  # right hip
-
-        shoulder_y = (ls.y + rs.y) / 2
-        hip_y = (lh.y + rh.y) / 2
-
-        shoulder_x = (ls.x + rs.x) / 2
-        hip_x = (lh.x + rh.x) / 2
-
-        dx = hip_x - shoulder_x
-        dy = hip_y - shoulder_y
-
-        angle_rad = math.atan2(dy, dx)
-        angle_deg = abs(math.degrees(angle_rad))
-
-        return angle_deg
+        return compute_features(landmarks_to_array(landmarks)).torso_angle
 
-    def update(self, landmarks):
-        now = time.time()
+    def update(self, landmarks, features: PoseFeatures = None, timestamp: float = None):
+        """
+        Streaming entry point: one frame at a time.
+        timestamp defaults to the detector's clock; pass the frame's capture/media time when known.
+        """
+        now = self.clock() if timestamp is None else timestamp
 
-        avg_height = self._avg_height(landmarks)
-        angle = self._torso_angle(landmarks)
+        # One conversion per frame; reuse the pipeline's features when given
+        if features is None:
+            features = compute_features(landmarks_to_array(landmarks))
+        avg_height = features.mean_height
+        angle = features.torso_angle
 
         self.history.append((now, avg_height, angle))
+        peak = self._peak
+        while peak and peak[-1][1] >= avg_height:
+            peak.pop()
+        peak.append((now, avg_height))
 
         # Remove frames antigos
         while self.history and now - self.history[0][0] > self.window_seconds:
             self.history.popleft()
+        while now - peak[0][0] > self.window_seconds:
+            peak.popleft()
 
         if len(self.history) < 2:
             return None
 
-        oldest = self.history[0]
-        newest = self.history[-1]
-
-        height_drop = newest[1] - oldest[1]
+        # Drop measured from the highest point in the window, not the oldest frame
+        height_drop = avg_height - peak[0][1]
 
         fall_detected = (
             height_drop > self.min_drop_ratio and
-            newest[2] > self.max_angle_deg and
-            now - self.last_fall_time > 2.0
+            angle > self.max_angle_deg and
+            now - self.last_fall_time > REFRACTORY_SECONDS
         )
 
         if fall_detected:
@@ -75,4 +91,95 @@ class FallDetector:
                 "message": "Fall detected (pose + motion)"
             }
 
-        return None
\ No newline at end of file
+        return None
+
+    def detect_batch(self, landmarks: Any, timestamps: Any) -> List[Dict[str, Any]]:
+        """
+        Offline scoring of a whole landmark sequence.
+
+        Args:
+            landmarks: (T, 33, 4) landmark array (x, y, z, visibility).
+            timestamps: (T,) non-decreasing timestamps in seconds.
+        Returns:
+            Every FALL_DETECTED a fresh detector would emit when fed the same frames
+            through update(..., timestamp=...), each with its frame_index.
+        Does not touch the streaming state (history / last_fall_time).
+        """
+        arr = np.asarray(landmarks, dtype=np.float32)
+        ts = np.asarray(timestamps, dtype=np.float64)
+        if arr.ndim != 3 or arr.shape[0] != ts.shape[0]:
+            raise ValueError("Expected landmarks of shape (T, N, 4) and timestamps of shape (T,)")
+        n = ts.shape[0]
+        if n < 2:
+            return []
+
+        heights = arr[:, :, Y].mean(axis=1, dtype=np.float64)
+        angles = self._batch_torso_angles(arr)
+
+        # Window start per frame: first index with now - t <= window (same test as update())
+        idx = np.arange(n)
+        start = np.searchsorted(ts, ts - self.window_seconds, side="left")
+        # searchsorted works on (now - window); nudge boundaries to the exact subtraction
+        # (moving over whole runs of equal timestamps)
+        prev = np.maximum(start - 1, 0)
+        start = np.where(
+            (start > 0) & (ts - ts[prev] <= self.window_seconds),
+            np.searchsorted(ts, ts[prev], side="left"), start
+        )
+        start = np.where(
+            (start < idx) & (ts - ts[start] > self.window_seconds),
+            np.searchsorted(ts, ts[start], side="right"), start
+        )
+
+        height_drop = heights - self._window_min(heights, start)
+        candidates = np.flatnonzero(
+            (idx - start >= 1) &
+            (height_drop > self.min_drop_ratio) &
+            (angles > self.max_angle_deg)
+        )
+
+        # The refractory period is sequential, but only candidates need checking
+        detections = []
+        last_fall_time = 0
+        for i in candidates.tolist():
+            now = float(ts[i])
+            if now - last_fall_time > REFRACTORY_SECONDS:
+                last_fall_time = now
+                detections.append({
+                    "type": "FALL_DETECTED",
+                    "timestamp": now,
+                    "frame_index": i,
+                    "message": "Fall detected (pose + motion)"
+                })
+        return detections
+
+    @staticmethod
+    def _window_min(values: np.ndarray, start: np.ndarray) -> np.ndarray:
+        """
+        min(values[start[i]:i + 1]) for every i, via a sparse table sized to the
+        longest window (O(T log W) memory and time).
+        """
+        n = values.shape[0]
+        idx = np.arange(n)
+        length = idx - start + 1
+        levels = int(length.max()).bit_length()
+
+        table = [values]
+        for k in range(1, levels):
+            prev = table[-1]
+            half = 1 << (k - 1)
+            level = prev.copy()
+            np.minimum(prev[:-half], prev[half:], out=level[:-half])
+            table.append(level)
+
+        k = np.frexp(length)[1] - 1  # floor(log2(length))
+        table = np.stack(table)
+        return np.minimum(table[k, start], table[k, idx - (1 << k) + 1])
+
+    @staticmethod
+    def _batch_torso_angles(arr: np.ndarray) -> np.ndarray:
+        xy = arr[:, :, :2]
+        shoulder = (xy[:, LEFT_SHOULDER] + xy[:, RIGHT_SHOULDER]) * 0.5
+        hip = (xy[:, LEFT_HIP] + xy[:, RIGHT_HIP]) * 0.5
+        d = (hip - shoulder).astype(np.float64)
+        return np.abs(np.degrees(np.arctan2(d[:, 1], d[:, 0])))
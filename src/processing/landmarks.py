@@ -0,0 +1,73 @@
+import math
+import numpy as np
+from typing import Any, Tuple
+
+# MediaPipe Pose landmark indices
+NUM_LANDMARKS = 33
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+
+# Column layout of a landmark array
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+
+def landmarks_to_array(landmarks: Any) -> np.ndarray:
+    """
+    Converts MediaPipe landmarks to a (N, 4) float32 array of (x, y, z, visibility).
+    Arrays are passed through (as float32), so callers can convert defensively.
+    Unset visibility (None) is treated as fully visible.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks.astype(np.float32, copy=False)
+
+    return np.array(
+        [(lm.x, lm.y, lm.z, 1.0 if getattr(lm, "visibility", None) is None else lm.visibility) for lm in landmarks],
+        dtype=np.float32
+    ).reshape(-1, 4)
+
+
+class PoseFeatures:
+    """
+    Per-frame pose features derived once from the landmark array and shared by the
+    pipeline, FallDetector and the overlay. Coordinates are normalized [0, 1].
+    """
+    __slots__ = ("hip_center", "torso_angle", "bbox", "mean_height")
+
+    def __init__(
+        self,
+        hip_center: Tuple[float, float],
+        torso_angle: float,
+        bbox: Tuple[float, float, float, float],
+        mean_height: float
+    ):
+        self.hip_center = hip_center    # (x, y) midpoint of both hips
+        self.torso_angle = torso_angle  # abs degrees of the shoulder->hip vector
+        self.bbox = bbox                # (x0, y0, x1, y1) over all landmarks
+        self.mean_height = mean_height  # mean y of all landmarks
+
+    def __repr__(self) -> str:
+        return (
+            f"PoseFeatures(hip_center=({self.hip_center[0]:.3f}, {self.hip_center[1]:.3f}), "
+            f"torso_angle={self.torso_angle:.1f}, mean_height={self.mean_height:.3f})"
+        )
+
+
+def compute_features(arr: np.ndarray) -> PoseFeatures:
+    """
+    Computes PoseFeatures from a (33, 4) landmark array.
+    """
+    xy = arr[:, :2]
+    shoulder = (xy[LEFT_SHOULDER] + xy[RIGHT_SHOULDER]) * 0.5
+    hip = (xy[LEFT_HIP] + xy[RIGHT_HIP]) * 0.5
+    dx, dy = hip - shoulder
+    mins = xy.min(axis=0)
+    maxs = xy.max(axis=0)
+
+    return PoseFeatures(
+        hip_center=(float(hip[0]), float(hip[1])),
+        torso_angle=abs(math.degrees(math.atan2(float(dy), float(dx)))),
+        bbox=(float(mins[0]), float(mins[1]), float(maxs[0]), float(maxs[1])),
+        mean_height=float(xy[:, 1].mean(dtype=np.float64))
+    )
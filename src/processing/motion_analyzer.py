@@ -1,55 +1,205 @@
 import cv2
 import numpy as np
 import logging
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+BLUR_MODES = ("gaussian", "box", "stack")
+ENGINES = ("diff", "mog2")
+# 3x3 dilation passes at full resolution (each grows the mask by one pixel)
+DILATE_ITERATIONS = 2
+
+
 class MotionAnalyzer:
     """
     Analyzes video frames to detect motion using background subtraction / frame differencing.
+
+    Frames can be analysed at a reduced processing resolution (scale); the blur kernel, the
+    dilation and the sensitivity are rescaled so results stay comparable with full-resolution analysis.
+    Intermediate images live in buffers allocated once per frame size and passed to OpenCV
+    via dst=, so steady-state calls do not allocate.
+
+    With a grid, the motion mask is also reduced to a (rows, cols) array of per-cell motion
+    fractions (zone_motion), and cells disabled in zone_mask (a TV, a curtain) do not count
+    towards is_moving. If the grid is finer than the processing resolution, the scale is
+    raised for that frame size so every cell covers at least one pixel.
     """
-    def __init__(self, sensitivity: int = 500, blur_size: int = 21, threshold: int = 25):
+    def __init__(
+        self,
+        sensitivity: int = 500,
+        blur_size: int = 21,
+        threshold: int = 25,
+        scale: float = 1.0,
+        blur: str = "gaussian",
+        engine: str = "diff",
+        grid: Optional[Tuple[int, int]] = None,
+        zone_mask: Optional[np.ndarray] = None
+    ):
         """
-        :param sensitivity: Minimum area of changed pixels to consider as motion.
-        :param blur_size: Size of GaussianBlur kernel (must be odd).
+        :param sensitivity: Minimum area of changed pixels to consider as motion (full-resolution pixels).
+        :param blur_size: Size of the blur kernel at full resolution (must be odd).
         :param threshold: Pixel intensity difference threshold.
+        :param scale: Processing resolution as a fraction of the frame size (e.g. 0.25).
+        :param blur: "gaussian" (default), "box" (cv2.blur) or "stack" (cv2.stackBlur), the
+            last two being cheaper approximations.
+        :param engine: "diff" (inter-frame differencing) or "mog2" (cv2 MOG2 background
+            subtractor; more robust to repetitive background motion, slower).
+        :param grid: (rows, cols) of the per-zone motion grid (None = global score only).
+        :param zone_mask: (rows, cols) booleans, False for cells ignored by is_moving.
+            Requires grid.
         """
+        if not 0.0 < scale <= 1.0:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        if blur not in BLUR_MODES:
+            raise ValueError(f"blur must be one of {BLUR_MODES}, got {blur!r}")
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+        if grid is not None and min(grid) < 1:
+            raise ValueError(f"grid must have at least one row and column, got {tuple(grid)}")
+        if zone_mask is not None:
+            if grid is None:
+                raise ValueError("zone_mask requires grid")
+            zone_mask = np.asarray(zone_mask, dtype=bool)
+            if zone_mask.shape != tuple(grid):
+                raise ValueError(f"zone_mask shape {zone_mask.shape} does not match grid {tuple(grid)}")
+
         self.sensitivity = sensitivity
         self.blur_size = blur_size
         self.threshold_val = threshold
+        self.requested_scale = scale
+        self.blur = blur
+        self.engine = engine
+        self.grid = tuple(grid) if grid is not None else None
+        self.zone_mask = zone_mask
+        self._set_scale(scale)
+
+        self.prev_frame = None
+        self._shape = None
+        self._subtractor = None
+        # Per-cell motion fractions of the last frame (reused buffer; copy to keep)
+        self.zone_motion: Optional[np.ndarray] = None
+
+    def _set_scale(self, scale: float) -> None:
+        self.scale = scale
+        # Area is measured at processing resolution: scale the threshold with it
+        self.scaled_sensitivity = self.sensitivity * scale * scale
+        # Kernel shrinks with the image, kept odd and at least 3
+        self.scaled_blur_size = max(3, int(round(self.blur_size * scale)) | 1)
+        # Dilation radius shrinks too; below one pixel (scale <= 0.25) it rounds to none
+        self.scaled_dilate_iterations = int(round(DILATE_ITERATIONS * scale))
+
+    def _allocate(self, frame_shape: tuple) -> None:
+        h, w = frame_shape[:2]
+        self._shape = frame_shape
+        scale = self.requested_scale
+        if self.grid is not None:
+            rows, cols = self.grid
+            if rows > h or cols > w:
+                raise ValueError(f"grid {self.grid} is finer than the {w}x{h} frame")
+            # Every cell needs at least one pixel at processing resolution
+            min_scale = min(1.0, max(rows / h, cols / w))
+            if scale < min_scale:
+                logger.warning(
+                    f"Motion grid {rows}x{cols} is finer than {w}x{h} at scale {scale}; "
+                    f"analysing at scale {min_scale:.3f} instead"
+                )
+                scale = min_scale
+        self._set_scale(scale)
+        self._size = (max(1, int(round(w * self.scale))), max(1, int(round(h * self.scale))))
+        sw, sh = self._size
+
+        self._gray_full = np.empty((h, w), dtype=np.uint8)
+        self._gray = np.empty((sh, sw), dtype=np.uint8) if self.scale < 1.0 else self._gray_full
+        # Two blur targets: the current frame is written into the one not holding prev_frame
+        self._blurred = [np.empty((sh, sw), dtype=np.uint8) for _ in range(2)]
+        self._current = 0
+        self._delta = np.empty((sh, sw), dtype=np.uint8)
+        self._thresh = np.empty((sh, sw), dtype=np.uint8)
+        self._dilated = np.empty((sh, sw), dtype=np.uint8)
         self.prev_frame = None
 
+        if self.grid is not None:
+            rows, cols = self.grid
+            # Cells are whole pixels; the remainder at the right/bottom edge is not counted
+            self._cell = (sh // rows, sw // cols)
+            self.zone_motion = np.zeros((rows, cols), dtype=np.float32)
+        if self.engine == "mog2":
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        logger.debug(f"MotionAnalyzer buffers allocated for {w}x{h} (processing {sw}x{sh})")
+
+    def _blur_into(self, src: np.ndarray, dst: np.ndarray) -> None:
+        k = (self.scaled_blur_size, self.scaled_blur_size)
+        if self.blur == "box":
+            cv2.blur(src, k, dst=dst)
+        elif self.blur == "stack":
+            cv2.stackBlur(src, k, dst=dst)
+        else:
+            cv2.GaussianBlur(src, k, 0, dst=dst)
+
     def detect_motion(self, frame: np.ndarray) -> tuple[bool, float]:
         """
         Detects motion in the current frame compared to the previous one.
         Returns:
             (is_moving, motion_score)
-            motion_score is the area of changed pixels.
+            motion_score is the area of changed pixels, in full-resolution pixels.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+        if frame.shape != self._shape:
+            self._allocate(frame.shape)
+
+        # Convert to grayscale, then shrink to processing resolution
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_full)
+        if self.scale < 1.0:
+            cv2.resize(self._gray_full, self._size, dst=self._gray, interpolation=cv2.INTER_AREA)
+
+        gray = self._blurred[self._current]
+        self._blur_into(self._gray, gray)
 
         if self.prev_frame is None:
+            # First frame only seeds the reference (or the background model)
+            if self._subtractor is not None:
+                self._subtractor.apply(gray, fgmask=self._thresh)
             self.prev_frame = gray
+            self._current ^= 1
             return False, 0.0
 
-        # Compute difference
-        delta = cv2.absdiff(self.prev_frame, gray)
-        thresh = cv2.threshold(delta, self.threshold_val, 255, cv2.THRESH_BINARY)[1]
-        
+        if self._subtractor is not None:
+            # Foreground mask is already binary (0/255) with shadows disabled
+            self._subtractor.apply(gray, fgmask=self._thresh)
+        else:
+            # Compute difference
+            cv2.absdiff(self.prev_frame, gray, dst=self._delta)
+            cv2.threshold(self._delta, self.threshold_val, 255, cv2.THRESH_BINARY, dst=self._thresh)
+
         # Dilate to fill holes
-        thresh = cv2.dilate(thresh, None, iterations=2)
+        cv2.dilate(self._thresh, None, dst=self._dilated, iterations=self.scaled_dilate_iterations)
 
-        # Find countours (optional, but good for area calculation)
-        # Alternatively, just countNonZero for total motion score
-        # Using countNonZero is faster and sufficient for "global motion" score
-        motion_area = cv2.countNonZero(thresh)
+        if self.grid is not None:
+            motion_area = self._zone_area()
+        else:
+            # Using countNonZero is faster and sufficient for "global motion" score
+            motion_area = cv2.countNonZero(self._dilated)
 
         # Update reference frame
         # We update every frame to adapt to slow lighting changes (inter-frame diff)
         self.prev_frame = gray
+        self._current ^= 1
+
+        is_moving = motion_area > self.scaled_sensitivity
+
+        return is_moving, motion_area / (self.scale * self.scale)
+
+    def _zone_area(self) -> float:
+        """
+        Reduces the dilated mask into zone_motion (fraction of moving pixels per cell) with
+        one reshape-mean, and returns the moving area of the cells enabled in zone_mask.
+        """
+        rows, cols = self.grid
+        ch, cw = self._cell
+        cells = self._dilated[:rows * ch, :cols * cw].reshape(rows, ch, cols, cw)
+        cells.mean(axis=(1, 3), dtype=np.float32, out=self.zone_motion)
+        self.zone_motion *= 1.0 / 255.0
 
-        is_moving = motion_area > self.sensitivity
-        
-        return is_moving, float(motion_area)
+        if self.zone_mask is None:
+            return float(self.zone_motion.sum()) * ch * cw
+        return float(self.zone_motion.sum(where=self.zone_mask)) * ch * cw
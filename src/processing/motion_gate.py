@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+from typing import Any, Dict, Optional
+from processing.motion_analyzer import MotionAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class MotionGate:
+    """
+    Cheap pre-filter in front of the pose detector.
+
+    Every frame goes through MotionAnalyzer (frame differencing). Once the scene has been
+    static for `static_after_seconds`, pose inference is skipped except for one keep-alive
+    frame every `keepalive_interval` seconds (None = skip entirely until motion returns).
+    Skipped frames reuse the last landmarks so the pipeline's duration timers keep running.
+    """
+    def __init__(
+        self,
+        analyzer: Optional[MotionAnalyzer] = None,
+        static_after_seconds: float = 3.0,
+        keepalive_interval: Optional[float] = 1.0
+    ):
+        """
+        :param analyzer: MotionAnalyzer used for the motion score (default settings if None).
+        :param static_after_seconds: Seconds without motion before inference is throttled.
+        :param keepalive_interval: Seconds between keep-alive inferences while static.
+        """
+        self.analyzer = analyzer or MotionAnalyzer()
+        self.static_after_seconds = static_after_seconds
+        self.keepalive_interval = keepalive_interval
+
+        self.last_motion_time: Optional[float] = None
+        self.last_inference_time: Optional[float] = None
+        self.last_landmarks: Optional[Any] = None
+
+        # Metrics
+        self.frames = 0
+        self.skipped = 0
+
+    def should_infer(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Returns True if pose inference should run on this frame.
+        """
+        is_moving, _ = self.analyzer.detect_motion(frame)
+        self.frames += 1
+
+        # The first frame counts as motion so the gate starts open
+        if is_moving or self.last_motion_time is None:
+            self.last_motion_time = timestamp
+
+        static = (timestamp - self.last_motion_time) >= self.static_after_seconds
+        keepalive_due = (
+            self.keepalive_interval is not None and
+            (self.last_inference_time is None or timestamp - self.last_inference_time >= self.keepalive_interval)
+        )
+
+        if not static or keepalive_due:
+            self.last_inference_time = timestamp
+            return True
+
+        self.skipped += 1
+        return False
+
+    def remember(self, landmarks: Optional[Any]) -> None:
+        """Stores the landmarks of the latest inference for reuse on skipped frames."""
+        self.last_landmarks = landmarks
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_ratio": self.skip_ratio
+        }
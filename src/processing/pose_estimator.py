@@ -0,0 +1,193 @@
+import cv2
+import time
+import logging
+import threading
+import numpy as np
+import mediapipe as mp
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from processing.roi_tracker import RoiTracker
+from processing.landmarks import landmarks_to_array
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = "models/pose_landmarker_lite.task"
+
+
+def create_pose_landmarker(
+    model_path: str = MODEL_PATH,
+    running_mode: vision.RunningMode = vision.RunningMode.IMAGE,
+    result_callback: Optional[Callable] = None,
+    num_poses: int = 1
+) -> vision.PoseLandmarker:
+    """
+    Creates a MediaPipe PoseLandmarker (IMAGE mode by default).
+    Each instance owns its own graph, so one must be created per worker thread.
+    LIVE_STREAM mode requires a result_callback.
+    num_poses is the maximum number of people detected per frame.
+    """
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    options = vision.PoseLandmarkerOptions(
+        base_options=base_options,
+        running_mode=running_mode,
+        num_poses=num_poses,
+        output_segmentation_masks=False,
+        result_callback=result_callback
+    )
+    return vision.PoseLandmarker.create_from_options(options)
+
+
+def _to_mp_image(frame: np.ndarray) -> mp.Image:
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+
+
+class PoseEstimator:
+    """
+    Thin wrapper around a PoseLandmarker: BGR frame in, landmark array of the first pose out
+    (detect) or of every pose (detect_all, with num_poses > 1).
+    In VIDEO mode (offline files) detect() needs the frame's media timestamp.
+    """
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        running_mode: vision.RunningMode = vision.RunningMode.IMAGE,
+        num_poses: int = 1
+    ):
+        self.model_path = model_path
+        self.running_mode = running_mode
+        self.num_poses = num_poses
+        self.detector = create_pose_landmarker(model_path, running_mode=running_mode, num_poses=num_poses)
+
+    def detect(
+        self,
+        frame: np.ndarray,
+        timestamp_ms: Optional[int] = None,
+        roi_tracker: Optional[RoiTracker] = None
+    ) -> Optional[Any]:
+        """
+        Runs pose inference on a BGR frame.
+        Args:
+            timestamp_ms: Media timestamp, required (and monotonically increasing) in VIDEO mode.
+            roi_tracker: Per-camera tracker; inference then runs on the tracked crop and the
+                landmarks are mapped back to full-frame coordinates. If the crop finds nobody,
+                the same frame is retried full-size. Not supported in VIDEO mode, which tracks
+                across frames itself and cannot run one timestamp twice.
+        Returns:
+            (33, 4) float32 landmark array (x, y, z, visibility) of the first pose, or None.
+        """
+        if roi_tracker is None:
+            return self._infer(frame, timestamp_ms)
+        if self.running_mode == vision.RunningMode.VIDEO:
+            raise ValueError("roi_tracker is not supported in VIDEO mode")
+
+        image, roi = roi_tracker.crop(frame)
+        landmarks = self._infer(image, timestamp_ms)
+        if landmarks is None and roi is not None:
+            # Tracking lost: fall back to the full frame
+            roi_tracker.reset()
+            image, roi = roi_tracker.crop(frame)
+            landmarks = self._infer(image, timestamp_ms)
+
+        if landmarks is not None:
+            landmarks = roi_tracker.to_full_frame(landmarks, roi, frame.shape)
+        roi_tracker.update(landmarks, frame.shape)
+        return landmarks
+
+    def detect_all(self, frame: np.ndarray, timestamp_ms: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Runs pose inference on the full BGR frame and returns a (33, 4) array per detected
+        person (up to num_poses). ROI cropping is single-subject and not applied here.
+        """
+        return [landmarks_to_array(pose) for pose in self._run(frame, timestamp_ms).pose_landmarks]
+
+    def _infer(self, frame: np.ndarray, timestamp_ms: Optional[int]) -> Optional[Any]:
+        result = self._run(frame, timestamp_ms)
+        if result.pose_landmarks:
+            return landmarks_to_array(result.pose_landmarks[0])
+        return None
+
+    def _run(self, frame: np.ndarray, timestamp_ms: Optional[int]) -> Any:
+        if self.running_mode == vision.RunningMode.VIDEO:
+            return self.detector.detect_for_video(_to_mp_image(frame), timestamp_ms)
+        return self.detector.detect(_to_mp_image(frame))
+
+    def close(self) -> None:
+        self.detector.close()
+
+
+class LiveStreamPoseEstimator:
+    """
+    Non-blocking estimator using MediaPipe LIVE_STREAM mode.
+
+    submit() hands the frame to MediaPipe and returns immediately; inference runs on
+    MediaPipe's own thread and on_result(landmarks, capture_time, frame_shape) is called
+    from there. MediaPipe drops inputs while the graph is busy, so the caller never stalls.
+    With a roi_tracker, frames are cropped at submit time and landmarks mapped back to
+    full-frame coordinates in the callback; both sides access the tracker under _lock.
+    """
+    def __init__(
+        self,
+        on_result: Callable[[Optional[Any], float, Tuple[int, ...]], None],
+        model_path: str = MODEL_PATH,
+        roi_tracker: Optional[RoiTracker] = None
+    ):
+        self.model_path = model_path
+        self.on_result = on_result
+        self.roi_tracker = roi_tracker
+        self.submitted = 0
+        self.completed = 0
+
+        # MediaPipe timestamp (ms) -> (capture_time, frame_shape, roi) of in-flight frames
+        self._pending: Dict[int, Tuple[float, Tuple[int, ...], Optional[Tuple[int, int, int, int]]]] = {}
+        self._lock = threading.Lock()
+        self._last_ts_ms = -1
+
+        self.detector = create_pose_landmarker(
+            model_path,
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            result_callback=self._handle_result
+        )
+
+    def submit(self, frame: np.ndarray, capture_time: float) -> None:
+        """
+        Queue a BGR frame for asynchronous inference.
+        """
+        # detect_async requires strictly increasing timestamps
+        ts_ms = int(time.monotonic() * 1000)
+        with self._lock:
+            # The callback thread updates the tracker under the same lock
+            image, roi = self.roi_tracker.crop(frame) if self.roi_tracker else (frame, None)
+            if ts_ms <= self._last_ts_ms:
+                ts_ms = self._last_ts_ms + 1
+            self._last_ts_ms = ts_ms
+            self._pending[ts_ms] = (capture_time, frame.shape, roi)
+            self.submitted += 1
+
+        self.detector.detect_async(_to_mp_image(image), ts_ms)
+
+    def _handle_result(self, result: Any, output_image: mp.Image, timestamp_ms: int) -> None:
+        landmarks = landmarks_to_array(result.pose_landmarks[0]) if result.pose_landmarks else None
+        with self._lock:
+            pending = self._pending.pop(timestamp_ms, None)
+            # Inputs dropped by MediaPipe never get a callback; forget anything older
+            for stale in [ts for ts in self._pending if ts < timestamp_ms]:
+                del self._pending[stale]
+            self.completed += 1
+            if pending is None:
+                return
+
+            capture_time, frame_shape, roi = pending
+            if self.roi_tracker:
+                if landmarks is not None:
+                    landmarks = self.roi_tracker.to_full_frame(landmarks, roi, frame_shape)
+                # A miss resets the tracker, so the next submitted frame is full-size
+                self.roi_tracker.update(landmarks, frame_shape)
+        try:
+            self.on_result(landmarks, capture_time, frame_shape)
+        except Exception as e:
+            logger.exception(f"Error in pose result callback: {e}")
+
+    def close(self) -> None:
+        self.detector.close()
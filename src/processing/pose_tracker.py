@@ -0,0 +1,142 @@
+import logging
+import numpy as np
+from typing import Dict, List, Tuple
+from processing.landmarks import VISIBILITY
+
+logger = logging.getLogger(__name__)
+
+
+class PoseTrack:
+    """
+    A tracked subject: last bbox/centroid (normalized) and when it was last matched.
+    """
+    __slots__ = ("track_id", "bbox", "centroid", "last_seen", "hits")
+
+    def __init__(self, track_id: str, bbox: np.ndarray, timestamp: float):
+        self.track_id = track_id
+        self.bbox = bbox
+        self.centroid = (bbox[:2] + bbox[2:]) * 0.5
+        self.last_seen = timestamp
+        self.hits = 1
+
+
+def pose_bbox(landmarks: np.ndarray, min_visibility: float = 0.5) -> np.ndarray:
+    """
+    (x0, y0, x1, y1) of the visible landmarks of a (33, 4) array (all landmarks if none are visible).
+    """
+    visible = landmarks[landmarks[:, VISIBILITY] >= min_visibility]
+    xy = (visible if len(visible) else landmarks)[:, :2]
+    return np.concatenate([xy.min(axis=0), xy.max(axis=0)]).astype(np.float64)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between (N, 4) and (M, 4) boxes.
+    """
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1.0), 0.0)
+
+
+class PoseTracker:
+    """
+    Assigns stable track ids ("person_0", "person_1", ...) to the poses detected in
+    each frame, so per-person state survives across frames.
+
+    Detections are matched greedily to existing tracks by bbox IoU; leftovers are
+    matched by centroid distance (fast movement, e.g. a fall, can break overlap).
+    Unmatched detections open new tracks; tracks unseen for max_missing_seconds
+    are evicted.
+    """
+    def __init__(
+        self,
+        min_iou: float = 0.2,
+        max_centroid_distance: float = 0.15,
+        max_missing_seconds: float = 2.0,
+        min_visibility: float = 0.5
+    ):
+        """
+        :param min_iou: Minimum bbox IoU for an overlap match.
+        :param max_centroid_distance: Maximum normalized centroid distance for a fallback match.
+        :param max_missing_seconds: A track not matched for this long is evicted.
+        :param min_visibility: Landmark visibility needed to count towards the bbox.
+        """
+        self.min_iou = min_iou
+        self.max_centroid_distance = max_centroid_distance
+        self.max_missing_seconds = max_missing_seconds
+        self.min_visibility = min_visibility
+
+        self.tracks: Dict[str, PoseTrack] = {}
+        self._next_id = 0
+
+    def assign(self, poses: List[np.ndarray], timestamp: float) -> List[Tuple[str, np.ndarray]]:
+        """
+        Matches this frame's (33, 4) landmark arrays to tracks.
+        Returns (track_id, landmarks) pairs in detection order.
+        """
+        if not poses:
+            return []
+
+        boxes = np.stack([pose_bbox(p, self.min_visibility) for p in poses])
+        track_ids = list(self.tracks)
+        assigned: Dict[int, str] = {}
+
+        if track_ids:
+            track_boxes = np.stack([self.tracks[t].bbox for t in track_ids])
+            self._match(iou_matrix(track_boxes, boxes), track_ids, assigned, self.min_iou, higher_is_better=True)
+
+            centroids = (boxes[:, :2] + boxes[:, 2:]) * 0.5
+            track_centroids = np.stack([self.tracks[t].centroid for t in track_ids])
+            distances = np.linalg.norm(track_centroids[:, None, :] - centroids[None, :, :], axis=2)
+            self._match(distances, track_ids, assigned, self.max_centroid_distance, higher_is_better=False)
+
+        results = []
+        for det_idx, landmarks in enumerate(poses):
+            track_id = assigned.get(det_idx)
+            if track_id is None:
+                track_id = f"person_{self._next_id}"
+                self._next_id += 1
+                self.tracks[track_id] = PoseTrack(track_id, boxes[det_idx], timestamp)
+                logger.info(f"New track: {track_id}")
+            else:
+                track = self.tracks[track_id]
+                track.bbox = boxes[det_idx]
+                track.centroid = (track.bbox[:2] + track.bbox[2:]) * 0.5
+                track.last_seen = timestamp
+                track.hits += 1
+            results.append((track_id, landmarks))
+        return results
+
+    def _match(self, scores: np.ndarray, track_ids: List[str], assigned: Dict[int, str], threshold: float, higher_is_better: bool):
+        """
+        Greedy one-to-one matching on a (tracks, detections) score matrix, skipping
+        tracks and detections that are already assigned.
+        """
+        taken_tracks = set(assigned.values())
+        order = np.argsort(-scores if higher_is_better else scores, axis=None)
+        for flat in order.tolist():
+            t_idx, d_idx = divmod(flat, scores.shape[1])
+            score = scores[t_idx, d_idx]
+            if (score < threshold) if higher_is_better else (score > threshold):
+                break
+            track_id = track_ids[t_idx]
+            if d_idx in assigned or track_id in taken_tracks:
+                continue
+            assigned[d_idx] = track_id
+            taken_tracks.add(track_id)
+
+    def evict(self, timestamp: float) -> List[str]:
+        """
+        Removes tracks not seen for max_missing_seconds and returns their ids.
+        """
+        stale = [t for t, track in self.tracks.items() if timestamp - track.last_seen > self.max_missing_seconds]
+        for track_id in stale:
+            del self.tracks[track_id]
+            logger.info(f"Track evicted: {track_id}")
+        return stale
@@ -0,0 +1,109 @@
+import logging
+import numpy as np
+from typing import Optional, Tuple
+from processing.landmarks import X, Y, Z, VISIBILITY
+
+logger = logging.getLogger(__name__)
+
+# (x0, y0, x1, y1) in pixels, x1/y1 exclusive
+Roi = Tuple[int, int, int, int]
+
+
+class RoiTracker:
+    """
+    Tracks a padded region of interest around the subject so pose inference can run
+    on a crop instead of the full frame.
+
+    The ROI for frame N is the bounding box of frame N-1's visible landmarks, padded
+    and squared. When too few landmarks are visible (or none were found) the tracker
+    resets and the next inference uses the full frame.
+    """
+    def __init__(
+        self,
+        padding: float = 0.35,
+        min_size: float = 0.2,
+        min_visibility: float = 0.5,
+        min_visible_landmarks: int = 8
+    ):
+        """
+        :param padding: Fraction of the bbox size added on every side.
+        :param min_size: Minimum ROI side as a fraction of the frame's shorter side.
+        :param min_visibility: Landmark visibility needed to count towards the bbox.
+        :param min_visible_landmarks: Below this count tracking is considered lost.
+        """
+        self.padding = padding
+        self.min_size = min_size
+        self.min_visibility = min_visibility
+        self.min_visible_landmarks = min_visible_landmarks
+        self.roi: Optional[Roi] = None
+
+        # Metrics
+        self.crops = 0
+        self.full_frames = 0
+        self.resets = 0
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[Roi]]:
+        """
+        Returns (image to run inference on, roi used). roi is None for the full frame.
+        """
+        roi = self.roi
+        if roi is None:
+            self.full_frames += 1
+            return frame, None
+        self.crops += 1
+        x0, y0, x1, y1 = roi
+        return frame[y0:y1, x0:x1], roi
+
+    def to_full_frame(self, landmarks: np.ndarray, roi: Optional[Roi], frame_shape: tuple) -> np.ndarray:
+        """
+        Maps a crop-normalized (N, 4) landmark array back to full-frame normalized coordinates.
+        """
+        if roi is None:
+            return landmarks
+
+        h, w = frame_shape[:2]
+        x0, y0, cw, ch = roi[0], roi[1], roi[2] - roi[0], roi[3] - roi[1]
+        sx, sy = cw / w, ch / h
+
+        mapped = landmarks.copy()
+        mapped[:, X] = x0 / w + landmarks[:, X] * sx
+        mapped[:, Y] = y0 / h + landmarks[:, Y] * sy
+        mapped[:, Z] = landmarks[:, Z] * sx
+        return mapped
+
+    def update(self, landmarks: Optional[np.ndarray], frame_shape: tuple) -> None:
+        """
+        Computes the next ROI from a full-frame landmark array (None = subject not found).
+        """
+        if landmarks is None:
+            self.reset()
+            return
+
+        visible = landmarks[landmarks[:, VISIBILITY] >= self.min_visibility]
+        if len(visible) < self.min_visible_landmarks:
+            self.reset()
+            return
+
+        h, w = frame_shape[:2]
+        bx0, by0 = visible[:, :2].min(axis=0) * (w, h)
+        bx1, by1 = visible[:, :2].max(axis=0) * (w, h)
+
+        # Square box around the center, padded, at least min_size of the frame
+        side = max(bx1 - bx0, by1 - by0) * (1.0 + 2.0 * self.padding)
+        side = max(side, self.min_size * min(w, h))
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+
+        x0 = int(max(0, cx - side / 2.0))
+        y0 = int(max(0, cy - side / 2.0))
+        x1 = int(min(w, cx + side / 2.0))
+        y1 = int(min(h, cy + side / 2.0))
+
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.reset()
+            return
+        self.roi = (x0, y0, x1, y1)
+
+    def reset(self) -> None:
+        if self.roi is not None:
+            self.resets += 1
+        self.roi = None
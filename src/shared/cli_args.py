@@ -0,0 +1,49 @@
+"""
+Parsers for the compound command-line options of main.py. Kept apart from main.py so
+they can be used (and tested) without importing mediapipe.
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+def parse_sources(spec: str) -> Dict[str, str]:
+    """
+    Parses --sources "cam1=rtsp://a,cam2=rtsp://b" (ids optional) into {camera_id: source}.
+    Unnamed sources are numbered cam0, cam1, ... in order, blanks skipped. Raises
+    ValueError if two sources end up with the same id.
+    """
+    sources = {}
+    unnamed = 0
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        if "=" in item and "://" not in item.split("=", 1)[0]:
+            camera_id, source = item.split("=", 1)
+        else:
+            camera_id, source = f"cam{unnamed}", item
+            unnamed += 1
+        camera_id = camera_id.strip()
+        if camera_id in sources:
+            raise ValueError(f"duplicate camera id {camera_id!r} in --sources")
+        sources[camera_id] = source.strip()
+    return sources
+
+
+def parse_motion_zones(grid_spec: str, ignore_spec: str) -> Tuple[Optional[Tuple[int, int]], Optional[np.ndarray]]:
+    """
+    Parses --motion-grid "4x4" and --motion-ignore "0,3;1,3" into (grid, zone_mask).
+    """
+    if not grid_spec:
+        if ignore_spec:
+            raise ValueError("--motion-ignore requires --motion-grid")
+        return None, None
+    rows, cols = (int(v) for v in grid_spec.lower().split("x"))
+    if not ignore_spec:
+        return (rows, cols), None
+
+    zone_mask = np.ones((rows, cols), dtype=bool)
+    for cell in filter(None, (c.strip() for c in ignore_spec.split(";"))):
+        row, col = (int(v) for v in cell.split(","))
+        zone_mask[row, col] = False
+    return (rows, cols), zone_mask
@@ -0,0 +1,53 @@
+import os
+import time
+import uuid
+import threading
+from typing import Optional
+
+# Sub-millisecond counter state (process-wide)
+_lock = threading.Lock()
+_last_ms = -1      # Millisecond encoded in the last id (may run ahead after counter overflow)
+_last_input = -1   # Millisecond requested for the last id
+_counter = 0
+
+
+def uuid7(timestamp: Optional[float] = None) -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7) as a string.
+
+    Layout: 48-bit Unix milliseconds | version | 12-bit counter | variant | 62 random bits.
+    For non-decreasing timestamps, ids of a process are strictly increasing: the counter
+    orders ids of the same millisecond (reseeded randomly each new millisecond and, on
+    overflow, borrowing the next millisecond). An earlier timestamp (replayed media time,
+    clock step back) is encoded as given and restarts the sequence. Across processes and
+    nodes uniqueness comes from the 62 random bits. Ids sort lexicographically in time order.
+
+    :param timestamp: Epoch seconds to encode (default: now). Pass the event timestamp
+        so the id and the event agree.
+    """
+    global _last_ms, _last_input, _counter
+    ms = int((time.time() if timestamp is None else timestamp) * 1000)
+    with _lock:
+        if ms > _last_ms or ms < _last_input:
+            _last_ms = ms
+            # Random start in the lower half leaves room to count up within the millisecond
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        _last_input = ms
+        ms, counter = _last_ms, _counter
+
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return str(uuid.UUID(int=value))
+
+
+def uuid7_time(event_id: str) -> float:
+    """Epoch seconds (millisecond precision) encoded in a uuid7 string."""
+    return (uuid.UUID(event_id).int >> 80) / 1000.0
@@ -0,0 +1,195 @@
+import time
+import bisect
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class RateMeter:
+    """
+    Thread-safe events-per-second meter over a sliding time window.
+    Used to report per-camera FPS without keeping unbounded history.
+    """
+    def __init__(self, window_seconds: float = 5.0):
+        self.window_seconds = window_seconds
+        self.total = 0
+        self._ticks = deque()
+        self._lock = threading.Lock()
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Record one occurrence (e.g. a processed frame)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.total += 1
+            self._ticks.append(now)
+            self._evict(now)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Occurrences per second over the last window."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            if len(self._ticks) < 2:
+                return 0.0
+            span = now - self._ticks[0]
+            return len(self._ticks) / span if span > 0 else 0.0
+
+    def _evict(self, now: float) -> None:
+        while self._ticks and now - self._ticks[0] > self.window_seconds:
+            self._ticks.popleft()
+
+
+class LatencyStats:
+    """
+    Thread-safe latency recorder keeping the most recent samples for percentiles.
+    Values are in seconds; summary() reports milliseconds.
+    """
+    def __init__(self, max_samples: int = 1000):
+        self.count = 0
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """count, mean, p50, p95 and max (ms) over the retained samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        if not samples:
+            return {"count": count, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        def pct(p: float) -> float:
+            return samples[min(int(p * len(samples)), len(samples) - 1)] * 1000.0
+
+        return {
+            "count": count,
+            "mean_ms": sum(samples) / len(samples) * 1000.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": samples[-1] * 1000.0
+        }
+
+
+class StageLatencyTracker:
+    """
+    Records end-to-end latency from frame capture to each pipeline stage
+    (e.g. "pose", "event", "decision"), one LatencyStats per stage.
+    """
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self.stages: Dict[str, LatencyStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, capture_time: float, now: Optional[float] = None) -> None:
+        """Record `now - capture_time` (wall clock) for the given stage."""
+        now = time.time() if now is None else now
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = LatencyStats(self.max_samples)
+        stats.record(now - capture_time)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = dict(self.stages)
+        return {stage: stats.summary() for stage, stats in stages.items()}
+
+
+class SequenceGapTracker:
+    """
+    Detects dropped frames from gaps in a monotonic sequence number.
+    A frame arriving after a later one (reordered) is counted as late: it no longer
+    counts as missing, and last_seq stays at the highest sequence number seen.
+    """
+    def __init__(self):
+        self.last_seq: Optional[int] = None
+        self.received = 0
+        self.missing = 0
+        self.late = 0
+
+    def observe(self, seq: int) -> int:
+        """
+        Register a received sequence number.
+        Returns the number of frames missing since the previous one.
+        """
+        if self.last_seq is not None and seq <= self.last_seq:
+            self.late += 1
+            if seq < self.last_seq and self.missing:
+                # Counted as missing when the later frame opened the gap
+                self.missing -= 1
+            self.received += 1
+            return 0
+
+        gap = 0
+        if self.last_seq is not None and seq > self.last_seq + 1:
+            gap = seq - self.last_seq - 1
+            self.missing += gap
+        self.last_seq = seq
+        self.received += 1
+        return gap
+
+    @property
+    def drop_ratio(self) -> float:
+        total = self.received + self.missing
+        return self.missing / total if total else 0.0
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram (per-bucket counts, not cumulative).
+    bounds are the inclusive upper edges; values above the last bound go to an overflow bucket.
+    Unlike LatencyStats it keeps no samples, so it is cheap on hot paths.
+    """
+    def __init__(self, bounds):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        idx = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-quantile (max for the overflow bucket)."""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            peak = self.max
+        if not count:
+            return 0.0
+        target = q * count
+        seen = 0
+        for idx, n in enumerate(counts):
+            seen += n
+            if seen >= target and n:
+                return self.bounds[idx] if idx < len(self.bounds) else peak
+        return peak
+
+    def summary(self) -> Dict[str, Any]:
+        """count, mean, p50, p95, max and the non-empty buckets as {"<=bound": n}."""
+        with self._lock:
+            counts = list(self.counts)
+            count, total, peak = self.count, self.total, self.max
+        buckets = {f"<={b:g}": n for b, n in zip(self.bounds, counts) if n}
+        if counts[-1]:
+            buckets[f">{self.bounds[-1]:g}"] = counts[-1]
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "max": peak,
+            "buckets": buckets
+        }
@@ -0,0 +1,147 @@
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from shared.metrics import Histogram
+
+logger = logging.getLogger("AsyncEventWriter")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# Histogram bounds: queue depth (events) and batch write time (ms)
+DEPTH_BOUNDS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+LATENCY_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class AsyncEventWriter:
+    """
+    Moves event persistence off the caller's thread.
+
+    submit() only appends to a bounded in-memory queue; a single writer thread drains
+    it in batches of up to batch_size and hands each batch to write(). When the queue
+    is full the overflow policy applies:
+    - "drop_oldest": discard the oldest queued event (newest data wins; never blocks)
+    - "drop_newest": discard the submitted event (never blocks)
+    - "block": wait up to block_timeout seconds for room, then drop the submitted event
+
+    Queue depth (sampled at every submit) and batch write time are kept as histograms.
+    """
+    def __init__(
+        self,
+        write: Callable[[List[Dict[str, Any]]], None],
+        max_queue: int = 10000,
+        overflow: str = "drop_oldest",
+        batch_size: int = 256,
+        block_timeout: Optional[float] = 1.0
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if max_queue < 1:
+            raise ValueError(f"max_queue must be >= 1, got {max_queue}")
+        self.write = write
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+
+        # Metrics
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.queue_depth = Histogram(DEPTH_BOUNDS)
+        self.write_latency_ms = Histogram(LATENCY_BOUNDS_MS)
+
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """
+        Queues one event for writing. Returns False if it was dropped (queue full or closed).
+        """
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            self.submitted += 1
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    has_room = self.overflow == "block" and self._cond.wait_for(
+                        lambda: len(self._queue) < self.max_queue or self._closed, self.block_timeout
+                    )
+                    if not has_room or self._closed:
+                        self.dropped += 1
+                        return False
+            self._queue.append(event)
+            self.queue_depth.record(len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every event queued so far has been written. Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stops accepting events, drains the queue and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Event writer did not drain within {timeout}s ({len(self._queue)} events pending)")
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue) + self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth.summary(),
+            "write_latency_ms": self.write_latency_ms.summary()
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return  # Closed and drained
+                n = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(n)]
+                self._in_flight = n
+                # Room freed for blocked producers
+                self._cond.notify_all()
+
+            start = time.perf_counter()
+            try:
+                self.write(batch)
+                written = n
+            except Exception as e:
+                written = 0
+                self.write_errors += 1
+                logger.error(f"Failed to persist {n} events: {e}")
+            self.write_latency_ms.record((time.perf_counter() - start) * 1000.0)
+
+            with self._cond:
+                self.written += written
+                self._in_flight = 0
+                self._cond.notify_all()
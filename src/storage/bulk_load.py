@@ -0,0 +1,163 @@
+"""
+Bulk event decoding across processes, for replays and backfills that need every event
+body (e.g. event_replay --generate-snapshot over many days).
+
+The data to read is split into tasks: chunks of per-event .json files and byte ranges
+of .jsonl segments. Each worker process reads and decodes its tasks, applies the filter
+and returns the events sorted by timestamp; the results are merged by timestamp.
+
+orjson is used for decoding when installed (pip install orjson), the json module otherwise.
+"""
+
+import os
+import json
+import heapq
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("EventBulkLoad")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+DECODER = "orjson" if orjson else "json"
+loads = orjson.loads if orjson else json.loads
+
+# Task sizes: small enough to balance the workers, large enough to amortize the
+# per-task overhead (scheduling, pickling the result)
+FILES_PER_TASK = 500
+SEGMENT_BYTES_PER_TASK = 4 * 1024 * 1024
+
+
+class FilesTask(NamedTuple):
+    paths: Tuple[str, ...]
+
+
+class SegmentTask(NamedTuple):
+    """The lines of path starting in [start_offset, end_offset)."""
+    path: str
+    start_offset: int
+    end_offset: int
+    contains: Optional[bytes] = None
+
+
+Task = Union[FilesTask, SegmentTask]
+Filter = Optional[Callable[[Dict[str, Any]], bool]]
+
+
+def file_tasks(paths: Sequence[str], per_task: Optional[int] = None) -> List[FilesTask]:
+    per_task = per_task or FILES_PER_TASK
+    return [FilesTask(tuple(paths[i:i + per_task])) for i in range(0, len(paths), per_task)]
+
+
+def segment_tasks(
+    path: str,
+    start_offset: int = 0,
+    end_offset: Optional[int] = None,
+    contains: Optional[bytes] = None,
+    bytes_per_task: Optional[int] = None
+) -> List[SegmentTask]:
+    """
+    Splits a byte range of a segment into tasks. Split points need not be line starts:
+    each task owns the lines that start inside its range.
+
+    :param contains: Byte string a line must contain to be decoded (see read_segment).
+    """
+    if end_offset is None:
+        end_offset = os.path.getsize(path)
+    bytes_per_task = bytes_per_task or SEGMENT_BYTES_PER_TASK
+    return [
+        SegmentTask(path, lo, min(lo + bytes_per_task, end_offset), contains)
+        for lo in range(start_offset, end_offset, bytes_per_task)
+    ]
+
+
+def decode_files(paths: Sequence[str], keep: Filter = None) -> List[Dict[str, Any]]:
+    events = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                event = loads(f.read())
+        except Exception as e:
+            logger.error(f"Skipping unreadable {path}: {e}")
+            continue
+        if keep is None or keep(event):
+            events.append(event)
+    return events
+
+
+def decode_range(
+    path: str,
+    start_offset: int,
+    end_offset: int,
+    keep: Filter = None,
+    contains: Optional[bytes] = None
+) -> List[Dict[str, Any]]:
+    """Events of the lines of a segment starting in [start_offset, end_offset)."""
+    events = []
+    try:
+        with open(path, "rb") as f:
+            if start_offset > 0:
+                # Finish the line that crosses start_offset: it belongs to the previous range
+                f.seek(start_offset - 1)
+                f.readline()
+            pos = f.tell()
+            if pos >= end_offset:
+                return events
+            data = f.read(end_offset - pos)
+            if not data.endswith(b"\n"):
+                data += f.readline()  # The last line may end past end_offset
+    except OSError as e:
+        logger.error(f"Skipping unreadable {path}: {e}")
+        return events
+
+    for line in data.split(b"\n"):
+        if not line or (contains is not None and contains not in line):
+            continue
+        try:
+            event = loads(line)
+        except ValueError:
+            logger.warning(f"Skipping unreadable line in {path}")
+            continue
+        if keep is None or keep(event):
+            events.append(event)
+    return events
+
+
+def _timestamp(event: Dict[str, Any]) -> float:
+    return event.get("timestamp", 0)
+
+
+def run_task(task: Task, keep: Filter = None) -> List[Dict[str, Any]]:
+    """Decodes one task; the events are returned sorted by timestamp."""
+    if isinstance(task, FilesTask):
+        events = decode_files(task.paths, keep)
+    else:
+        events = decode_range(task.path, task.start_offset, task.end_offset, keep, task.contains)
+    # Usually already in order (filenames and segments are written in time order)
+    events.sort(key=_timestamp)
+    return events
+
+
+def load_parallel(tasks: Sequence[Task], keep: Filter = None, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Decodes tasks in a pool of worker processes and returns all events in timestamp order.
+
+    :param keep: Filter applied in the workers; must be picklable (a module-level
+        function or a functools.partial of one).
+    :param workers: Number of processes (default: CPU count). With 1 worker, or a single
+        task, everything runs in this process.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = [run_task(task, keep) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_task, tasks, itertools.repeat(keep)))
+    return list(heapq.merge(*results, key=_timestamp))
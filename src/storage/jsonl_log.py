@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import logging
+import datetime
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from shared.ids import uuid7
+from storage.layout import list_day_files
+
+logger = logging.getLogger("SegmentedEventLog")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def segment_name(first_timestamp: float) -> str:
+    """
+    Segment files sort by the timestamp of their first event: <ts>_<uuid7>_segment.jsonl
+    (the id keeps names unique when several processes write the same directory).
+    """
+    return f"{first_timestamp:.3f}_{uuid7(first_timestamp)}_segment{SEGMENT_SUFFIX}"
+
+
+def list_segments(day_dir: str) -> List[str]:
+    """Segment paths of a day directory (including shard subdirectories), oldest first."""
+    return list_day_files(day_dir, SEGMENT_SUFFIX)
+
+
+def read_segment(
+    path: str,
+    contains: Optional[bytes] = None,
+    start_offset: int = 0,
+    end_offset: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the events of one segment. A torn last line (crash mid-write) is skipped.
+
+    :param contains: If set, lines without this byte string are skipped before decoding
+        (a cheap prefilter; callers still check the decoded event).
+    :param start_offset: Byte offset to start at (a line start, see segment_offset).
+    :param end_offset: Byte offset to stop at (None = end of file).
+    """
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            if end_offset is not None and line_offset >= end_offset:
+                return
+            if contains is not None and contains not in line:
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable line at byte {line_offset} in {path}")
+
+
+def _line_timestamp(line: bytes) -> Optional[float]:
+    try:
+        return json.loads(line).get("timestamp")
+    except (ValueError, AttributeError):
+        return None
+
+
+def segment_offset(path: str, timestamp: float) -> int:
+    """
+    Byte offset of the first line whose event timestamp is >= timestamp (file size if
+    none), found by bisecting byte offsets: O(log size) line reads instead of a scan.
+    Relies on segments being in time order, which append order gives. An unreadable
+    line (torn tail) counts as not earlier, so the offset can only be conservative:
+    callers may see a few earlier events (and must filter), never miss one.
+    """
+    with open(path, "rb") as f:
+        # lo is a line start not after the answer; hi is a line start (or EOF) not before it
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            if mid > 0:
+                f.readline()  # Align to the next line start
+            pos = f.tell()
+            if pos >= hi:
+                # No line starts in (mid, hi): decide on the line at lo
+                f.seek(lo)
+                ts = _line_timestamp(f.readline())
+                if ts is None or ts >= timestamp:
+                    hi = lo
+                else:
+                    lo = f.tell()
+                continue
+            ts = _line_timestamp(f.readline())
+            if ts is None or ts >= timestamp:
+                hi = pos
+            else:
+                lo = f.tell()
+        return lo
+
+
+class _Segment:
+    """Open segment file of one shard."""
+    __slots__ = ("file", "path", "date", "opened_at", "size")
+
+    def __init__(self, file, path: str, date: str, opened_at: float, size: int):
+        self.file = file
+        self.path = path
+        self.date = date
+        self.opened_at = opened_at
+        self.size = size
+
+
+class SegmentedEventLog:
+    """
+    Append-only event log: compact JSON lines in segment files under
+    <root>/<YYYY-MM-DD>/[<shard>/].
+
+    With shard_of, each event goes to the segment of its shard directory (e.g. one per
+    camera, see storage.layout.shard_name); one segment per shard is open at a time.
+    A segment is rolled when it reaches max_segment_bytes, when it is older than
+    max_segment_seconds, or when the event date changes. Durability is a group commit:
+    open files are flushed and fsync'ed once every fsync_every events or fsync_interval_ms
+    (whichever comes first); a small background thread syncs an idle tail.
+    fsync_every=1 syncs every event. Without fsync_interval_ms (None or 0) there is no
+    background thread: every batch is flushed to the OS instead, so readers see it
+    at once, and only fsync_every (if set) forces it to disk; with neither setting,
+    durability is left to the OS.
+
+    on_write, if set, is called after every batch with (event, segment path, byte offset,
+    end offset) per event (e.g. storage.manifest.ManifestWriter.add).
+    """
+    def __init__(
+        self,
+        root: str = "events",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: float = 3600.0,
+        fsync_interval_ms: Optional[float] = 200.0,
+        fsync_every: Optional[int] = 100,
+        shard_of: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+        on_write: Optional[Callable[[List[Tuple[Dict[str, Any], str, int, int]]], None]] = None
+    ):
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.fsync_interval = fsync_interval_ms / 1000.0 if fsync_interval_ms else None
+        self.fsync_every = fsync_every
+        self.shard_of = shard_of
+        self.on_write = on_write
+
+        self._lock = threading.Lock()
+        self._segments: Dict[Optional[str], _Segment] = {}
+        self._dirty = set()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        # Metrics
+        self.appended = 0
+        self.syncs = 0
+        self.segments_opened = 0
+
+        self._closed = threading.Event()
+        self._syncer = None
+        if self.fsync_interval:
+            self._syncer = threading.Thread(target=self._sync_loop, name="event-log-sync", daemon=True)
+            self._syncer.start()
+
+    def append(self, event: Dict[str, Any]) -> str:
+        """
+        Appends one event and returns the segment path it was written to.
+        """
+        return self.extend([event])[0]
+
+    def extend(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Appends a batch of events under one lock acquisition; the group-commit check runs
+        once for the whole batch. Returns the segment path of each event.
+        """
+        encoded = []
+        for event in events:
+            line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+            timestamp = event.get("timestamp") or time.time()
+            date_str = datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+            shard = self.shard_of(event) if self.shard_of else None
+            encoded.append((event, line, timestamp, date_str, shard))
+
+        paths = []
+        written = []
+        with self._lock:
+            for event, line, timestamp, date_str, shard in encoded:
+                segment = self._segments.get(shard)
+                if self._needs_roll(segment, date_str, len(line)):
+                    segment = self._roll(shard, date_str, timestamp)
+                if self.on_write:
+                    written.append((event, segment.path, segment.size, segment.size + len(line)))
+                segment.file.write(line)
+                segment.size += len(line)
+                self._dirty.add(shard)
+                self._pending += 1
+                self.appended += 1
+                paths.append(segment.path)
+            if written:
+                self.on_write(written)
+
+            if self.fsync_every and self._pending >= self.fsync_every:
+                self._sync_locked()
+            elif self.fsync_interval and time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+            elif not self.fsync_interval:
+                self._flush_locked()
+        return paths
+
+    def flush(self) -> None:
+        """Flushes and fsyncs pending events (whatever the group-commit settings)."""
+        with self._lock:
+            self._sync_locked(fsync=True)
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._sync_locked()
+            for shard in list(self._segments):
+                self._close_segment(shard)
+        if self._syncer:
+            self._syncer.join(timeout=1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _needs_roll(self, segment: Optional[_Segment], date_str: str, incoming: int) -> bool:
+        if segment is None or date_str != segment.date:
+            return True
+        if segment.size and segment.size + incoming > self.max_segment_bytes:
+            return True
+        return time.monotonic() - segment.opened_at >= self.max_segment_seconds
+
+    def _roll(self, shard: Optional[str], date_str: str, timestamp: float) -> _Segment:
+        if shard in self._segments:
+            self._sync_locked()
+            self._close_segment(shard)
+        day_dir = os.path.join(self.root, date_str, shard) if shard else os.path.join(self.root, date_str)
+        os.makedirs(day_dir, exist_ok=True)
+
+        path = os.path.join(day_dir, segment_name(timestamp))
+        f = open(path, "ab")
+        segment = self._segments[shard] = _Segment(f, path, date_str, time.monotonic(), f.tell())
+        self.segments_opened += 1
+        logger.info(f"Event log segment opened: {path}")
+        return segment
+
+    def _flush_locked(self) -> None:
+        """Hands buffered writes to the OS without fsync; they still count as pending."""
+        for shard in self._dirty:
+            self._segments[shard].file.flush()
+
+    def _sync_locked(self, fsync: bool = False) -> None:
+        if not self._pending:
+            return
+        for shard in self._dirty:
+            segment = self._segments[shard]
+            segment.file.flush()
+            if fsync or self.fsync_every or self.fsync_interval:
+                os.fsync(segment.file.fileno())
+        self._dirty.clear()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.syncs += 1
+
+    def _close_segment(self, shard: Optional[str]) -> None:
+        segment = self._segments.pop(shard)
+        segment.file.close()
+
+    def _sync_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._pending and time.monotonic() - self._last_sync >= self.fsync_interval:
+                    self._sync_locked()
@@ -0,0 +1,83 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# Only subdirectories with these prefixes are shards (day directories may hold others,
+# e.g. analysis_snapshots/)
+SHARD_PREFIXES = ("cam_", "src_", "node_")
+
+
+def event_filename(event: Dict[str, Any]) -> str:
+    """
+    <timestamp>_<id>_<EVENT_TYPE>.json. The fixed-width timestamp makes names sort by
+    time; the time-ordered id (shared.ids.uuid7) breaks ties within a millisecond and
+    keeps names unique across processes.
+    """
+    return f"{event['timestamp']:.3f}_{event['id']}_{event['event_type']}.json"
+
+
+def parse_event_filename(filename: str) -> Optional[Tuple[float, str]]:
+    """
+    (timestamp, event_type) from an event filename, without opening it. Accepts
+    <ts>_<uuid7>_<TYPE>.json and the older <ts>_<TYPE>.json; None if not an event file.
+    """
+    if not filename.endswith(".json"):
+        return None
+    ts_str, _, rest = filename[:-5].partition("_")
+    try:
+        ts = float(ts_str)
+    except ValueError:
+        return None
+    # uuid: 36 chars, dashes at 8/13/18/23
+    if len(rest) > 37 and rest[36] == "_" and rest[8] == "-" and rest[23] == "-":
+        rest = rest[37:]
+    return ts, rest
+
+
+def file_timestamp(filename: str) -> Optional[float]:
+    """Leading <ts> of an event or segment filename."""
+    try:
+        return float(filename.partition("_")[0])
+    except ValueError:
+        return None
+
+
+def shard_name(source: Union[Dict[str, Any], str, None]) -> Optional[str]:
+    """
+    Shard directory of an event inside its day directory: cam_<camera_id> when the
+    source names a camera, src_<module> otherwise (None without a source). Pre-v1.2
+    events carry the source as a plain string, used as the module.
+    """
+    if not source:
+        return None
+    if isinstance(source, str):
+        return "src_" + _UNSAFE.sub("_", source)
+    if source.get("camera_id") is not None:
+        return "cam_" + _UNSAFE.sub("_", str(source["camera_id"]))
+    return "src_" + _UNSAFE.sub("_", str(source.get("module", "unknown")))
+
+
+def node_shard(name: str) -> str:
+    """Fixed shard for every event of a process or node (EVENT_SHARD): node_<name>."""
+    return "node_" + _UNSAFE.sub("_", name)
+
+
+def list_day_files(day_dir: str, suffix: str) -> List[str]:
+    """
+    Paths ending in suffix in a day directory and its shard subdirectories (SHARD_PREFIXES),
+    sorted by filename (i.e. by time) across shards.
+    """
+    if not os.path.isdir(day_dir):
+        return []
+    found = []
+    with os.scandir(day_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith(SHARD_PREFIXES) and entry.is_dir():
+                with os.scandir(entry.path) as shard_entries:
+                    found.extend(e.path for e in shard_entries if e.name.endswith(suffix) and e.is_file())
+            elif entry.name.endswith(suffix):
+                found.append(entry.path)
+    found.sort(key=os.path.basename)
+    return found
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Per-day sidecar manifest: one compact line per event with the fields replay filters on
+and where the body lives, so queries do not list and parse event files.
+Execute (from src/): python3 -m storage.manifest [--events-dir events] [--date YYYY-MM-DD]
+(rebuilds the manifests from the event files and segments).
+
+Line format (tab-separated, in write order):
+    timestamp  id  event_type  category  severity  location  offset  chain
+location is the data file relative to the day directory, offset the byte offset of the
+line in a .jsonl segment (-1 for one-file-per-event), chain the comma-joined event_chain.
+
+Watermark lines record how far each segment is indexed:
+    #  location  end
+A manifest is only used while it covers the data: a segment larger than its watermark
+or a per-event file without an entry (written by a process that does not maintain the
+manifest) makes read_manifest return None, and readers scan the day instead.
+"""
+
+import os
+import json
+import bisect
+import argparse
+import datetime
+import logging
+import threading
+from collections import Counter
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from storage.layout import SHARD_PREFIXES, list_day_files
+from storage.jsonl_log import SEGMENT_SUFFIX
+
+logger = logging.getLogger("EventManifest")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+MANIFEST_NAME = "manifest.tsv"
+MARK = "#"
+
+
+class ManifestEntry(NamedTuple):
+    timestamp: float
+    id: str
+    event_type: str
+    category: str
+    severity: str
+    location: str
+    offset: int
+    chain: Tuple[str, ...]
+
+
+def manifest_path(day_dir: str) -> str:
+    return os.path.join(day_dir, MANIFEST_NAME)
+
+
+def _format(event: Dict[str, Any], location: str, offset: int) -> str:
+    return "\t".join((
+        repr(float(event.get("timestamp", 0.0))),
+        str(event.get("id", "")),
+        # Pre-v1.2 events use "type" / "severity"
+        str(event.get("event_type") or event.get("type") or ""),
+        str(event.get("event_category") or ""),
+        str(event.get("severity_hint") or event.get("severity") or ""),
+        location,
+        str(offset),
+        ",".join(event.get("event_chain") or ())
+    )) + "\n"
+
+
+def _format_mark(location: str, end: int) -> str:
+    return f"{MARK}\t{location}\t{end}\n"
+
+
+def _marks(text: str) -> Dict[str, int]:
+    """Indexed end offset of each segment (the highest watermark wins)."""
+    marks: Dict[str, int] = {}
+    # Watermarks are few: find them without walking every line
+    text = "\n" + text
+    i = text.find("\n" + MARK + "\t")
+    while i != -1:
+        eol = text.find("\n", i + 1)
+        fields = text[i + 1:eol if eol != -1 else len(text)].split("\t")
+        if len(fields) == 3 and fields[2].isdigit() and int(fields[2]) > marks.get(fields[1], -1):
+            marks[fields[1]] = int(fields[2])
+        i = text.find("\n" + MARK + "\t", eol) if eol != -1 else -1
+    return marks
+
+
+def _covers(day_dir: str, text: str, lines: List[str]) -> bool:
+    """Whether the manifest indexes every event currently stored in the day directory."""
+    marks = _marks(text)
+    for path in list_day_files(day_dir, SEGMENT_SUFFIX):
+        if os.path.getsize(path) > marks.get(os.path.relpath(path, day_dir), 0):
+            return False
+    files = list_day_files(day_dir, ".json")
+    if files:
+        indexed = {line.split("\t", 6)[5] for line in lines if "\t-1\t" in line}
+        if any(os.path.relpath(path, day_dir) not in indexed for path in files):
+            return False
+    return True
+
+
+def _parse(line: str) -> Optional[ManifestEntry]:
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) != 8:
+        return None  # Torn line
+    try:
+        return ManifestEntry(
+            float(fields[0]), fields[1], fields[2], fields[3], fields[4], fields[5], int(fields[6]),
+            tuple(fields[7].split(",")) if fields[7] else ()
+        )
+    except ValueError:
+        return None
+
+
+def _line_filter(event_type: Optional[str], start: Optional[float], end: Optional[float]):
+    """Cheap per-line test on the raw text (type as a field, then the leading timestamp)."""
+    needle = f"\t{event_type}\t" if event_type else None
+
+    def keep(line: str) -> bool:
+        if needle is not None and needle not in line:
+            return False
+        if start is None and end is None:
+            return True
+        try:
+            ts = float(line[:line.index("\t")])
+        except ValueError:
+            return False
+        return (start is None or ts >= start) and (end is None or ts < end)
+    return keep
+
+
+def read_manifest(
+    day_dir: str,
+    event_type: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Optional[List[ManifestEntry]]:
+    """
+    Entries of a day sorted by timestamp, or None if the day has no manifest or has
+    data the manifest does not cover (see the module docstring).
+    Filters are applied on the raw lines, so only matching entries are parsed.
+    """
+    try:
+        with open(manifest_path(day_dir), "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    lines = text.splitlines(keepends=True)
+    if not _covers(day_dir, text, lines):
+        logger.info(f"Manifest of {day_dir} is behind its data; scanning the day")
+        return None
+
+    if event_type or start is not None or end is not None:
+        lines = filter(_line_filter(event_type, start, end), lines)
+    entries = []
+    # An event indexed twice (bootstrap scan racing its writer, per-event file kept
+    # after migrating) is kept once
+    seen = set()
+    for entry in map(_parse, lines):
+        if entry is not None and entry.id not in seen:
+            seen.add(entry.id)
+            entries.append(entry)
+    # Concurrent writers append in their own order
+    entries.sort(key=attrgetter("timestamp"))
+    return entries
+
+
+def select(
+    entries: Sequence[ManifestEntry],
+    event_type: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Iterator[ManifestEntry]:
+    """Entries with start <= timestamp < end (bisected) and, optionally, the given type."""
+    lo = bisect.bisect_left(entries, start, key=lambda e: e.timestamp) if start is not None else 0
+    hi = bisect.bisect_left(entries, end, key=lambda e: e.timestamp) if end is not None else len(entries)
+    for i in range(lo, hi):
+        if not event_type or entries[i].event_type == event_type:
+            yield entries[i]
+
+
+def counts(entries: Iterator[ManifestEntry]) -> Counter:
+    """Events per type."""
+    return Counter(e.event_type for e in entries)
+
+
+def histogram(entries: Iterator[ManifestEntry], bucket_seconds: float) -> Dict[float, Counter]:
+    """Events per type in time buckets of bucket_seconds (keyed by bucket start)."""
+    buckets: Dict[float, Counter] = {}
+    for e in entries:
+        key = e.timestamp - e.timestamp % bucket_seconds
+        buckets.setdefault(key, Counter())[e.event_type] += 1
+    return buckets
+
+
+class BodyReader:
+    """
+    Loads event bodies for manifest entries of one day, keeping the day's segment files
+    open between entries (entries of a segment are read with seek + readline).
+    """
+    def __init__(self, day_dir: str):
+        self.day_dir = day_dir
+        self._files: Dict[str, Any] = {}
+
+    def load(self, entry: ManifestEntry) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.day_dir, entry.location)
+        try:
+            if entry.offset < 0:
+                with open(path, "r") as f:
+                    return json.load(f)
+            f = self._files.get(path)
+            if f is None:
+                f = self._files[path] = open(path, "rb")
+            f.seek(entry.offset)
+            return json.loads(f.readline())
+        except (OSError, ValueError) as e:
+            # A line indexed before its segment was flushed, or a deleted file
+            logger.warning(f"Manifest entry {entry.id} unreadable at {path}:{entry.offset}: {e}")
+            return None
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _scan_day(day_dir: str, marks: Optional[Dict[str, int]] = None) -> Iterator[Tuple[Dict[str, Any], str, int]]:
+    """
+    (event, location, offset) for every event stored in a day directory.
+
+    :param marks: If given, filled with the scanned size of each segment.
+    """
+    for path in list_day_files(day_dir, ".json"):
+        try:
+            with open(path, "r") as f:
+                event = json.load(f)
+        except Exception as e:
+            logger.error(f"Skipping unreadable {path}: {e}")
+            continue
+        yield event, os.path.relpath(path, day_dir), -1
+
+    for path in list_day_files(day_dir, SEGMENT_SUFFIX):
+        location = os.path.relpath(path, day_dir)
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Torn line
+                yield event, location, line_offset
+        if marks is not None:
+            marks[location] = offset
+
+
+def scan_entries(day_dir: str) -> List[ManifestEntry]:
+    """Entries of a day computed from the data (for days without a manifest), sorted by timestamp."""
+    entries = [_parse(_format(event, location, offset)) for event, location, offset in _scan_day(day_dir)]
+    entries.sort(key=attrgetter("timestamp"))
+    return entries
+
+
+def entry_of(event: Dict[str, Any]) -> ManifestEntry:
+    """Entry for an event already in memory (location unknown)."""
+    return _parse(_format(event, "", -1))
+
+
+def _write_entries(f, day_dir: str, exclude_ids: frozenset = frozenset()) -> int:
+    marks: Dict[str, int] = {}
+    n = 0
+    for event, location, offset in _scan_day(day_dir, marks):
+        if event.get("id") in exclude_ids:
+            continue
+        f.write(_format(event, location, offset))
+        n += 1
+    # Watermarks last: a reader never sees a segment as covered before its entries
+    f.writelines(_format_mark(location, end) for location, end in marks.items())
+    return n
+
+
+def build_manifest(day_dir: str) -> int:
+    """
+    (Re)writes a day's manifest from its event files and segments; returns the number
+    of entries. The new manifest replaces the old one atomically (a process still
+    appending to the old file is not lost: its data is past the new watermarks, so
+    readers scan the day until the next rebuild).
+    """
+    tmp_path = manifest_path(day_dir) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        n = _write_entries(f, day_dir)
+    os.replace(tmp_path, manifest_path(day_dir))
+    return n
+
+
+class ManifestWriter:
+    """
+    Appends entries to the manifests of the day directories events are written to.
+
+    The first time a day gets a manifest, it is built from the data already in the
+    directory, so a manifest always covers the whole day. Lines, and the watermark of
+    each segment written to, are flushed per batch; the manifest can always be rebuilt
+    from the data (python -m storage.manifest).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, Any] = {}
+
+    def add(self, written: List[Tuple[Dict[str, Any], str, int, int]]) -> None:
+        """
+        Records written events: (event, data path, byte offset and end offset of the line
+        in a segment, or -1, -1 for per-event files).
+        """
+        with self._lock:
+            by_day: Dict[str, List[str]] = {}
+            ends: Dict[str, Dict[str, int]] = {}
+            for event, path, offset, end in written:
+                day_dir = self._day_dir(path)
+                location = os.path.relpath(path, day_dir)
+                by_day.setdefault(day_dir, []).append(_format(event, location, offset))
+                if end >= 0:
+                    ends.setdefault(day_dir, {})[location] = end
+            for day_dir, lines in by_day.items():
+                f = self._files.get(day_dir)
+                if f is None:
+                    batch_ids = frozenset(event.get("id") for event, _, _, _ in written)
+                    f = self._files[day_dir] = self._open(day_dir, batch_ids)
+                lines.extend(_format_mark(location, end) for location, end in ends.get(day_dir, {}).items())
+                f.writelines(lines)
+                f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+    @staticmethod
+    def _day_dir(path: str) -> str:
+        # <root>/<date>/[<shard>/]<file>
+        parent = os.path.dirname(path)
+        return os.path.dirname(parent) if os.path.basename(parent).startswith(SHARD_PREFIXES) else parent
+
+    def _open(self, day_dir: str, batch_ids: frozenset):
+        path = manifest_path(day_dir)
+        try:
+            # Exclusive create: only one process bootstraps a day, and a manifest other
+            # processes already append to is never replaced
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+        except FileExistsError:
+            return open(path, "a", encoding="utf-8")
+        f = os.fdopen(fd, "a", encoding="utf-8")
+        # The batch may or may not be visible to the scan yet: leave it out, it is appended next
+        n = _write_entries(f, day_dir, exclude_ids=batch_ids)
+        logger.info(f"Manifest created for {day_dir} ({n} existing events)")
+        return f
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-day event manifests")
+    parser.add_argument("--events-dir", type=str, default="events", help="Events root directory")
+    parser.add_argument("--date", type=str, help="Only rebuild this day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.events_dir):
+        print(f"No events directory found at {args.events_dir}")
+        return
+
+    days = [args.date] if args.date else sorted(
+        d for d in os.listdir(args.events_dir) if os.path.isdir(os.path.join(args.events_dir, d))
+    )
+    for date_str in days:
+        try:
+            datetime.datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            continue
+        n = build_manifest(os.path.join(args.events_dir, date_str))
+        print(f"{date_str}: {n} entries")
+
+
+if __name__ == "__main__":
+    main()
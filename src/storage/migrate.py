@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Converts one-file-per-event directories into append-only .jsonl segments.
+Execute (from src/): python3 -m storage.migrate [--events-dir events] [--date YYYY-MM-DD] [--delete]
+
+With --to sqlite, per-event files and .jsonl segments are imported into the indexed
+SQLite store instead (events/events.db unless --db is given); originals are kept, so
+--delete is rejected.
+
+Events are written in timestamp order. Files whose event id is already present in a
+segment are skipped, so the tool can be re-run safely. Originals are only deleted
+(--delete) after the day's segments have been read back and every id verified.
+"""
+
+import os
+import json
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+from storage.jsonl_log import SegmentedEventLog, list_segments, read_segment
+from storage.sqlite_store import DB_FILENAME, SqliteEventStore
+from storage.layout import list_day_files, shard_name
+from storage.manifest import build_manifest
+
+logger = logging.getLogger("EventLogMigration")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+
+def _load_day_files(day_dir: str) -> List[Tuple[str, Dict]]:
+    loaded = []
+    for path in list_day_files(day_dir, ".json"):
+        filename = os.path.basename(path)
+        try:
+            with open(path, "r") as f:
+                event = json.load(f)
+        except Exception as e:
+            logger.error(f"Skipping unreadable {path}: {e}")
+            continue
+        if "timestamp" not in event:
+            # Legacy files encode the timestamp in the name: <ts>_<TYPE>.json
+            try:
+                event["timestamp"] = float(filename.split("_", 1)[0])
+            except ValueError:
+                logger.error(f"Skipping {path}: no timestamp")
+                continue
+        loaded.append((path, event))
+    loaded.sort(key=lambda item: item[1]["timestamp"])
+    return loaded
+
+
+def migrate_day(events_dir: str, date_str: str, delete: bool = False, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Migrates one day directory; returns counters (files, migrated, skipped, deleted).
+    """
+    day_dir = os.path.join(events_dir, date_str)
+    files = _load_day_files(day_dir)
+    existing_ids = {e.get("id") for path in list_segments(day_dir) for e in read_segment(path)}
+
+    pending = [(path, event) for path, event in files if event.get("id") not in existing_ids or event.get("id") is None]
+    stats = {"files": len(files), "migrated": 0, "skipped": len(files) - len(pending), "deleted": 0}
+    if dry_run or not pending:
+        stats["migrated"] = len(pending) if dry_run else 0
+        return stats
+
+    # fsync once at the end rather than per event
+    with SegmentedEventLog(
+        events_dir, fsync_interval_ms=None, fsync_every=None, shard_of=lambda e: shard_name(e.get("source"))
+    ) as log:
+        for _, event in pending:
+            log.append(event)
+        log.flush()
+    stats["migrated"] = len(pending)
+
+    if delete:
+        written_ids = {e.get("id") for path in list_segments(day_dir) for e in read_segment(path)}
+        missing = [path for path, event in files if event.get("id") not in written_ids]
+        if missing:
+            logger.error(f"{date_str}: {len(missing)} events not found in segments; originals kept")
+            return stats
+        for path, _ in files:
+            os.remove(path)
+            stats["deleted"] += 1
+    # Locations changed: reindex the day
+    build_manifest(day_dir)
+    return stats
+
+
+def import_day_sqlite(
+    events_dir: str, date_str: str, db: Optional[SqliteEventStore], dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Imports one day directory (files and segments) into the SQLite store in one
+    transaction; ids already present are ignored. Returns counters (files, migrated).
+    With dry_run nothing is written; db may then be None (no database yet).
+    """
+    day_dir = os.path.join(events_dir, date_str)
+    events = [event for _, event in _load_day_files(day_dir)]
+    events.extend(e for path in list_segments(day_dir) for e in read_segment(path))
+    events = [e for e in events if e.get("id")]
+    if dry_run:
+        ids = {e["id"] for e in events}
+        known = db.known_ids(ids) if db is not None else set()
+        return {"files": len(events), "migrated": len(ids - known), "skipped": 0, "deleted": 0}
+    before = db.count()
+    db.extend(events)
+    return {"files": len(events), "migrated": db.count() - before, "skipped": 0, "deleted": 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate per-file events to .jsonl segments")
+    parser.add_argument("--events-dir", type=str, default="events", help="Events root directory")
+    parser.add_argument("--date", type=str, help="Only migrate this day (YYYY-MM-DD)")
+    parser.add_argument("--delete", action="store_true", help="Delete the per-event files once verified")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be migrated")
+    parser.add_argument("--to", type=str, choices=["jsonl", "sqlite"], default="jsonl", help="Target store")
+    parser.add_argument("--db", type=str, help="SQLite database (default: <events-dir>/events.db)")
+    args = parser.parse_args()
+    if args.to == "sqlite" and args.delete:
+        # The import keeps the originals; use the jsonl migration to remove them
+        parser.error("--delete is not supported with --to sqlite")
+
+    if not os.path.isdir(args.events_dir):
+        print(f"No events directory found at {args.events_dir}")
+        return
+
+    days = [args.date] if args.date else sorted(
+        d for d in os.listdir(args.events_dir) if os.path.isdir(os.path.join(args.events_dir, d))
+    )
+    if args.to == "sqlite":
+        db_path = args.db or os.path.join(args.events_dir, DB_FILENAME)
+        # A dry run must not create the database
+        db = SqliteEventStore(db_path) if os.path.exists(db_path) or not args.dry_run else None
+        try:
+            for date_str in days:
+                stats = import_day_sqlite(args.events_dir, date_str, db, dry_run=args.dry_run)
+                print(
+                    f"{date_str}: events={stats['files']} imported={stats['migrated']}"
+                    f"{' (dry run)' if args.dry_run else ''}"
+                )
+        finally:
+            if db is not None:
+                db.close()
+        return
+
+    for date_str in days:
+        stats = migrate_day(args.events_dir, date_str, delete=args.delete, dry_run=args.dry_run)
+        print(
+            f"{date_str}: files={stats['files']} migrated={stats['migrated']} "
+            f"skipped={stats['skipped']} deleted={stats['deleted']}{' (dry run)' if args.dry_run else ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import os
+import json
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+logger = logging.getLogger("SqliteEventStore")
+if not logger.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+DB_FILENAME = "events.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    event_type TEXT NOT NULL,
+    event_category TEXT,
+    severity_hint TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_type_timestamp ON events (event_type, timestamp);
+
+-- Composite event -> the events of its event_chain, in chain order
+CREATE TABLE IF NOT EXISTS event_chain (
+    event_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    chained_id TEXT NOT NULL,
+    PRIMARY KEY (event_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_event_chain_chained ON event_chain (chained_id);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    trigger_reason TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots (timestamp);
+"""
+
+
+class SqliteEventStore:
+    """
+    Indexed event and snapshot store in a single SQLite database (WAL mode).
+
+    Events are inserted in batches (one transaction per extend() call) and queried by
+    time range and type through the (timestamp) and (event_type, timestamp) indexes;
+    event_chain links are kept in their own table so composites can be resolved both ways.
+    The connection is shared between threads behind a lock.
+    """
+    def __init__(self, path: str = os.path.join("events", DB_FILENAME)):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only fsyncs at checkpoints; a crash can lose the last commits, not corrupt
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Metrics
+        self.appended = 0
+        self.commits = 0
+
+    # --- Writes ---
+
+    def append(self, event: Dict[str, Any]) -> str:
+        """Inserts one event; returns the database path."""
+        return self.extend([event])[0]
+
+    def extend(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Inserts a batch of events in one transaction. Events already stored (same id)
+        are ignored, so re-importing is safe. Returns the database path per event.
+        """
+        rows = []
+        links = []
+        for event in events:
+            rows.append((
+                event["id"],
+                event["timestamp"],
+                # Pre-v1.2 events use "type" / "severity"
+                event.get("event_type") or event.get("type", "UNKNOWN"),
+                event.get("event_category"),
+                event.get("severity_hint", event.get("severity")),
+                json.dumps(event, separators=(",", ":"))
+            ))
+            links.extend((event["id"], pos, chained) for pos, chained in enumerate(event.get("event_chain") or []))
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if links:
+                self._conn.executemany("INSERT OR IGNORE INTO event_chain VALUES (?, ?, ?)", links)
+            self.appended += len(rows)
+            self.commits += 1
+        return [self.path] * len(rows)
+
+    def insert_snapshot(self, snapshot: Dict[str, Any]) -> str:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (snapshot["snapshot_id"], snapshot["timestamp"], snapshot.get("trigger_reason"), json.dumps(snapshot))
+            )
+        return self.path
+
+    def flush(self) -> None:
+        """Commits are immediate; checkpoints the WAL into the main database file."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Queries ---
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        event_types: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Events with start <= timestamp < end (either bound optional) and, optionally, one
+        of event_types, in timestamp order.
+        """
+        return list(self.iter_query(start, end, event_types, limit))
+
+    def iter_query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        event_types: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        fetch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Streaming query(): rows are fetched fetch_size at a time."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        if event_types:
+            event_types = list(event_types)
+            clauses.append(f"event_type IN ({', '.join('?' * len(event_types))})")
+            params.extend(event_types)
+
+        sql = "SELECT body FROM events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            for (body,) in rows:
+                yield json.loads(body)
+
+    def chain(self, event_id: str) -> List[Dict[str, Any]]:
+        """The events referenced by a composite's event_chain, in chain order."""
+        return self._bodies(
+            "SELECT e.body FROM event_chain c JOIN events e ON e.id = c.chained_id "
+            "WHERE c.event_id = ? ORDER BY c.position",
+            (event_id,)
+        )
+
+    def referencing(self, event_id: str) -> List[Dict[str, Any]]:
+        """The composite events whose event_chain contains event_id."""
+        return self._bodies(
+            "SELECT e.body FROM event_chain c JOIN events e ON e.id = c.event_id "
+            "WHERE c.chained_id = ? ORDER BY e.timestamp",
+            (event_id,)
+        )
+
+    def known_ids(self, ids: Iterable[str]) -> Set[str]:
+        """The ids among ids already stored."""
+        ids = list(ids)
+        known = set()
+        with self._lock:
+            # Stays under SQLite's bound-parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id FROM events WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                known.update(row[0] for row in rows)
+        return known
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def query_snapshots(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._bodies(
+            "SELECT body FROM snapshots WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+            (start if start is not None else float("-inf"), end if end is not None else float("inf"))
+        )
+
+    def _bodies(self, sql: str, params) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+
+_stores: Dict[str, SqliteEventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def shared_store(path: str) -> SqliteEventStore:
+    """
+    Process-wide store per database path (event engine and snapshot engine share one
+    connection); closed at exit.
+    """
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SqliteEventStore(path)
+            atexit.register(store.close)
+            logger.info(f"SQLite event store opened: {path}")
+        return store
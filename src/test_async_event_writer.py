@@ -0,0 +1,124 @@
+import threading
+import unittest
+import event_engine
+import event_replay
+from event_test_utils import EventStoreTestCase
+from shared.metrics import Histogram
+from storage.async_writer import AsyncEventWriter
+
+
+class GatedSink:
+    """write() callback that blocks until released, to fill the queue deterministically."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.batches = []
+
+    def write(self, batch):
+        self.entered.set()
+        self.release.wait(5.0)
+        self.batches.append([e["i"] for e in batch])
+
+    @property
+    def written(self):
+        return [i for batch in self.batches for i in batch]
+
+
+class TestAsyncEventWriter(unittest.TestCase):
+    def fill(self, writer, sink, n):
+        """Submits event 0 (held by the writer thread), then n more into the queue."""
+        writer.submit({"i": 0})
+        self.assertTrue(sink.entered.wait(5.0))
+        return [writer.submit({"i": i}) for i in range(1, n + 1)]
+
+    def test_writes_in_order_and_flushes(self):
+        sink = GatedSink()
+        sink.release.set()
+        writer = AsyncEventWriter(sink.write, batch_size=8)
+        for i in range(100):
+            self.assertTrue(writer.submit({"i": i}))
+        self.assertTrue(writer.flush(5.0))
+        self.assertEqual(sink.written, list(range(100)))
+        self.assertTrue(all(len(b) <= 8 for b in sink.batches))
+        self.assertEqual(writer.written, 100)
+        self.assertEqual(writer.pending, 0)
+        writer.close()
+
+    def test_drop_oldest(self):
+        sink = GatedSink()
+        writer = AsyncEventWriter(sink.write, max_queue=3, overflow="drop_oldest")
+        self.assertEqual(self.fill(writer, sink, 5), [True] * 5)
+        sink.release.set()
+        writer.close()
+        self.assertEqual(sink.written, [0, 3, 4, 5])
+        self.assertEqual(writer.dropped, 2)
+
+    def test_drop_newest(self):
+        sink = GatedSink()
+        writer = AsyncEventWriter(sink.write, max_queue=3, overflow="drop_newest")
+        self.assertEqual(self.fill(writer, sink, 5), [True, True, True, False, False])
+        sink.release.set()
+        writer.close()
+        self.assertEqual(sink.written, [0, 1, 2, 3])
+
+    def test_block_times_out(self):
+        sink = GatedSink()
+        writer = AsyncEventWriter(sink.write, max_queue=1, overflow="block", block_timeout=0.05)
+        self.assertEqual(self.fill(writer, sink, 2), [True, False])
+        sink.release.set()
+        # Room again once the writer drains
+        self.assertTrue(writer.flush(5.0))
+        self.assertTrue(writer.submit({"i": 3}))
+        writer.close()
+        self.assertEqual(sink.written, [0, 1, 3])
+
+    def test_close_drains_and_rejects(self):
+        sink = GatedSink()
+        writer = AsyncEventWriter(sink.write)
+        self.fill(writer, sink, 10)
+        sink.release.set()
+        writer.close()
+        self.assertEqual(sink.written, list(range(11)))
+        self.assertFalse(writer.submit({"i": 99}))
+
+    def test_write_errors_are_counted(self):
+        def failing(batch):
+            raise IOError("disk full")
+        writer = AsyncEventWriter(failing)
+        writer.submit({"i": 0})
+        self.assertTrue(writer.flush(5.0))
+        writer.close()
+        self.assertEqual((writer.write_errors, writer.written), (1, 0))
+        self.assertEqual(writer.stats()["write_latency_ms"]["count"], 1)
+
+    def test_histogram(self):
+        hist = Histogram([1, 2, 4, 8])
+        for v in [0.5, 1, 1.5, 3, 3, 3, 7, 20]:
+            hist.record(v)
+        summary = hist.summary()
+        self.assertEqual(summary["count"], 8)
+        self.assertEqual(summary["buckets"], {"<=1": 2, "<=2": 1, "<=4": 3, "<=8": 1, ">8": 1})
+        self.assertEqual(hist.quantile(0.5), 4)
+        self.assertEqual(hist.quantile(1.0), 20)
+
+
+class TestAsyncEmitEvent(EventStoreTestCase):
+    EVENT_WRITER = "async"
+
+    def test_emit_returns_event_and_persists_on_flush(self):
+        ids = [event_engine.emit_event("TEST_EVENT", event_engine.CATEGORY_MOTION, {"n": n})["id"] for n in range(20)]
+        self.assertTrue(event_engine.flush_events(5.0))
+        self.assertEqual(sorted(e["id"] for e in event_replay.load_events()), sorted(ids))
+        self.assertEqual(event_engine.event_writer_stats()["written"], 20)
+
+    def test_caller_changes_do_not_reach_the_queued_event(self):
+        event = event_engine.emit_event("TEST_EVENT", event_engine.CATEGORY_MOTION, {"n": 0})
+        event["event_type"] = "CHANGED"
+        event["severity_hint"] = "high"
+        self.assertTrue(event_engine.flush_events(5.0))
+        [stored] = event_replay.load_events()
+        self.assertEqual((stored["event_type"], stored["severity_hint"]), ("TEST_EVENT", event_engine.SEVERITY_MEDIUM))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import numpy as np
+from processing.landmarks import NUM_LANDMARKS, LEFT_HIP, RIGHT_HIP
+from pipeline.composite_engine import (
+    CompositeEventEngine, Pattern, Rule, Matcher, Sequence, Count, Duration, POSTURE_STATE
+)
+from pipeline.fall_pipeline import FallDetectionPipeline
+
+
+def atomic(event_type, ts, entity_id="person_0", **fields):
+    return dict(id=f"{event_type}@{ts}", event_type=event_type, timestamp=ts, entity_id=entity_id, **fields)
+
+
+def posture(state, ts, entity_id="person_0"):
+    return {"event_type": POSTURE_STATE, "timestamp": ts, "entity_id": entity_id, "state": state}
+
+
+def make_pose(hip_y):
+    arr = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    arr[:, 0] = 0.5
+    arr[:, 1] = hip_y
+    arr[:, 3] = 1.0
+    arr[[LEFT_HIP, RIGHT_HIP], 1] = hip_y
+    return arr
+
+
+class TestRules(unittest.TestCase):
+    def test_sequence_within_window(self):
+        engine = CompositeEventEngine([
+            Sequence("BED_EXIT", [Pattern("LEFT_BED"), Pattern("STANDING_UP")], within=5.0, confidence=0.7)
+        ])
+        self.assertEqual(engine.process(atomic("LEFT_BED", 0.0)), [])
+        self.assertEqual(engine.process(atomic("NOISE", 1.0)), [])
+        matches = engine.process(atomic("STANDING_UP", 3.0))
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].event["event_type"], "BED_EXIT")
+        self.assertEqual(matches[0].event["event_chain"], ["LEFT_BED@0.0", "STANDING_UP@3.0"])
+
+        # Too slow: the partial match expires
+        engine.process(atomic("LEFT_BED", 10.0))
+        self.assertEqual(engine.process(atomic("STANDING_UP", 16.0)), [])
+
+    def test_count(self):
+        engine = CompositeEventEngine([
+            Count("RESTLESS", Pattern("RAPID_VERTICAL_MOVEMENT"), count=3, within=10.0, confidence=0.5)
+        ])
+        fired = [bool(engine.process(atomic("RAPID_VERTICAL_MOVEMENT", t))) for t in (0.0, 4.0, 12.0, 15.0, 18.0)]
+        self.assertEqual(fired, [False, False, False, False, True])
+
+    def test_duration_fires_once_per_episode(self):
+        engine = CompositeEventEngine([
+            Duration("LONG_ON_FLOOR", Pattern(POSTURE_STATE, where=lambda e: e["state"] == "ON_FLOOR"),
+                     seconds=5.0, confidence=0.9)
+        ])
+        fired = []
+        for t in range(12):
+            state = "STANDING" if t == 8 else "ON_FLOOR"
+            fired += [(t, m.event["duration"]) for m in engine.process(posture(state, float(t)))]
+        self.assertEqual(fired, [(5, 5.0)])  # Episode 9..11 is too short
+
+    def test_entities_are_independent(self):
+        engine = CompositeEventEngine([
+            Sequence("PAIR", [Pattern("A"), Pattern("B")], within=5.0, confidence=0.5)
+        ])
+        engine.process(atomic("A", 0.0, entity_id="person_0"))
+        self.assertEqual(engine.process(atomic("B", 1.0, entity_id="person_1")), [])
+        self.assertEqual(len(engine.process(atomic("B", 1.0, entity_id="person_0"))), 1)
+
+        engine.process(atomic("A", 2.0, entity_id="person_1"))
+        engine.drop_entity("person_1")
+        self.assertEqual(engine.process(atomic("B", 3.0, entity_id="person_1")), [])
+
+    def test_rules_must_define_the_operator(self):
+        class Incomplete(Rule):
+            @property
+            def event_types(self):
+                return {"A"}
+
+        with self.assertRaises(TypeError):
+            Rule("X", confidence=0.5)
+        with self.assertRaises(TypeError):
+            Incomplete("X", confidence=0.5)
+        with self.assertRaises(TypeError):
+            Matcher()
+
+
+class TestDefaultFallRules(unittest.TestCase):
+    def capture(self, pipeline):
+        emitted = []
+        original = pipeline._emit_composite
+
+        def spy(match):
+            emitted.append(match.event)
+            original(match)
+        pipeline._emit_composite = spy
+        return emitted
+
+    def test_potential_fall_threshold(self):
+        # Hip drop of 0.2 is a rapid movement but below 1.5x the motion threshold (0.27)
+        pipeline = FallDetectionPipeline()
+        emitted = self.capture(pipeline)
+        pipeline.process_landmarks(100.0, make_pose(0.4), (480, 640, 3))
+        pipeline.process_landmarks(100.2, make_pose(0.6), (480, 640, 3))
+        self.assertEqual(emitted, [])
+
+        pipeline.process_landmarks(103.0, make_pose(0.3), (480, 640, 3))
+        pipeline.process_landmarks(103.2, make_pose(0.65), (480, 640, 3))
+        self.assertEqual([e["event_type"] for e in emitted], ["POTENTIAL_FALL"])
+        self.assertEqual(len(emitted[0]["event_chain"]), 1)
+        self.assertEqual(emitted[0]["confidence_hint"], 0.85)
+
+    def test_confirmed_fall_by_duration(self):
+        pipeline = FallDetectionPipeline()
+        emitted = self.capture(pipeline)
+        for i in range(300):
+            pipeline.process_state(1000.0 + i * 0.1, "ON_FLOOR")
+        pipeline.process_state(1030.0, "STANDING")
+        for i in range(100):
+            pipeline.process_state(1031.0 + i * 0.1, "ON_FLOOR")
+
+        self.assertEqual([e["event_type"] for e in emitted], ["CONFIRMED_FALL_BY_DURATION"])
+        self.assertGreaterEqual(emitted[0]["on_floor_duration"], pipeline.t_confirm_fall)
+        self.assertEqual(emitted[0]["confidence_hint"], 0.95)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from processing.event_engine import EventEngine, EVENT_MOTION_STARTED, EVENT_MOTION_STOPPED, EVENT_IMMOBILE
+
+
+class TestEventEngine(unittest.TestCase):
+    def test_motion_lifecycle(self):
+        engine = EventEngine(cooldown=2.0, immobile_milestones=[5.0])
+        types = []
+        for ts, moving in ((0.0, True), (1.0, True), (2.0, False), (3.5, False), (9.0, False)):
+            types += [e["type"] for e in engine.process(moving, ts)]
+        self.assertEqual(types, [EVENT_MOTION_STARTED, EVENT_MOTION_STOPPED, EVENT_IMMOBILE])
+
+    def test_process_zones_ignores_masked_cells(self):
+        zone_mask = np.ones((2, 2), dtype=bool)
+        zone_mask[0, 1] = False  # e.g. a TV
+        engine = EventEngine(zone_mask=zone_mask, zone_threshold=0.05)
+
+        tv_only = np.array([[0.0, 0.8], [0.0, 0.0]], dtype=np.float32)
+        self.assertEqual(engine.process_zones(tv_only, 0.0), [])
+
+        person = np.array([[0.0, 0.8], [0.3, 0.01]], dtype=np.float32)
+        events = engine.process_zones(person, 1.0)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["type"], EVENT_MOTION_STARTED)
+        self.assertEqual(events[0]["zones"], [(1, 0)])
+
+
+    def make_trace(self, seed, n=5000):
+        rng = np.random.default_rng(seed)
+        # Bursty motion: long still stretches with occasional movement
+        moving = np.repeat(rng.random(n // 10) < 0.3, 10) & (rng.random(n) < 0.8)
+        timestamps = 1000.0 + np.cumsum(rng.uniform(0.0, 0.4, size=n))
+        return moving, timestamps
+
+    def make_engines(self, **kwargs):
+        streaming, batch = EventEngine(**kwargs), EventEngine(**kwargs)
+        batch.state_start_time = streaming.state_start_time = 990.0
+        return streaming, batch
+
+    def test_batch_matches_streaming(self):
+        for seed in range(5):
+            moving, timestamps = self.make_trace(seed)
+            streaming, batch = self.make_engines(cooldown=1.5, immobile_milestones=[2.0, 5.0, 10.0])
+            expected = []
+            for m, ts in zip(moving.tolist(), timestamps.tolist()):
+                expected += streaming.process(m, ts)
+            self.assertTrue(expected)
+            self.assertEqual(batch.process_batch(moving, timestamps), expected)
+            self.assertEqual(
+                (batch.state, batch.last_motion_time, batch.state_start_time, batch.emitted_milestones),
+                (streaming.state, streaming.last_motion_time, streaming.state_start_time, streaming.emitted_milestones)
+            )
+
+    def test_batch_in_chunks(self):
+        moving, timestamps = self.make_trace(7)
+        whole, chunked = self.make_engines()
+        expected = whole.process_batch(moving, timestamps)
+        got = []
+        for lo in range(0, len(moving), 333):
+            got += chunked.process_batch(moving[lo:lo + 333], timestamps[lo:lo + 333])
+        self.assertEqual(got, expected)
+
+    def test_batch_validation(self):
+        engine = EventEngine()
+        self.assertEqual(engine.process_batch(np.array([], dtype=bool), np.array([])), [])
+        with self.assertRaises(ValueError):
+            engine.process_batch(np.array([True, False]), np.array([1.0]))
+        with self.assertRaises(ValueError):
+            engine.process_batch(np.array([True, False]), np.array([2.0, 1.0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import uuid
+import threading
+import unittest
+import event_engine
+import event_replay
+from event_test_utils import EventStoreTestCase
+from shared.ids import uuid7, uuid7_time
+from storage.jsonl_log import SegmentedEventLog, list_segments
+from storage.layout import list_day_files, shard_name
+
+
+class TestUuid7(unittest.TestCase):
+    def test_format(self):
+        value = uuid.UUID(uuid7(1767046964.584))
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertEqual(uuid7_time(str(value)), 1767046964.584)
+
+    def test_monotonic_within_millisecond(self):
+        ids = [uuid7(1000.0) for _ in range(10000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        # Counter overflow borrows later milliseconds, never earlier ones
+        self.assertGreaterEqual(uuid7_time(ids[-1]), 1000.0)
+
+    def test_earlier_timestamp_is_encoded_as_given(self):
+        uuid7()
+        self.assertEqual(uuid7_time(uuid7(1000.0)), 1000.0)
+
+    def test_orders_by_timestamp(self):
+        ids = [uuid7(1000.0 + i * 0.001) for i in range(100)]
+        self.assertEqual(ids, sorted(ids))
+
+    def test_unique_across_threads(self):
+        results = []
+
+        def worker():
+            results.extend(uuid7() for _ in range(5000))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(results)), 20000)
+
+
+class TestEventLayout(EventStoreTestCase):
+    def test_shard_names(self):
+        self.assertEqual(shard_name({"camera_id": "front door"}), "cam_front_door")
+        self.assertEqual(shard_name({"module": "test_fall_detector"}), "src_test_fall_detector")
+        self.assertEqual(shard_name("vision.legacy"), "src_vision.legacy")
+        self.assertIsNone(shard_name(None))
+
+    def test_same_millisecond_events_do_not_collide(self):
+        event_engine.EVENT_STORE = "files"
+        emitted = [
+            event_engine.emit_event("RAPID_VERTICAL_MOVEMENT", event_engine.CATEGORY_MOTION, {"n": n}, source={"camera_id": cam})
+            for n in range(300) for cam in ("a", "b")
+        ]
+        day_dir = os.path.join(self.root, os.listdir(self.root)[0])
+        self.assertEqual(sorted(os.listdir(day_dir)), ["cam_a", "cam_b", "manifest.tsv"])
+
+        paths = list_day_files(day_dir, ".json")
+        self.assertEqual(len(paths), 600)
+        # Filename order alone is emission order, across shards
+        self.assertEqual([os.path.basename(p).split("_")[1] for p in paths], [e["id"] for e in emitted])
+        self.assertEqual([e["id"] for e in event_replay.load_events()], [e["id"] for e in emitted])
+
+    def test_segments_per_shard(self):
+        with SegmentedEventLog(self.root, shard_of=lambda e: shard_name(e.get("source"))) as log:
+            for n in range(10):
+                log.append({"id": uuid7(), "event_type": "T", "timestamp": 1767046964.0 + n, "source": {"camera_id": n % 2}})
+        day_dir = os.path.join(self.root, os.listdir(self.root)[0])
+        self.assertEqual(sorted(os.listdir(day_dir)), ["cam_0", "cam_1"])
+        self.assertEqual(len(list_segments(day_dir)), 2)
+
+    def test_non_shard_directories_are_ignored(self):
+        day_dir = os.path.join(self.root, "2025-12-29")
+        os.makedirs(os.path.join(day_dir, "analysis_snapshots"))
+        with open(os.path.join(day_dir, "analysis_snapshots", "1.000_ANALYSIS_SNAPSHOT.json"), "w") as f:
+            f.write("{}")
+        self.assertEqual(list_day_files(day_dir, ".json"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import io
+import os
+import json
+import unittest
+import unittest.mock
+import contextlib
+import event_replay
+from event_test_utils import BASE_TS, EventStoreTestCase, make_event
+from storage.jsonl_log import SegmentedEventLog, list_segments, read_segment
+from storage.migrate import import_day_sqlite, main as migrate_main, migrate_day
+from storage.sqlite_store import SqliteEventStore
+
+
+class TestSegmentedEventLog(EventStoreTestCase):
+    def test_append_and_read_back(self):
+        events = [make_event(i) for i in range(10)]
+        with SegmentedEventLog(self.root) as log:
+            for e in events:
+                log.append(e)
+        segments = list_segments(self.day_dir_of(events[0]))
+        self.assertEqual(len(segments), 1)
+        self.assertEqual([e for path in segments for e in read_segment(path)], events)
+        # Compact: one line per event
+        with open(segments[0]) as f:
+            self.assertEqual(len(f.readlines()), 10)
+
+    def test_rolls_by_size(self):
+        events = [make_event(i) for i in range(20)]
+        with SegmentedEventLog(self.root, max_segment_bytes=800) as log:
+            for e in events:
+                log.append(e)
+        segments = list_segments(self.day_dir_of(events[0]))
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(os.path.getsize(p) <= 800 for p in segments))
+        self.assertEqual([e["id"] for p in segments for e in read_segment(p)], [e["id"] for e in events])
+
+    def test_rolls_by_day(self):
+        with SegmentedEventLog(self.root) as log:
+            log.append(make_event(0))
+            log.append(make_event(1, ts=BASE_TS + 86400))
+        self.assertEqual(len(os.listdir(self.root)), 2)
+
+    def test_group_commit(self):
+        log = SegmentedEventLog(self.root, fsync_interval_ms=None, fsync_every=5)
+        for i in range(12):
+            log.append(make_event(i))
+        self.assertEqual(log.syncs, 2)
+        log.close()
+        self.assertEqual(log.syncs, 3)
+
+    def test_flushes_every_batch_without_an_interval(self):
+        for fsync_every in (None, 5):
+            log = SegmentedEventLog(os.path.join(self.root, str(fsync_every)), fsync_interval_ms=None, fsync_every=fsync_every)
+            for i in range(3):
+                path = log.append(make_event(i))
+                # Visible to readers before any sync or close
+                self.assertEqual(len(list(read_segment(path))), i + 1)
+            self.assertEqual(log.syncs, 0)
+            log.close()
+
+    def test_torn_line_is_skipped(self):
+        event = make_event(0)
+        with SegmentedEventLog(self.root) as log:
+            path = log.append(event)
+        with open(path, "ab") as f:
+            f.write(b'{"id": "torn", "timest')
+        self.assertEqual([e["id"] for e in read_segment(path)], [event["id"]])
+
+
+class TestReplayAndMigration(EventStoreTestCase):
+    def write_legacy(self, events):
+        for e in events:
+            os.makedirs(self.day_dir_of(e), exist_ok=True)
+            with open(os.path.join(self.day_dir_of(e), f"{e['timestamp']:.3f}_{e['event_type']}.json"), "w") as f:
+                json.dump(e, f, indent=2)
+
+    def test_load_events_reads_both_layouts(self):
+        events = [make_event(i) for i in range(3)]
+        self.write_legacy(events[:2])
+        with SegmentedEventLog(self.root) as log:
+            log.append(events[2])
+        self.assertEqual([e["id"] for e in event_replay.load_events()], [e["id"] for e in events])
+
+    def test_migration(self):
+        events = [make_event(i) for i in (3, 1, 2)]
+        self.write_legacy(events)
+        date_str = os.path.basename(self.day_dir_of(events[0]))
+
+        stats = migrate_day(self.root, date_str, delete=True)
+        self.assertEqual((stats["migrated"], stats["deleted"]), (3, 3))
+        day_files = os.listdir(self.day_dir_of(events[0]))
+        self.assertFalse([f for f in day_files if f.endswith(".json")])
+        self.assertIn("manifest.tsv", day_files)
+        # Timestamp order in the segment
+        self.assertEqual([e["id"] for e in event_replay.load_events(date_str)], [events[i]["id"] for i in (1, 2, 0)])
+
+        # Re-running is a no-op
+        self.write_legacy(events[:1])
+        stats = migrate_day(self.root, date_str)
+        self.assertEqual((stats["migrated"], stats["skipped"]), (0, 1))
+
+    def run_migrate(self, *argv):
+        with unittest.mock.patch("sys.argv", ["migrate", "--events-dir", self.root, *argv]), \
+                contextlib.redirect_stdout(io.StringIO()) as out:
+            migrate_main()
+        return out.getvalue()
+
+    def test_sqlite_import_dry_run(self):
+        events = [make_event(i) for i in range(3)]
+        self.write_legacy(events)
+        date_str = os.path.basename(self.day_dir_of(events[0]))
+        db_path = os.path.join(self.root, "events.db")
+
+        self.assertIn("imported=3 (dry run)", self.run_migrate("--to", "sqlite", "--dry-run"))
+        self.assertFalse(os.path.exists(db_path))
+
+        with SqliteEventStore(db_path) as db:
+            db.append(events[0])
+            stats = import_day_sqlite(self.root, date_str, db, dry_run=True)
+            self.assertEqual((stats["files"], stats["migrated"]), (3, 2))
+            self.assertEqual(db.count(), 1)
+
+        self.assertIn("imported=2", self.run_migrate("--to", "sqlite"))
+        with SqliteEventStore(db_path) as db:
+            self.assertEqual(db.count(), 3)
+
+    def test_sqlite_import_rejects_delete(self):
+        self.write_legacy([make_event(0)])
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            self.run_migrate("--to", "sqlite", "--delete")
+        self.assertEqual(len(os.listdir(self.day_dir_of(make_event(0)))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import json
+import unittest
+import event_engine
+import event_replay
+from event_test_utils import BASE_TS, DAY, EventStoreTestCase, make_event
+from storage import manifest
+from storage.manifest import BodyReader, ManifestWriter, build_manifest, read_manifest
+from storage.jsonl_log import SegmentedEventLog
+from storage.layout import event_filename
+
+
+class TestEventManifest(EventStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.day_dir = os.path.join(self.root, DAY)
+
+    def persist(self, store, events):
+        event_engine.EVENT_STORE = store
+        event_engine._persist_batch(events)
+        if event_engine._event_log is not None:
+            event_engine._event_log.flush()
+
+    def test_incremental_entries_locate_bodies(self):
+        jsonl = [make_event(i, chain=["x", "y"] if i == 3 else None) for i in range(5)]
+        files = [make_event(i) for i in range(5, 10)]
+        self.persist("jsonl", jsonl)
+        self.persist("files", files)
+
+        entries = read_manifest(self.day_dir)
+        self.assertEqual([e.id for e in entries], [e["id"] for e in jsonl + files])
+        self.assertEqual(entries[3].chain, ("x", "y"))
+        self.assertTrue(all(e.offset >= 0 for e in entries[:5]))
+        self.assertTrue(all(e.offset == -1 for e in entries[5:]))
+        with BodyReader(self.day_dir) as reader:
+            self.assertEqual([reader.load(e) for e in entries], jsonl + files)
+
+    def test_rebuild_matches_incremental(self):
+        self.persist("jsonl", [make_event(i) for i in range(3)])
+        self.persist("files", [make_event(i) for i in range(3, 6)])
+        incremental = read_manifest(self.day_dir)
+        self.assertEqual(build_manifest(self.day_dir), 6)
+        self.assertEqual(read_manifest(self.day_dir), incremental)
+
+    def test_first_write_indexes_existing_data(self):
+        # Written before manifests existed
+        self.persist("files", [make_event(i) for i in range(3)])
+        os.remove(manifest.manifest_path(self.day_dir))
+        event_engine._manifest.close()
+        event_engine._manifest = None
+
+        self.persist("jsonl", [make_event(i) for i in range(3, 5)])
+        self.assertEqual(len(read_manifest(self.day_dir)), 5)
+
+    def test_queries_do_not_read_bodies(self):
+        events = [make_event(i, "POTENTIAL_FALL" if i % 5 == 0 else "RAPID_VERTICAL_MOVEMENT") for i in range(20)]
+        self.persist("files", events)
+        for name in os.listdir(os.path.join(self.day_dir, "cam_a")):
+            with open(os.path.join(self.day_dir, "cam_a", name), "w") as f:
+                f.write("{not json")
+
+        self.assertEqual(
+            dict(manifest.counts(event_replay.iter_entries())),
+            {"POTENTIAL_FALL": 4, "RAPID_VERTICAL_MOVEMENT": 16}
+        )
+        windowed = list(event_replay.iter_entries(event_type="POTENTIAL_FALL", start=BASE_TS + 5, end=BASE_TS + 15))
+        self.assertEqual([e.timestamp - BASE_TS for e in windowed], [5, 10])
+        buckets = manifest.histogram(event_replay.iter_entries(), 10.0)
+        self.assertEqual(sum(sum(c.values()) for c in buckets.values()), 20)
+        self.assertEqual(len(buckets), 2)
+
+    def test_replay_with_and_without_manifest(self):
+        self.persist("jsonl", [make_event(i, "POTENTIAL_FALL" if i % 3 == 0 else "T") for i in range(30)])
+        for kwargs in ({}, {"event_type": "POTENTIAL_FALL"}, {"start": BASE_TS + 7, "end": BASE_TS + 19}):
+            self.assertEqual(
+                event_replay.load_events(**kwargs),
+                event_replay.load_events(use_manifest=False, **kwargs)
+            )
+
+    def test_data_written_without_the_manifest_is_not_hidden(self):
+        self.persist("jsonl", [make_event(0, "A")])
+        self.assertIsNotNone(read_manifest(self.day_dir))
+        # Another writer that does not maintain the manifest (EVENT_MANIFEST=0, older build)
+        with SegmentedEventLog(self.root, shard_of=lambda e: "cam_b") as log:
+            log.append(make_event(1, "B"))
+        self.assertIsNone(read_manifest(self.day_dir))
+        self.assertEqual([e["event_type"] for e in event_replay.iter_events()], ["A", "B"])
+        self.assertEqual(dict(manifest.counts(event_replay.iter_entries())), {"A": 1, "B": 1})
+
+        build_manifest(self.day_dir)
+        self.assertEqual(len(read_manifest(self.day_dir)), 2)
+        # Same for a per-event file
+        path = os.path.join(self.day_dir, "cam_b", event_filename(make_event(2, "C")))
+        with open(path, "w") as f:
+            json.dump(make_event(2, "C"), f)
+        self.assertIsNone(read_manifest(self.day_dir))
+        self.assertEqual([e["event_type"] for e in event_replay.iter_events()], ["A", "B", "C"])
+
+    def test_bootstrap_does_not_replace_an_existing_manifest(self):
+        self.persist("jsonl", [make_event(0)])
+        inode = os.stat(manifest.manifest_path(self.day_dir)).st_ino
+        # A second process starting on the same day appends to the same file
+        other = ManifestWriter()
+        with SegmentedEventLog(self.root, shard_of=lambda e: "cam_b", on_write=other.add) as log:
+            log.append(make_event(1))
+        other.close()
+        self.assertEqual(os.stat(manifest.manifest_path(self.day_dir)).st_ino, inode)
+        self.assertEqual(len(read_manifest(self.day_dir)), 2)
+
+    def test_manifest_writer_resolves_day_dir(self):
+        self.assertEqual(ManifestWriter._day_dir(os.path.join(self.day_dir, "cam_a", "x.json")), self.day_dir)
+        self.assertEqual(ManifestWriter._day_dir(os.path.join(self.day_dir, "x.json")), self.day_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
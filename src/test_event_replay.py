@@ -0,0 +1,180 @@
+import io
+import os
+import json
+import argparse
+import datetime
+import types
+import unittest
+import contextlib
+import event_replay
+from event_test_utils import BASE_TS, DAY, EventStoreTestCase, make_event
+from storage.jsonl_log import SegmentedEventLog, read_segment, segment_offset
+from storage.layout import event_filename, parse_event_filename
+from storage import bulk_load
+
+
+class TestStreamingReplay(EventStoreTestCase):
+    def write_file(self, event, shard="cam_a"):
+        day_dir = os.path.join(self.root, DAY, shard)
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, event_filename(event))
+        with open(path, "w") as f:
+            json.dump(event, f)
+        return path
+
+    def write_segment(self, events):
+        with SegmentedEventLog(self.root, shard_of=lambda e: "cam_" + e["source"]["camera_id"]) as log:
+            log.extend(events)
+
+    def test_parse_event_filename(self):
+        event = make_event(0, "POTENTIAL_FALL")
+        self.assertEqual(parse_event_filename(event_filename(event)), (round(event["timestamp"], 3), "POTENTIAL_FALL"))
+        self.assertEqual(parse_event_filename("1767046964.584_FALL_DETECTED.json"), (1767046964.584, "FALL_DETECTED"))
+        self.assertIsNone(parse_event_filename("1767046964.584_segment.jsonl"))
+
+    def test_merges_files_and_segments_in_time_order(self):
+        self.write_segment([make_event(i, camera="a") for i in range(0, 30, 3)])
+        self.write_segment([make_event(i, camera="b") for i in range(1, 30, 3)])
+        for i in range(2, 30, 3):
+            self.write_file(make_event(i), shard="cam_c")
+
+        events = event_replay.iter_events()
+        self.assertIsInstance(events, types.GeneratorType)
+        self.assertEqual([e["timestamp"] - BASE_TS for e in events], list(range(30)))
+
+    def test_same_millisecond_files_replay_in_timestamp_order(self):
+        # Both names carry the same millisecond; the ids sort the later event first
+        later = make_event(0, "POTENTIAL_FALL", ts=BASE_TS + 0.0004, id="00000000-0000-7000-8000-000000000000")
+        earlier = make_event(0, ts=BASE_TS + 0.0001, id="ffffffff-ffff-7fff-bfff-ffffffffffff")
+        self.assertLess(event_filename(later), event_filename(earlier))
+        self.write_file(later)
+        self.write_file(earlier)
+        self.write_segment([make_event(1)])
+
+        serial = [e["id"] for e in event_replay.iter_events()]
+        self.assertEqual(serial[:2], [earlier["id"], later["id"]])
+        self.assertEqual(serial, [e["id"] for e in event_replay.load_events(workers=1)])
+
+    def test_filename_pushdown_skips_files_without_opening(self):
+        kept = self.write_file(make_event(5, "POTENTIAL_FALL"))
+        # Unreadable, but excluded by name (type, then time range): never opened
+        for path in (self.write_file(make_event(6)), self.write_file(make_event(100, "POTENTIAL_FALL"))):
+            with open(path, "w") as f:
+                f.write("{not json")
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            events = list(event_replay.iter_events(event_type="POTENTIAL_FALL", end=BASE_TS + 50))
+        self.assertEqual([e["timestamp"] for e in events], [BASE_TS + 5])
+        self.assertNotIn("Error reading", out.getvalue())
+        self.assertTrue(os.path.exists(kept))
+
+    def test_segment_filters(self):
+        self.write_segment([make_event(i, "POTENTIAL_FALL" if i % 4 == 0 else "RAPID_VERTICAL_MOVEMENT") for i in range(20)])
+        events = event_replay.load_events(event_type="POTENTIAL_FALL", start=BASE_TS + 4, end=BASE_TS + 16)
+        self.assertEqual([e["timestamp"] - BASE_TS for e in events], [4, 8, 12])
+
+    def test_days_outside_range_are_skipped(self):
+        self.write_file(make_event(0))
+        other_day = os.path.join(self.root, "2025-12-30")
+        os.makedirs(other_day)
+        with open(os.path.join(other_day, "1767139200.000_BROKEN.json"), "w") as f:
+            f.write("{not json")
+        self.assertEqual(len(event_replay.load_events(target_date=DAY)), 1)
+        self.assertEqual(len(event_replay.load_events(end=BASE_TS + 60)), 1)
+
+
+
+class TestTimeRangeReplay(TestStreamingReplay):
+    def test_segment_offset(self):
+        path = os.path.join(self.root, "s.jsonl")
+        timestamps = [1, 2, 2, 2, 5, 8, 8, 13]
+        with open(path, "wb") as f:
+            for ts in timestamps:
+                f.write((json.dumps({"timestamp": ts, "pad": "x" * ts}) + "\n").encode())
+            f.write(b'{"timestamp": 20, "to')  # Torn tail
+        for target in range(0, 22):
+            offset = segment_offset(path, target)
+            self.assertEqual(
+                [e["timestamp"] for e in read_segment(path, start_offset=offset)],
+                [ts for ts in timestamps if ts >= target]
+            )
+        self.assertEqual(
+            [e["timestamp"] for e in read_segment(path, start_offset=segment_offset(path, 2), end_offset=segment_offset(path, 8))],
+            [2, 2, 2, 5]
+        )
+
+    def test_window_reads_only_the_range(self):
+        self.write_segment([make_event(i) for i in range(1000)])
+        files = [self.write_file(make_event(i + 0.5), shard="cam_c") for i in range(100)]
+        # Files outside the window are never opened
+        for path in files[:40] + files[60:]:
+            with open(path, "w") as f:
+                f.write("{not json")
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            events = event_replay.load_events(start=BASE_TS + 40, end=BASE_TS + 60)
+        self.assertEqual(len(events), 40)
+        self.assertEqual(events[0]["timestamp"], BASE_TS + 40)
+        self.assertEqual(events[-1]["timestamp"], BASE_TS + 59.5)
+        self.assertNotIn("Error reading", out.getvalue())
+
+    def test_window_across_days(self):
+        next_day = event_replay.day_range(DAY)[1]
+        self.write_segment([make_event(i) for i in range(3)])
+        with SegmentedEventLog(self.root) as log:
+            log.extend([make_event(i, "T", ts=next_day + i) for i in range(3)])
+
+        events = event_replay.load_events(start=BASE_TS + 1, end=next_day + 2)
+        self.assertEqual(len(events), 4)
+        self.assertEqual(len(os.listdir(self.root)), 2)
+
+    def test_parse_time(self):
+        self.assertEqual(event_replay.parse_time("1767046964.5"), 1767046964.5)
+        self.assertEqual(event_replay.parse_time("2025-12-29T22:30:00+00:00"), 1767047400.0)
+        self.assertEqual(
+            event_replay.parse_time("2025-12-29 22:30"),
+            datetime.datetime(2025, 12, 29, 22, 30).timestamp()
+        )
+        with self.assertRaises(argparse.ArgumentTypeError):
+            event_replay.parse_time("yesterday")
+
+
+class TestParallelReplay(TestStreamingReplay):
+    def setUp(self):
+        super().setUp()
+        self._task_sizes = (bulk_load.FILES_PER_TASK, bulk_load.SEGMENT_BYTES_PER_TASK)
+        # Many small tasks, split mid-line
+        bulk_load.FILES_PER_TASK, bulk_load.SEGMENT_BYTES_PER_TASK = 7, 333
+
+    def tearDown(self):
+        bulk_load.FILES_PER_TASK, bulk_load.SEGMENT_BYTES_PER_TASK = self._task_sizes
+        super().tearDown()
+
+    def test_split_ranges_read_each_line_once(self):
+        path = os.path.join(self.root, "s.jsonl")
+        with open(path, "wb") as f:
+            for i in range(50):
+                f.write((json.dumps({"timestamp": i, "pad": "x" * (i % 7)}) + "\n").encode())
+            f.write(b'{"timestamp": 99, "to')  # Torn tail
+        for size in (1, 2, 17, 64, 10000):
+            tasks = bulk_load.segment_tasks(path, bytes_per_task=size)
+            self.assertEqual([e["timestamp"] for e in bulk_load.load_parallel(tasks, workers=1)], list(range(50)))
+
+    def test_matches_serial_load(self):
+        self.write_segment([make_event(i, "POTENTIAL_FALL" if i % 5 == 0 else "RAPID_VERTICAL_MOVEMENT", camera="a") for i in range(0, 300, 2)])
+        self.write_segment([make_event(i, camera="b") for i in range(1, 300, 4)])
+        for i in range(3, 300, 4):
+            self.write_file(make_event(i, "POTENTIAL_FALL" if i % 3 == 0 else "RAPID_VERTICAL_MOVEMENT"), shard="cam_c")
+
+        for filters in ({}, {"event_type": "POTENTIAL_FALL"}, {"start": BASE_TS + 41, "end": BASE_TS + 250.5}, {"target_date": DAY}):
+            serial = event_replay.load_events(**filters)
+            parallel = event_replay.load_events(**filters, workers=2)
+            self.assertEqual([e["timestamp"] for e in parallel], [e["timestamp"] for e in serial], filters)
+            self.assertEqual(sorted(e["id"] for e in parallel), sorted(e["id"] for e in serial))
+        self.assertEqual(len(event_replay.load_events(workers=2)), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs parallel bulk event loading
+Execute: python3 src/test_event_replay_benchmark.py [--events 1000000] [--days 10] [--layout jsonl] [--workers 1,2,4]
+
+Writes a synthetic event tree (jsonl segments, or one file per event with --layout
+files) to a temporary directory, or reuses --dir, then loads every event with
+event_replay.load_events: the serial stream, and the storage.bulk_load path with each
+worker count (1 = same tasks and decoder, in-process). Reports wall time, events/s
+and the speedup over the serial stream; --stdlib compares without orjson.
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import logging
+import tempfile
+import event_engine
+import event_replay
+from shared.ids import uuid7
+from storage import bulk_load
+from storage.jsonl_log import SegmentedEventLog
+from storage.layout import event_filename, list_day_files, shard_name
+
+BASE_TS = 1767046964.0
+CAMERAS = ["front_door", "living_room", "kitchen", "hallway"]
+TYPES = ["RAPID_VERTICAL_MOVEMENT", "POTENTIAL_FALL", "POSTURE_CHANGE", "NO_MOVEMENT"]
+
+
+def make_event(rng: random.Random, ts: float) -> dict:
+    return {
+        "id": uuid7(ts),
+        "event_type": rng.choice(TYPES),
+        "event_category": "motion",
+        "timestamp": ts,
+        "source": {"engine": "vision", "module": "benchmark", "input_type": "webcam", "camera_id": rng.choice(CAMERAS)},
+        "signals": {
+            "motion": {"vertical_displacement": rng.random(), "velocity_y": rng.random(), "direction": "down"},
+            "posture": {"hip_center_y": rng.random(), "keypoints_count": 33}
+        },
+        "temporal_context": {"frame_id": rng.randrange(100000), "time_since_last_event": rng.random() * 20},
+        "derived_hypotheses": ["rapid_descent", "potential_instability"],
+        "event_chain": [],
+        "severity_hint": "medium",
+        "confidence_hint": 0.0,
+        "version": "1.2"
+    }
+
+
+def generate(root: str, n_events: int, days: int, layout: str) -> None:
+    rng = random.Random(0)
+    step = days * 86400.0 / n_events
+    batch = 10000
+    log = SegmentedEventLog(
+        root, fsync_interval_ms=None, fsync_every=None, shard_of=lambda e: shard_name(e.get("source"))
+    ) if layout == "jsonl" else None
+    for lo in range(0, n_events, batch):
+        events = [make_event(rng, BASE_TS + i * step) for i in range(lo, min(lo + batch, n_events))]
+        if log:
+            log.extend(events)
+            continue
+        for event in events:
+            day_dir = os.path.join(root, time.strftime("%Y-%m-%d", time.localtime(event["timestamp"])))
+            shard_dir = os.path.join(day_dir, shard_name(event["source"]))
+            os.makedirs(shard_dir, exist_ok=True)
+            with open(os.path.join(shard_dir, event_filename(event)), "w") as f:
+                json.dump(event, f)
+    if log:
+        log.close()
+
+
+def run_case(workers) -> tuple:
+    t0 = time.perf_counter()
+    n = len(event_replay.load_events(workers=workers, use_manifest=False))
+    return n, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel bulk event loading")
+    parser.add_argument("--events", type=int, default=1000000, help="Events in the synthetic tree")
+    parser.add_argument("--days", type=int, default=10, help="Days the events are spread over")
+    parser.add_argument("--layout", type=str, choices=["jsonl", "files"], default="jsonl", help="Event store layout")
+    parser.add_argument("--workers", type=str, default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--dir", type=str, help="Reuse (or create) the tree here instead of a temporary directory")
+    parser.add_argument("--stdlib", action="store_true", help="Decode with the json module even if orjson is installed")
+    args = parser.parse_args()
+
+    if args.stdlib:
+        bulk_load.loads, bulk_load.DECODER = json.loads, "json"
+    logging.getLogger("SegmentedEventLog").setLevel(logging.WARNING)
+
+    root = args.dir or tempfile.mkdtemp(prefix="events_bench_")
+    try:
+        if not os.path.isdir(root) or not os.listdir(root):
+            t0 = time.perf_counter()
+            generate(root, args.events, args.days, args.layout)
+            print(f"Generated {args.events} events ({args.layout}) in {time.perf_counter() - t0:.1f}s: {root}")
+        event_engine.EVENTS_DIR = root
+        day_dirs = [os.path.join(root, d) for d in os.listdir(root)]
+        data_bytes = sum(
+            os.path.getsize(p) for d in day_dirs if os.path.isdir(d)
+            for p in list_day_files(d, ".json") + list_day_files(d, ".jsonl")
+        )
+
+        print(f"--- Bulk load benchmark ({data_bytes / 1e6:.0f} MB, decoder={bulk_load.DECODER}, {os.cpu_count()} CPUs) ---")
+        header = f"{'case':<14} {'events':>9} {'seconds':>8} {'events/s':>10} {'speedup':>8}"
+        print(header)
+        print("-" * len(header))
+        n, baseline = run_case(None)
+        print(f"{'serial':<14} {n:>9} {baseline:>8.2f} {n / baseline:>10.0f} {1.0:>8.2f}")
+        for workers in (int(w) for w in args.workers.split(",")):
+            n, seconds = run_case(workers)
+            print(f"{f'bulk x{workers}':<14} {n:>9} {seconds:>8.2f} {n / seconds:>10.0f} {baseline / seconds:>8.2f}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+from processing.fall_detector import FallDetector
+from processing.landmarks import NUM_LANDMARKS, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP
+
+
+def make_pose(center_y, lying, rng=None):
+    """(33, 4) pose around center_y; lying rotates the torso to horizontal (angle < 45)."""
+    arr = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    arr[:, 0] = 0.5
+    arr[:, 1] = center_y
+    arr[:, 3] = 1.0
+    if lying:
+        arr[[LEFT_SHOULDER, RIGHT_SHOULDER], 0] = 0.3
+        arr[[LEFT_HIP, RIGHT_HIP], 0] = 0.6
+        arr[[LEFT_HIP, RIGHT_HIP], 1] = center_y + 0.05
+    else:
+        arr[[LEFT_SHOULDER, RIGHT_SHOULDER], 1] = center_y - 0.15
+        arr[[LEFT_HIP, RIGHT_HIP], 1] = center_y + 0.15
+    if rng is not None:
+        arr[:, :2] += rng.normal(0, 0.01, size=(NUM_LANDMARKS, 2)).astype(np.float32)
+    return arr
+
+
+def make_sequence(rng, n=600, fps=15.0):
+    """Random standing/falling/lying sequence with jittered timestamps."""
+    poses, ts = [], []
+    t = 100.0
+    y, lying = 0.4, False
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.03:
+            y, lying = 0.85, False     # Collapse (upright torso, counted by the detector)
+        elif r < 0.05:
+            y, lying = 0.85, True      # Lie down (torso horizontal, not counted)
+        elif r < 0.08:
+            y, lying = 0.4, False      # Stand up
+        poses.append(make_pose(y, lying, rng))
+        ts.append(t)
+        t += (1.0 / fps) * rng.uniform(0.5, 1.5)
+        if rng.random() < 0.05:
+            ts.append(t)               # Duplicate timestamp
+            poses.append(make_pose(y, lying, rng))
+    return np.stack(poses), np.array(ts)
+
+
+def stream(detector, landmarks, timestamps):
+    events = []
+    for i, (arr, ts) in enumerate(zip(landmarks, timestamps)):
+        evt = detector.update(arr, timestamp=float(ts))
+        if evt:
+            events.append((i, evt["timestamp"]))
+    return events
+
+
+class TestFallDetectorBatch(unittest.TestCase):
+    def test_batch_matches_streaming(self):
+        for seed in range(5):
+            rng = np.random.default_rng(seed)
+            landmarks, timestamps = make_sequence(rng)
+            expected = stream(FallDetector(), landmarks, timestamps)
+            got = [(e["frame_index"], e["timestamp"]) for e in FallDetector().detect_batch(landmarks, timestamps)]
+            self.assertTrue(expected, "sequence should contain falls")
+            self.assertEqual(got, expected)
+
+    def test_single_fall(self):
+        landmarks = np.stack([make_pose(0.4, False)] * 5 + [make_pose(0.85, False)] * 5)
+        timestamps = 10.0 + np.arange(10) * 0.1
+        events = FallDetector().detect_batch(landmarks, timestamps)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["frame_index"], 5)
+        self.assertEqual(events[0]["type"], "FALL_DETECTED")
+
+    def test_drop_measured_from_window_peak(self):
+        # Rises 0.1 and then drops 0.2 below the starting point: 0.3 from the peak,
+        # but only 0.2 from the oldest frame in the window
+        heights = [0.5, 0.4, 0.7]
+        landmarks = np.stack([make_pose(y, False) for y in heights])
+        timestamps = [10.0, 10.3, 10.6]
+        self.assertEqual(len(stream(FallDetector(), landmarks, timestamps)), 1)
+        self.assertEqual(len(FallDetector().detect_batch(landmarks, timestamps)), 1)
+
+    def test_peak_expires_with_window(self):
+        heights = [0.3, 0.5, 0.5, 0.7]
+        landmarks = np.stack([make_pose(y, False) for y in heights])
+        timestamps = [10.0, 10.8, 11.5, 12.0]  # The 0.3 peak is out of the window at 12.0
+        self.assertEqual(stream(FallDetector(), landmarks, timestamps), [])
+        self.assertEqual(FallDetector().detect_batch(landmarks, timestamps), [])
+
+    def test_injected_clock(self):
+        clock = iter([10.0, 10.5])
+        detector = FallDetector(clock=lambda: next(clock))
+        detector.update(make_pose(0.4, False))
+        evt = detector.update(make_pose(0.85, False))
+        self.assertEqual(evt["timestamp"], 10.5)
+
+    def test_batch_does_not_touch_streaming_state(self):
+        detector = FallDetector()
+        landmarks = np.stack([make_pose(0.4, False), make_pose(0.85, False)])
+        detector.detect_batch(landmarks, [0.0, 0.1])
+        self.assertEqual(len(detector.history), 0)
+        self.assertEqual(detector.last_fall_time, 0)
+
+    def test_short_and_invalid_input(self):
+        self.assertEqual(FallDetector().detect_batch(np.zeros((1, NUM_LANDMARKS, 4)), [0.0]), [])
+        with self.assertRaises(ValueError):
+            FallDetector().detect_batch(np.zeros((3, NUM_LANDMARKS, 4)), [0.0, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import queue
+import threading
+import unittest
+from camera.frame_buffer import FrameBuffer
+from camera.frame_mailbox import LatestFrameMailbox, create_frame_buffer
+
+
+class TestLatestFrameMailbox(unittest.TestCase):
+
+    def test_get_returns_latest_and_counts_overwrites(self):
+        mailbox = LatestFrameMailbox()
+        for i in range(3):
+            mailbox.put(i)
+        self.assertEqual(mailbox.get(), 2)
+        self.assertEqual(mailbox.stats(), {"produced": 3, "consumed": 1, "overwritten": 2})
+        self.assertEqual(mailbox.dropped, 2)
+        self.assertTrue(mailbox.empty())
+
+    def test_get_empty_raises(self):
+        mailbox = LatestFrameMailbox()
+        with self.assertRaises(queue.Empty):
+            mailbox.get(block=False)
+        with self.assertRaises(queue.Empty):
+            mailbox.get(timeout=0.01)
+
+    def test_wait_newer(self):
+        mailbox = LatestFrameMailbox()
+        mailbox.put("a")
+        version, frame = mailbox.wait_newer(0, timeout=0.1)
+        self.assertEqual((version, frame), (1, "a"))
+
+        with self.assertRaises(queue.Empty):
+            mailbox.wait_newer(version, timeout=0.01)
+
+        threading.Timer(0.02, mailbox.put, args=("b",)).start()
+        self.assertEqual(mailbox.wait_newer(version, timeout=1.0), (2, "b"))
+
+    def test_consumed_frame_is_not_counted_as_overwritten(self):
+        mailbox = LatestFrameMailbox()
+        mailbox.put(1)
+        mailbox.get()
+        mailbox.put(2)
+        self.assertEqual(mailbox.overwritten, 0)
+
+    def test_factory(self):
+        self.assertIsInstance(create_frame_buffer(1), LatestFrameMailbox)
+        self.assertIsInstance(create_frame_buffer(4), FrameBuffer)
+
+
+if __name__ == "__main__":
+    unittest.main()
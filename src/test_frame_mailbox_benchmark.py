@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: LatestFrameMailbox vs FrameBuffer(max_size=1)
+Execute: python3 src/test_frame_mailbox_benchmark.py [--seconds 3] [--consumer-fps 8]
+
+A producer thread publishes 720p frames at 30, 60 and 120 FPS while a consumer
+simulates a slower pose loop. Reports the capture-thread cost per put(), the
+frame age seen by the consumer and the produced/consumed/dropped counters.
+"""
+
+import time
+import queue
+import argparse
+import threading
+import numpy as np
+from camera.frame_buffer import FrameBuffer
+from camera.frame_mailbox import LatestFrameMailbox
+
+PRODUCER_RATES = [30, 60, 120]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(p * len(values)), len(values) - 1)]
+
+
+def run_case(buffer, producer_fps: float, consumer_fps: float, seconds: float) -> dict:
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    stop = threading.Event()
+    put_times = []
+    ages = []
+    consumed = [0]
+
+    def producer():
+        interval = 1.0 / producer_fps
+        next_tick = time.perf_counter()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            buffer.put((t0, frame))
+            put_times.append(time.perf_counter() - t0)
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def consumer():
+        work = 1.0 / consumer_fps
+        while not stop.is_set():
+            try:
+                produced_at, _ = buffer.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            ages.append(time.perf_counter() - produced_at)
+            consumed[0] += 1
+            time.sleep(work)  # Simulated inference
+
+    threads = [threading.Thread(target=producer), threading.Thread(target=consumer)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return {
+        "produced": len(put_times),
+        "consumed": consumed[0],
+        "dropped": buffer.dropped,
+        "put_mean_us": sum(put_times) / len(put_times) * 1e6 if put_times else 0.0,
+        "put_p99_us": percentile(put_times, 0.99) * 1e6,
+        "age_p50_ms": percentile(ages, 0.50) * 1e3,
+        "age_p95_ms": percentile(ages, 0.95) * 1e3
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LatestFrameMailbox vs FrameBuffer micro-benchmark")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each case")
+    parser.add_argument("--consumer-fps", type=float, default=8.0, help="Simulated pose loop rate")
+    args = parser.parse_args()
+
+    print(f"--- Frame buffer benchmark (consumer {args.consumer_fps:.0f} FPS, {args.seconds:.0f}s per case) ---")
+    header = f"{'impl':<20} {'fps':>4} {'produced':>9} {'consumed':>9} {'dropped':>8} {'put_mean_us':>12} {'put_p99_us':>11} {'age_p50_ms':>11} {'age_p95_ms':>11}"
+    print(header)
+    print("-" * len(header))
+
+    for rate in PRODUCER_RATES:
+        for name, factory in (("FrameBuffer(1)", lambda: FrameBuffer(max_size=1)), ("LatestFrameMailbox", LatestFrameMailbox)):
+            r = run_case(factory(), rate, args.consumer_fps, args.seconds)
+            print(
+                f"{name:<20} {rate:>4} {r['produced']:>9} {r['consumed']:>9} {r['dropped']:>8} "
+                f"{r['put_mean_us']:>12.1f} {r['put_p99_us']:>11.1f} {r['age_p50_ms']:>11.2f} {r['age_p95_ms']:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
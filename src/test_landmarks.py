@@ -0,0 +1,47 @@
+import math
+import unittest
+import numpy as np
+from types import SimpleNamespace
+from processing.landmarks import landmarks_to_array, compute_features, NUM_LANDMARKS
+
+
+def make_mediapipe_like(seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v))
+        for x, y, z, v in rng.random((NUM_LANDMARKS, 4))
+    ]
+
+
+class TestLandmarks(unittest.TestCase):
+
+    def test_conversion_shape_and_passthrough(self):
+        arr = landmarks_to_array(make_mediapipe_like())
+        self.assertEqual(arr.shape, (33, 4))
+        self.assertEqual(arr.dtype, np.float32)
+        self.assertIs(landmarks_to_array(arr), arr)
+
+    def test_missing_visibility_counts_as_visible(self):
+        lms = [SimpleNamespace(x=0.1, y=0.2, z=0.0, visibility=None)] * NUM_LANDMARKS
+        self.assertTrue(np.all(landmarks_to_array(lms)[:, 3] == 1.0))
+
+    def test_features_match_attribute_formulas(self):
+        lms = make_mediapipe_like(3)
+        f = compute_features(landmarks_to_array(lms))
+
+        hip_y = (lms[23].y + lms[24].y) / 2
+        hip_x = (lms[23].x + lms[24].x) / 2
+        sh_y = (lms[11].y + lms[12].y) / 2
+        sh_x = (lms[11].x + lms[12].x) / 2
+        angle = abs(math.degrees(math.atan2(hip_y - sh_y, hip_x - sh_x)))
+
+        self.assertAlmostEqual(f.hip_center[0], hip_x, places=5)
+        self.assertAlmostEqual(f.hip_center[1], hip_y, places=5)
+        self.assertAlmostEqual(f.torso_angle, angle, places=3)
+        self.assertAlmostEqual(f.mean_height, sum(lm.y for lm in lms) / len(lms), places=5)
+        self.assertAlmostEqual(f.bbox[0], min(lm.x for lm in lms), places=5)
+        self.assertAlmostEqual(f.bbox[3], max(lm.y for lm in lms), places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
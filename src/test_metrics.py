@@ -0,0 +1,71 @@
+import unittest
+from shared.metrics import LatencyStats, StageLatencyTracker, SequenceGapTracker
+
+
+class TestStageLatencyTracker(unittest.TestCase):
+    def test_percentiles_per_stage(self):
+        tracker = StageLatencyTracker()
+        # pose latencies 1..100 ms, in shuffled order
+        for ms in list(range(1, 101, 2)) + list(range(2, 101, 2)):
+            tracker.record("pose", 1000.0, now=1000.0 + ms / 1000.0)
+        tracker.record("decision", 1000.0, now=1000.25)
+
+        summary = tracker.summary()
+        self.assertEqual(set(summary), {"pose", "decision"})
+        pose = summary["pose"]
+        self.assertEqual(pose["count"], 100)
+        self.assertAlmostEqual(pose["mean_ms"], 50.5)
+        self.assertAlmostEqual(pose["p50_ms"], 51.0)
+        self.assertAlmostEqual(pose["p95_ms"], 96.0)
+        self.assertAlmostEqual(pose["max_ms"], 100.0)
+        self.assertEqual(summary["decision"]["count"], 1)
+        for key in ("mean_ms", "p50_ms", "p95_ms", "max_ms"):
+            self.assertAlmostEqual(summary["decision"][key], 250.0)
+
+    def test_percentiles_cover_the_retained_samples(self):
+        tracker = StageLatencyTracker(max_samples=10)
+        for ms in range(1, 101):
+            tracker.record("pose", 0.0, now=ms / 1000.0)
+        pose = tracker.summary()["pose"]
+        # count is every sample; percentiles only the last 10 (91..100 ms)
+        self.assertEqual(pose["count"], 100)
+        self.assertAlmostEqual(pose["p50_ms"], 96.0)
+        self.assertAlmostEqual(pose["mean_ms"], 95.5)
+        self.assertAlmostEqual(pose["max_ms"], 100.0)
+
+    def test_empty(self):
+        self.assertEqual(StageLatencyTracker().summary(), {})
+        self.assertEqual(LatencyStats().summary()["p95_ms"], 0.0)
+
+
+class TestSequenceGapTracker(unittest.TestCase):
+    def test_gaps_and_drop_ratio(self):
+        gaps = SequenceGapTracker()
+        self.assertEqual([gaps.observe(seq) for seq in (0, 1, 2, 5, 6, 10)], [0, 0, 0, 2, 0, 3])
+        self.assertEqual((gaps.received, gaps.missing, gaps.late), (6, 5, 0))
+        self.assertAlmostEqual(gaps.drop_ratio, 5 / 11)
+
+    def test_first_seq_is_not_a_gap(self):
+        gaps = SequenceGapTracker()
+        self.assertEqual(gaps.observe(42), 0)
+        self.assertEqual(gaps.drop_ratio, 0.0)
+
+    def test_reordered_frames_are_not_counted_twice(self):
+        gaps = SequenceGapTracker()
+        # 2 arrives after 3: missing when 3 opens the gap, then late
+        self.assertEqual([gaps.observe(seq) for seq in (0, 1, 3, 2, 4, 5)], [0, 0, 1, 0, 0, 0])
+        self.assertEqual((gaps.received, gaps.missing, gaps.late), (6, 0, 1))
+        self.assertEqual(gaps.last_seq, 5)
+        self.assertEqual(gaps.drop_ratio, 0.0)
+
+    def test_reordering_with_real_drops(self):
+        gaps = SequenceGapTracker()
+        for seq in (0, 4, 2, 5, 5):
+            gaps.observe(seq)
+        # 1 and 3 are lost, 2 is late, the second 5 is a duplicate
+        self.assertEqual((gaps.received, gaps.missing, gaps.late), (5, 2, 2))
+        self.assertEqual(gaps.last_seq, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
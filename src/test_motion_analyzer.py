@@ -0,0 +1,138 @@
+import unittest
+import numpy as np
+from processing.motion_analyzer import MotionAnalyzer
+from shared.cli_args import parse_motion_zones
+
+SHAPE = (720, 1280, 3)
+
+
+def frame_with_square(x, y, size=160):
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+class TestMotionAnalyzer(unittest.TestCase):
+    def run_pair(self, analyzer, first, second):
+        analyzer.detect_motion(first)
+        return analyzer.detect_motion(second)
+
+    def test_static_scene(self):
+        for scale, blur in ((1.0, "gaussian"), (0.25, "gaussian"), (0.25, "box"), (0.25, "stack")):
+            analyzer = MotionAnalyzer(scale=scale, blur=blur)
+            moving, score = self.run_pair(analyzer, frame_with_square(100, 100), frame_with_square(100, 100))
+            self.assertFalse(moving)
+            self.assertEqual(score, 0.0)
+
+    def test_scaled_score_matches_full_resolution(self):
+        first, second = frame_with_square(100, 100), frame_with_square(400, 300)
+        moving_full, full = self.run_pair(MotionAnalyzer(), first, second)
+        for scale in (0.5, 0.25):
+            for blur in ("gaussian", "box", "stack"):
+                moving, score = self.run_pair(MotionAnalyzer(scale=scale, blur=blur), first, second)
+                self.assertTrue(moving_full and moving)
+                # Blur, dilation and area are all rescaled: within 10% in full-resolution pixels
+                self.assertLess(abs(score - full) / full, 0.10, (scale, blur, score, full))
+
+    def test_dilation_is_scaled(self):
+        self.assertEqual(MotionAnalyzer().scaled_dilate_iterations, 2)
+        self.assertEqual(MotionAnalyzer(scale=0.5).scaled_dilate_iterations, 1)
+        self.assertEqual(MotionAnalyzer(scale=0.25).scaled_dilate_iterations, 0)
+
+    def test_small_motion_below_scaled_sensitivity(self):
+        analyzer = MotionAnalyzer(sensitivity=50000, scale=0.25)
+        moving, score = self.run_pair(analyzer, frame_with_square(100, 100, 20), frame_with_square(104, 100, 20))
+        self.assertFalse(moving)
+        self.assertGreater(score, 0.0)
+
+    def test_buffers_are_reused(self):
+        analyzer = MotionAnalyzer(scale=0.25)
+        analyzer.detect_motion(frame_with_square(100, 100))
+        buffers = [id(b) for b in analyzer._blurred] + [id(analyzer._delta), id(analyzer._dilated)]
+        for x in range(110, 200, 10):
+            analyzer.detect_motion(frame_with_square(x, 100))
+        self.assertEqual(buffers, [id(b) for b in analyzer._blurred] + [id(analyzer._delta), id(analyzer._dilated)])
+        self.assertTrue(any(analyzer.prev_frame is b for b in analyzer._blurred))
+
+    def test_frame_size_change_resets_reference(self):
+        analyzer = MotionAnalyzer(scale=0.5)
+        analyzer.detect_motion(frame_with_square(100, 100))
+        self.assertEqual(analyzer.detect_motion(np.zeros((480, 640, 3), dtype=np.uint8)), (False, 0.0))
+
+    def test_zone_grid(self):
+        analyzer = MotionAnalyzer(scale=0.25, grid=(3, 4))
+        # Motion confined to the top-left cell (each cell is 240x320 at full resolution)
+        moving, score = self.run_pair(analyzer, frame_with_square(40, 40), frame_with_square(100, 60))
+        self.assertTrue(moving)
+        self.assertEqual(analyzer.zone_motion.shape, (3, 4))
+        self.assertGreater(analyzer.zone_motion[0, 0], 0.0)
+        self.assertEqual(float(analyzer.zone_motion[1:, 1:].sum()), 0.0)
+        self.assertTrue(np.all(analyzer.zone_motion <= 1.0))
+
+    def test_zone_mask_ignores_cells(self):
+        zone_mask = np.ones((3, 4), dtype=bool)
+        zone_mask[0, 0] = False
+        analyzer = MotionAnalyzer(scale=0.25, grid=(3, 4), zone_mask=zone_mask)
+        moving, score = self.run_pair(analyzer, frame_with_square(40, 40), frame_with_square(60, 40))
+        self.assertFalse(moving)
+        self.assertEqual(score, 0.0)
+        self.assertGreater(analyzer.zone_motion[0, 0], 0.0)
+
+    def test_grid_finer_than_processing_resolution_raises_scale(self):
+        # 64 rows do not fit in 240 * 0.25 = 60 pixels: analysed at 64/240 instead
+        analyzer = MotionAnalyzer(scale=0.25, grid=(64, 64))
+        first = np.zeros((240, 320, 3), dtype=np.uint8)
+        second = first.copy()
+        second[100:140, 100:140] = 255
+        with self.assertLogs("processing.motion_analyzer", level="WARNING"):
+            analyzer.detect_motion(first)
+        moving, score = analyzer.detect_motion(second)
+        self.assertTrue(moving)
+        self.assertAlmostEqual(analyzer.scale, 64 / 240)
+        self.assertEqual(analyzer._size, (85, 64))
+        self.assertEqual(analyzer.zone_motion.shape, (64, 64))
+        # Back to the requested scale for a frame size that fits the grid
+        analyzer.detect_motion(frame_with_square(100, 100))
+        self.assertEqual(analyzer.scale, 0.25)
+
+    def test_mog2_engine(self):
+        analyzer = MotionAnalyzer(scale=0.25, engine="mog2")
+        background = frame_with_square(100, 100)
+        for _ in range(10):
+            moving, _ = analyzer.detect_motion(background)
+        self.assertFalse(moving)
+        moving, score = analyzer.detect_motion(frame_with_square(600, 300))
+        self.assertTrue(moving)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(scale=0.0)
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(blur="median")
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(engine="knn")
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(zone_mask=np.ones((2, 2), dtype=bool))
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(grid=(2, 2), zone_mask=np.ones((3, 3), dtype=bool))
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(grid=(0, 4))
+        with self.assertRaises(ValueError):
+            MotionAnalyzer(grid=(64, 64)).detect_motion(np.zeros((32, 32, 3), dtype=np.uint8))
+
+
+class TestParseMotionZones(unittest.TestCase):
+    def test_grid_and_ignored_cells(self):
+        self.assertEqual(parse_motion_zones("", ""), (None, None))
+        self.assertEqual(parse_motion_zones("4X3", ""), ((4, 3), None))
+        grid, zone_mask = parse_motion_zones("2x3", "0,2; 1,0;")
+        self.assertEqual(grid, (2, 3))
+        self.assertEqual(zone_mask.tolist(), [[True, True, False], [False, True, True]])
+
+    def test_ignore_requires_grid(self):
+        with self.assertRaises(ValueError):
+            parse_motion_zones("", "0,0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: MotionAnalyzer processing resolution and blur options
+Execute: python3 src/test_motion_analyzer_benchmark.py [--frames 200]
+
+Feeds synthetic 720p and 1080p frames (a moving block over noise) through the
+analyzer and reports time per frame and bytes allocated per frame (tracemalloc,
+which sees the NumPy arrays OpenCV returns). The first call, which allocates the
+buffers, is excluded.
+"""
+
+import cv2
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from processing.motion_analyzer import MotionAnalyzer
+
+RESOLUTIONS = {"720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+class AllocatingMotionAnalyzer:
+    """Previous implementation (full resolution, new arrays every call) as the baseline."""
+    def __init__(self, sensitivity=500, blur_size=21, threshold=25):
+        self.sensitivity = sensitivity
+        self.blur_size = blur_size
+        self.threshold_val = threshold
+        self.prev_frame = None
+
+    def detect_motion(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+        if self.prev_frame is None:
+            self.prev_frame = gray
+            return False, 0.0
+        delta = cv2.absdiff(self.prev_frame, gray)
+        thresh = cv2.threshold(delta, self.threshold_val, 255, cv2.THRESH_BINARY)[1]
+        thresh = cv2.dilate(thresh, None, iterations=2)
+        motion_area = cv2.countNonZero(thresh)
+        self.prev_frame = gray
+        return motion_area > self.sensitivity, float(motion_area)
+
+
+CONFIGS = [
+    ("baseline", None),
+    ("full/gaussian", {"scale": 1.0, "blur": "gaussian"}),
+    ("1/2/gaussian", {"scale": 0.5, "blur": "gaussian"}),
+    ("1/4/gaussian", {"scale": 0.25, "blur": "gaussian"}),
+    ("1/4/box", {"scale": 0.25, "blur": "box"}),
+    ("1/4/stack", {"scale": 0.25, "blur": "stack"}),
+    ("1/4/grid4x4", {"scale": 0.25, "grid": (4, 4)}),
+    ("1/4/mog2", {"scale": 0.25, "engine": "mog2"}),
+]
+
+
+def make_frames(shape, count=8):
+    rng = np.random.default_rng(0)
+    h, w = shape
+    base = rng.integers(0, 40, size=(h, w, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        x = (i * w // count) % (w - w // 8)
+        frame[h // 3:h // 3 + h // 4, x:x + w // 8] = 220
+        frames.append(frame)
+    return frames
+
+
+def run_case(frames, options, n):
+    analyzer = AllocatingMotionAnalyzer() if options is None else MotionAnalyzer(**options)
+    analyzer.detect_motion(frames[0])  # Buffer allocation
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        analyzer.detect_motion(frames[i % len(frames)])
+    per_frame_ms = (time.perf_counter() - t0) / n * 1e3
+
+    tracemalloc.start()
+    allocated = 0
+    for i in range(min(n, 50)):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        analyzer.detect_motion(frames[i % len(frames)])
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return per_frame_ms, allocated / min(n, 50) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MotionAnalyzer micro-benchmark")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per case")
+    args = parser.parse_args()
+
+    print(f"--- MotionAnalyzer benchmark ({args.frames} frames per case) ---")
+    header = f"{'resolution':<10} {'config':<15} {'ms/frame':>9} {'alloc_kb/frame':>15}"
+    print(header)
+    print("-" * len(header))
+    for res_name, shape in RESOLUTIONS.items():
+        frames = make_frames(shape)
+        for name, options in CONFIGS:
+            ms, kb = run_case(frames, options, args.frames)
+            print(f"{res_name:<10} {name:<15} {ms:>9.2f} {kb:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from processing.motion_gate import MotionGate
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        self.static_frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    def _moving_frame(self, i):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        x = (i * 20) % 120
+        frame[20:100, x:x + 40] = 255
+        return frame
+
+    def test_static_scene_throttles_to_keepalive(self):
+        gate = MotionGate(static_after_seconds=1.0, keepalive_interval=1.0)
+        decisions = [gate.should_infer(self.static_frame, i * 0.1) for i in range(100)]
+
+        # Open for the first second, then one keep-alive per second
+        self.assertTrue(all(decisions[:10]))
+        self.assertLessEqual(sum(decisions[10:]), 10)
+        self.assertGreater(gate.skip_ratio, 0.7)
+        self.assertEqual(gate.stats()["frames"], 100)
+
+    def test_no_keepalive_skips_everything_while_static(self):
+        gate = MotionGate(static_after_seconds=0.5, keepalive_interval=None)
+        decisions = [gate.should_infer(self.static_frame, i * 0.1) for i in range(50)]
+        self.assertFalse(any(decisions[6:]))
+
+    def test_motion_reopens_gate(self):
+        gate = MotionGate(static_after_seconds=0.5, keepalive_interval=None)
+        for i in range(20):
+            gate.should_infer(self.static_frame, i * 0.1)
+        self.assertFalse(gate.should_infer(self.static_frame, 2.0))
+
+        self.assertTrue(gate.should_infer(self._moving_frame(1), 2.1))
+        self.assertTrue(gate.should_infer(self._moving_frame(2), 2.2))
+
+    def test_remember_keeps_last_landmarks(self):
+        gate = MotionGate()
+        gate.remember(["lm"])
+        self.assertEqual(gate.last_landmarks, ["lm"])
+
+
+if __name__ == "__main__":
+    unittest.main()
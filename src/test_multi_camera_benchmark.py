@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MultiCameraSupervisor throughput vs pose worker count
+Execute: python3 src/test_multi_camera_benchmark.py [--cameras 4] [--inference-ms 30] [--seconds 3]
+
+Fake readers keep every camera's buffer full and a fake estimator stands in for
+MediaPipe: it sleeps for --inference-ms (native inference releases the GIL) and
+returns fixed landmarks, so everything else is the real per-frame Python path
+(buffer, sequence tracking, FallDetectionPipeline). Reports the Python time per frame
+measured on one thread, the throughput ceiling it implies for any number of threads,
+and the aggregate FPS achieved with each worker count.
+"""
+
+import time
+import argparse
+import threading
+import numpy as np
+from camera.frame_envelope import FrameEnvelope
+from pipeline.fall_pipeline import FallDetectionPipeline
+from pipeline.multi_camera_supervisor import MultiCameraSupervisor
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+LANDMARKS = np.random.default_rng(0).uniform(0.3, 0.7, size=(33, 4)).astype(np.float32)
+
+
+class StreamingReader:
+    """Delivers frames to the buffer as fast as it takes them."""
+    def __init__(self, buffer, camera_id):
+        self.buffer = buffer
+        self.camera_id = camera_id
+        self.frames_skipped = 0
+        self.running = False
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        seq = 0
+        while self.running:
+            self.buffer.put(FrameEnvelope(FRAME, time.time(), self.camera_id, seq))
+            seq += 1
+            time.sleep(0.001)
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join()
+
+
+class SleepingEstimator:
+    def __init__(self, inference_seconds: float):
+        self.inference_seconds = inference_seconds
+
+    def detect(self, frame, roi_tracker=None):
+        time.sleep(self.inference_seconds)
+        return LANDMARKS.copy()
+
+    def detect_all(self, frame):
+        return [self.detect(frame)]
+
+    def close(self):
+        pass
+
+
+def python_ms_per_frame(n: int = 2000) -> float:
+    pipeline = FallDetectionPipeline()
+    t0 = time.perf_counter()
+    for i in range(n):
+        pipeline.process_landmarks(1767046964.0 + i / 30.0, LANDMARKS.copy(), FRAME.shape)
+    return (time.perf_counter() - t0) / n * 1e3
+
+
+def run_case(cameras: int, workers: int, inference_ms: float, seconds: float) -> float:
+    supervisor = MultiCameraSupervisor(
+        {f"cam{i}": f"fake://{i}" for i in range(cameras)},
+        num_workers=workers, report_interval=3600.0,
+        estimator_factory=lambda: SleepingEstimator(inference_ms / 1000.0)
+    )
+    for channel in supervisor.channels:
+        channel.reader = StreamingReader(channel.buffer, channel.camera_id)
+    supervisor.start()
+    time.sleep(seconds)
+    processed = sum(s["processed"] for s in supervisor.stats().values())
+    supervisor.stop()
+    return processed / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MultiCameraSupervisor worker scaling benchmark")
+    parser.add_argument("--cameras", type=int, default=4, help="Simulated cameras")
+    parser.add_argument("--inference-ms", type=float, default=30.0, help="Simulated (GIL-free) inference time per frame")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each case")
+    parser.add_argument("--workers", type=str, default="1,2,4,8", help="Comma-separated worker counts")
+    args = parser.parse_args()
+
+    python_ms = python_ms_per_frame()
+    print(f"--- MultiCameraSupervisor benchmark ({args.cameras} cameras, inference {args.inference_ms:.0f} ms) ---")
+    print(f"Python work per frame: {python_ms:.3f} ms -> GIL ceiling ~{1000.0 / python_ms:.0f} FPS across all workers")
+    header = f"{'workers':>7} {'fps':>8} {'ideal':>8}"
+    print(header)
+    print("-" * len(header))
+    for workers in (int(w) for w in args.workers.split(",")):
+        fps = run_case(args.cameras, workers, args.inference_ms, args.seconds)
+        ideal = min(workers, args.cameras) * 1000.0 / (args.inference_ms + python_ms)
+        print(f"{workers:>7} {fps:>8.1f} {ideal:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
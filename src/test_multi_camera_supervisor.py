@@ -0,0 +1,140 @@
+import time
+import threading
+import unittest
+import numpy as np
+from camera.frame_envelope import FrameEnvelope
+from pipeline.multi_camera_supervisor import MultiCameraSupervisor
+from shared.cli_args import parse_sources
+
+FRAME = np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def make_landmarks(hip_y=0.5):
+    landmarks = np.full((33, 4), 0.5, dtype=np.float32)
+    landmarks[:, 1] = hip_y
+    return landmarks
+
+
+class FakeReader:
+    """Stands in for RTSPReader: start() queues frames camera_id/0..n-1, then the source ends."""
+    def __init__(self, buffer, camera_id, n_frames):
+        self.buffer = buffer
+        self.camera_id = camera_id
+        self.n_frames = n_frames
+        self.frames_skipped = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        for seq in range(self.n_frames):
+            self.buffer.put(FrameEnvelope(FRAME, time.time(), self.camera_id, seq))
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+
+class FakeEstimator:
+    """Records the frames it sees per camera; detect() returns fixed landmarks."""
+    def __init__(self, log, lock):
+        self.log = log
+        self.lock = lock
+        self.closed = False
+
+    def detect(self, frame, roi_tracker=None):
+        with self.lock:
+            self.log.append((threading.current_thread().name, id(frame)))
+        time.sleep(0.001)  # Native inference releases the GIL
+        return make_landmarks()
+
+    def detect_all(self, frame):
+        return [self.detect(frame)]
+
+    def close(self):
+        self.closed = True
+
+
+class TestMultiCameraSupervisor(unittest.TestCase):
+    def make_supervisor(self, n_cameras=3, n_frames=20, **kwargs):
+        self.calls, self.estimators = [], []
+        lock = threading.Lock()
+
+        def factory():
+            estimator = FakeEstimator(self.calls, lock)
+            self.estimators.append(estimator)
+            return estimator
+
+        supervisor = MultiCameraSupervisor(
+            {f"cam{i}": f"rtsp://fake/{i}" for i in range(n_cameras)},
+            buffer_size=n_frames, estimator_factory=factory, **kwargs
+        )
+        for channel in supervisor.channels:
+            channel.reader = FakeReader(channel.buffer, channel.camera_id, n_frames)
+        return supervisor
+
+    def test_every_frame_is_processed_once_per_camera(self):
+        supervisor = self.make_supervisor(num_workers=2)
+        supervisor.run()
+
+        self.assertEqual(len(self.calls), 60)
+        self.assertEqual({name for name, _ in self.calls}, {"pose-worker-0", "pose-worker-1"})
+        stats = supervisor.stats()
+        for camera_id, s in stats.items():
+            self.assertEqual(s["processed"], 20, camera_id)
+            self.assertEqual(s["sequence_gaps"], 0)
+            self.assertEqual(s["latency"]["pose"]["count"], 20)
+        # Every worker closes its own estimator
+        self.assertEqual(len(self.estimators), 2)
+        self.assertTrue(all(e.closed for e in self.estimators))
+        # Each camera's pipeline saw the landmarks
+        self.assertTrue(all(c.pipeline.last_features is not None for c in supervisor.channels))
+
+    def test_frames_of_a_camera_stay_in_order(self):
+        supervisor = self.make_supervisor(num_workers=3)
+        seen = {c.camera_id: [] for c in supervisor.channels}
+        for channel in supervisor.channels:
+            observe = channel.gaps.observe
+            channel.gaps.observe = lambda seq, observe=observe, cid=channel.camera_id: (seen[cid].append(seq), observe(seq))[1]
+        supervisor.run()
+        for camera_id, seqs in seen.items():
+            self.assertEqual(seqs, list(range(20)), camera_id)
+
+    def test_multi_person_tracks_per_camera(self):
+        supervisor = self.make_supervisor(n_cameras=2, n_frames=5, num_workers=2, num_poses=2)
+        supervisor.run()
+        for channel in supervisor.channels:
+            self.assertIsNotNone(channel.pose_tracker)
+            self.assertEqual(len(channel.pipeline.tracks), 1)
+
+    def test_default_worker_count(self):
+        supervisor = self.make_supervisor(n_cameras=1)
+        self.assertEqual(supervisor.num_workers, 1)
+
+    def test_requires_a_source(self):
+        with self.assertRaises(ValueError):
+            MultiCameraSupervisor({})
+
+
+class TestParseSources(unittest.TestCase):
+    def test_ids_and_defaults(self):
+        self.assertEqual(
+            parse_sources("front=rtsp://a/1, rtsp://b/2,,0"),
+            {"front": "rtsp://a/1", "cam0": "rtsp://b/2", "cam1": "0"}
+        )
+
+    def test_url_with_query_is_not_split_on_equals(self):
+        self.assertEqual(parse_sources("rtsp://a/stream?user=x"), {"cam0": "rtsp://a/stream?user=x"})
+        self.assertEqual(parse_sources("door=rtsp://a/s?x=1"), {"door": "rtsp://a/s?x=1"})
+
+    def test_defaults_do_not_take_explicit_ids(self):
+        self.assertEqual(parse_sources("cam1=rtsp://x,rtsp://y"), {"cam1": "rtsp://x", "cam0": "rtsp://y"})
+
+    def test_duplicate_ids_are_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_sources("door=rtsp://a,door=rtsp://b")
+        with self.assertRaises(ValueError):
+            parse_sources("cam0=rtsp://a,rtsp://b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import types
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import importlib.util
+import cv2
+import numpy as np
+import camera.offline_video as offline_video
+from camera.offline_video import OfflineVideoSource
+
+FPS = 10.0
+N_FRAMES = 15
+VideoCapture = cv2.VideoCapture
+
+
+def write_video(path, n_frames=N_FRAMES, fps=FPS):
+    """Writes an MJPG clip whose frame i is filled with the gray level 10 * i."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(n_frames):
+        writer.write(np.full((48, 64, 3), 10 * i, dtype=np.uint8))
+    writer.release()
+
+
+class NoPositionCapture:
+    """cv2.VideoCapture whose backend reports no usable CAP_PROP_POS_MSEC."""
+    def __init__(self, path):
+        self._cap = VideoCapture(path)
+
+    def get(self, prop):
+        return 0.0 if prop == cv2.CAP_PROP_POS_MSEC else self._cap.get(prop)
+
+    def __getattr__(self, name):
+        return getattr(self._cap, name)
+
+
+class VideoTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "clip.avi")
+        write_video(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestOfflineVideoSource(VideoTestCase):
+    def test_every_frame_with_media_timestamps(self):
+        source = OfflineVideoSource(self.path, source_id="clip", epoch=1000.0)
+        packets = list(source)
+
+        self.assertEqual([p.seq for p in packets], list(range(N_FRAMES)))
+        self.assertEqual({p.source_id for p in packets}, {"clip"})
+        for i, p in enumerate(packets):
+            self.assertAlmostEqual(p.capture_time, 1000.0 + i / FPS, places=6)
+            # Frames come in order and none is dropped
+            self.assertAlmostEqual(float(p.image.mean()), 10 * i, delta=2)
+        self.assertEqual(source.frames_read, N_FRAMES)
+        self.assertAlmostEqual(source.media_seconds, (N_FRAMES - 1) / FPS, places=6)
+
+    def test_same_timestamps_on_every_run(self):
+        first = [p.capture_time for p in OfflineVideoSource(self.path)]
+        second = [p.capture_time for p in OfflineVideoSource(self.path)]
+        self.assertEqual(first, second)
+
+    def test_frame_index_fallback(self):
+        with unittest.mock.patch.object(offline_video.cv2, "VideoCapture", NoPositionCapture):
+            packets = list(OfflineVideoSource(self.path, epoch=5.0))
+        self.assertEqual(len(packets), N_FRAMES)
+        for i, p in enumerate(packets):
+            self.assertAlmostEqual(p.capture_time, 5.0 + i / FPS, places=6)
+
+    def test_missing_file(self):
+        with self.assertRaises(IOError):
+            list(OfflineVideoSource(os.path.join(self.root, "missing.avi")))
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "main.py imports mediapipe")
+class TestRunOffline(VideoTestCase):
+    def test_pipeline_gets_media_timestamps(self):
+        import main
+
+        detect_ts = []
+        fed = []
+
+        class FakeEstimator:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def detect(self, frame, timestamp_ms, roi_tracker=None):
+                detect_ts.append(timestamp_ms)
+                return None
+
+            def close(self):
+                pass
+
+        args = types.SimpleNamespace(
+            source=self.path, media_epoch=1000.0, num_poses=1, roi_tracking=False, motion_gate=False
+        )
+        with unittest.mock.patch.object(main, "PoseEstimator", FakeEstimator), \
+                unittest.mock.patch.object(main, "feed_pipeline", lambda pipeline, tracker, ts, *rest: fed.append(ts)):
+            main.run_offline(args)
+
+        self.assertEqual(len(fed), N_FRAMES)
+        for i, ts in enumerate(fed):
+            self.assertAlmostEqual(ts, 1000.0 + i / FPS, places=6)
+        # VIDEO-mode inference is keyed on media milliseconds
+        self.assertEqual(detect_ts, [int(round(i * 1000 / FPS)) for i in range(N_FRAMES)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import numpy as np
+from processing.landmarks import NUM_LANDMARKS
+from processing.pose_tracker import PoseTracker, iou_matrix
+from pipeline.fall_pipeline import FallDetectionPipeline, DEFAULT_TRACK_ID
+from analysis.analysis_snapshot import AnalysisSnapshotEngine
+
+
+def make_pose(cx, cy, size=0.2):
+    """(33, 4) pose spread over a size x size box centred on (cx, cy)."""
+    arr = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    grid = np.linspace(-size / 2, size / 2, NUM_LANDMARKS, dtype=np.float32)
+    arr[:, 0] = cx + grid
+    arr[:, 1] = cy + grid[::-1]
+    arr[:, 3] = 1.0
+    return arr
+
+
+class FixedTracker:
+    """PoseTracker stand-in returning preset assignments, one list per frame; [] once they run out."""
+    def __init__(self, frames):
+        self.frames = frames
+
+    def assign(self, poses, now):
+        return self.frames.pop(0) if self.frames else []
+
+    def evict(self, now):
+        return []
+
+
+class TestPoseTracker(unittest.TestCase):
+    def test_iou_matrix(self):
+        a = np.array([[0.0, 0.0, 1.0, 1.0]])
+        b = np.array([[0.0, 0.0, 1.0, 1.0], [0.5, 0.0, 1.5, 1.0], [2.0, 2.0, 3.0, 3.0]])
+        np.testing.assert_allclose(iou_matrix(a, b), [[1.0, 1.0 / 3.0, 0.0]])
+
+    def test_ids_are_stable_across_frames(self):
+        tracker = PoseTracker()
+        first = tracker.assign([make_pose(0.2, 0.5), make_pose(0.7, 0.5)], 0.0)
+        self.assertEqual([t for t, _ in first], ["person_0", "person_1"])
+
+        # Same people, small movement, detection order swapped
+        second = tracker.assign([make_pose(0.72, 0.52), make_pose(0.21, 0.5)], 0.1)
+        self.assertEqual([t for t, _ in second], ["person_1", "person_0"])
+
+    def test_centroid_fallback_for_fast_motion(self):
+        tracker = PoseTracker(max_centroid_distance=0.25)
+        tracker.assign([make_pose(0.5, 0.3, size=0.1)], 0.0)
+        # Dropped 0.15: no overlap left, but close enough by centroid
+        tracked = tracker.assign([make_pose(0.5, 0.45, size=0.1)], 0.1)
+        self.assertEqual(tracked[0][0], "person_0")
+
+    def test_new_person_gets_new_id(self):
+        tracker = PoseTracker()
+        tracker.assign([make_pose(0.2, 0.5)], 0.0)
+        tracked = tracker.assign([make_pose(0.2, 0.5), make_pose(0.8, 0.5)], 0.1)
+        self.assertEqual(sorted(t for t, _ in tracked), ["person_0", "person_1"])
+
+    def test_eviction(self):
+        tracker = PoseTracker(max_missing_seconds=1.0)
+        tracker.assign([make_pose(0.2, 0.5), make_pose(0.8, 0.5)], 0.0)
+        tracker.assign([make_pose(0.2, 0.5)], 0.8)
+        self.assertEqual(tracker.evict(0.9), [])
+        self.assertEqual(tracker.evict(1.5), ["person_1"])
+        self.assertEqual(list(tracker.tracks), ["person_0"])
+
+
+class TestPerTrackPipelineState(unittest.TestCase):
+    def test_floor_duration_is_per_track(self):
+        pipeline = FallDetectionPipeline()
+        pipeline.process_state(100.0, "ON_FLOOR", "person_1")
+        pipeline.process_state(100.0, "STANDING", "person_0")
+        pipeline.process_state(104.0, "ON_FLOOR", "person_1")
+        pipeline.process_state(104.0, "STANDING", "person_0")
+
+        self.assertEqual(pipeline.tracks["person_1"].on_floor_duration_seconds, 4.0)
+        self.assertEqual(pipeline.tracks["person_0"].on_floor_duration_seconds, 0.0)
+        self.assertEqual(pipeline.on_floor_duration_seconds, 4.0)
+
+    def test_drop_track(self):
+        pipeline = FallDetectionPipeline()
+        pipeline.process_state(100.0, "ON_FLOOR")
+        self.assertIn(DEFAULT_TRACK_ID, pipeline.tracks)
+        pipeline.drop_track(DEFAULT_TRACK_ID)
+        self.assertEqual(pipeline.tracks, {})
+        self.assertEqual(pipeline.on_floor_duration_seconds, 0.0)
+
+    def test_snapshots_are_managed_once_per_frame(self):
+        standing = {"person_0": make_pose(0.3, 0.4), "person_1": make_pose(0.7, 0.4)}
+        on_floor = {"person_0": make_pose(0.3, 0.85), "person_1": make_pose(0.7, 0.85)}
+        # person_1 falls at t=101, person_0 at t=102 (frames > 0.6 s apart: no motion events)
+        frames = [
+            {"person_0": standing["person_0"], "person_1": standing["person_1"]},
+            {"person_0": standing["person_0"], "person_1": on_floor["person_1"]},
+            {"person_0": on_floor["person_0"], "person_1": on_floor["person_1"]},
+        ]
+        for order in (["person_0", "person_1"], ["person_1", "person_0"]):
+            pipeline = FallDetectionPipeline()
+            decisions = []
+            pipeline._execute_decision_pipeline = lambda now, trigger: decisions.append((now, trigger))
+            pipeline.recent_events.append({"id": "x", "event_type": "RAPID_VERTICAL_MOVEMENT", "timestamp": 100.0})
+            tracker = FixedTracker([[(t, frame[t]) for t in order] for frame in frames])
+            for i in range(len(frames)):
+                pipeline.process_poses(100.0 + i, [], (480, 640, 3), tracker)
+
+            # One snapshot per state change; the second subject's fall is not deduplicated away
+            self.assertEqual(decisions, [(101.0, "STATE_CHANGE"), (102.0, "STATE_CHANGE")], order)
+            self.assertEqual(pipeline.last_snapshot_state, (("person_0", "ON_FLOOR"), ("person_1", "ON_FLOOR")))
+
+    def test_timer_snapshots_continue_without_poses(self):
+        pipeline = FallDetectionPipeline()
+        decisions = []
+        pipeline._execute_decision_pipeline = lambda now, trigger: decisions.append((now, trigger))
+        pipeline.recent_events.append({"id": "x", "event_type": "RAPID_VERTICAL_MOVEMENT", "timestamp": 100.0})
+        # The subject falls at t=101, then is occluded: no poses from t=102 on
+        tracker = FixedTracker([[("person_0", make_pose(0.5, 0.4))], [("person_0", make_pose(0.5, 0.85))]])
+        for t in range(100, 125):
+            pipeline.process_poses(float(t), [], (480, 640, 3), tracker)
+
+        self.assertEqual(decisions, [(101.0, "STATE_CHANGE"), (111.0, "TIMER"), (121.0, "TIMER")])
+        self.assertEqual(pipeline.last_snapshot_state, ())
+
+    def test_snapshot_entities_come_from_events(self):
+        events = [
+            {"id": "a", "event_type": "RAPID_VERTICAL_MOVEMENT", "event_category": "motion", "entity_id": "person_2", "timestamp": 1.0},
+            {"id": "b", "event_type": "RAPID_VERTICAL_MOVEMENT", "event_category": "motion", "timestamp": 2.0}
+        ]
+        snapshot = AnalysisSnapshotEngine().analyze_window(events, window_seconds=10.0)
+        self.assertEqual(snapshot["involved_entities"], ["person_0", "person_2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
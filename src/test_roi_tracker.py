@@ -0,0 +1,157 @@
+import types
+import unittest
+import unittest.mock
+import importlib.util
+import numpy as np
+from processing.roi_tracker import RoiTracker
+
+FRAME_SHAPE = (720, 1280, 3)
+
+
+def make_pose(cx, cy, spread=0.05, visibility=0.9, n=33):
+    xs = np.linspace(cx - spread, cx + spread, n)
+    ys = np.linspace(cy - 2 * spread, cy + 2 * spread, n)
+    return np.stack([xs, ys, np.zeros(n), np.full(n, visibility)], axis=1).astype(np.float32)
+
+
+class TestRoiTracker(unittest.TestCase):
+
+    def test_starts_with_full_frame(self):
+        tracker = RoiTracker()
+        frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        image, roi = tracker.crop(frame)
+        self.assertIsNone(roi)
+        self.assertEqual(image.shape, FRAME_SHAPE)
+
+    def test_update_sets_padded_roi_inside_frame(self):
+        tracker = RoiTracker()
+        tracker.update(make_pose(0.5, 0.5), FRAME_SHAPE)
+        x0, y0, x1, y1 = tracker.roi
+        self.assertTrue(0 <= x0 < 640 < x1 <= 1280)
+        self.assertTrue(0 <= y0 < 360 < y1 <= 720)
+
+        frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        image, roi = tracker.crop(frame)
+        self.assertEqual(image.shape[:2], (y1 - y0, x1 - x0))
+        self.assertLess(image.size, frame.size)
+
+    def test_round_trip_to_full_frame(self):
+        tracker = RoiTracker()
+        roi = (100, 50, 500, 450)
+        crop_landmarks = np.array([[0.5, 0.25, 0.1, 1.0]], dtype=np.float32)
+        full = tracker.to_full_frame(crop_landmarks, roi, FRAME_SHAPE)
+        self.assertAlmostEqual(full[0, 0] * 1280, 300.0, places=3)
+        self.assertAlmostEqual(full[0, 1] * 720, 150.0, places=3)
+        self.assertAlmostEqual(full[0, 2], 0.1 * 400 / 1280, places=6)
+        self.assertIs(tracker.to_full_frame(crop_landmarks, None, FRAME_SHAPE), crop_landmarks)
+
+    def test_lost_tracking_resets(self):
+        tracker = RoiTracker()
+        tracker.update(make_pose(0.5, 0.5), FRAME_SHAPE)
+        self.assertIsNotNone(tracker.roi)
+
+        tracker.update(make_pose(0.5, 0.5, visibility=0.1), FRAME_SHAPE)
+        self.assertIsNone(tracker.roi)
+        self.assertEqual(tracker.resets, 1)
+
+        tracker.update(make_pose(0.5, 0.5), FRAME_SHAPE)
+        tracker.update(None, FRAME_SHAPE)
+        self.assertIsNone(tracker.roi)
+
+
+class LockCheckingTracker(RoiTracker):
+    """Records whether the estimator's lock was held on every tracker access."""
+    def __init__(self, lock):
+        super().__init__()
+        self.lock = lock
+        self.unlocked_calls = []
+
+    def crop(self, frame):
+        if not self.lock.locked():
+            self.unlocked_calls.append("crop")
+        return super().crop(frame)
+
+    def update(self, landmarks, frame_shape):
+        if not self.lock.locked():
+            self.unlocked_calls.append("update")
+        super().update(landmarks, frame_shape)
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "pose_estimator imports mediapipe")
+class TestLiveStreamRoiLocking(unittest.TestCase):
+    def test_tracker_is_accessed_under_the_lock(self):
+        from processing.pose_estimator import LiveStreamPoseEstimator
+
+        submitted = []
+        results = []
+        detector = types.SimpleNamespace(detect_async=lambda image, ts: submitted.append(ts), close=lambda: None)
+        with unittest.mock.patch("processing.pose_estimator.create_pose_landmarker", return_value=detector):
+            estimator = LiveStreamPoseEstimator(lambda *args: results.append(args))
+        tracker = estimator.roi_tracker = LockCheckingTracker(estimator._lock)
+
+        frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        estimator.submit(frame, 1.0)
+        estimator._handle_result(types.SimpleNamespace(pose_landmarks=[make_pose(0.5, 0.5)]), None, submitted[0])
+        estimator.submit(frame, 2.0)
+
+        self.assertEqual(tracker.unlocked_calls, [])
+        self.assertEqual(tracker.crops, 1)
+        self.assertEqual(len(results), 1)
+
+
+class StrictVideoDetector:
+    """Fake PoseLandmarker; like MediaPipe, VIDEO mode rejects non-increasing timestamps."""
+    def __init__(self, poses=None):
+        self.poses = poses or []
+        self.timestamps = []
+        self.calls = 0
+
+    def detect_for_video(self, image, timestamp_ms):
+        if self.timestamps and timestamp_ms <= self.timestamps[-1]:
+            raise ValueError(f"timestamp {timestamp_ms} is not greater than {self.timestamps[-1]}")
+        self.timestamps.append(timestamp_ms)
+        return self.detect(image)
+
+    def detect(self, image):
+        self.calls += 1
+        return types.SimpleNamespace(pose_landmarks=self.poses)
+
+    def close(self):
+        pass
+
+
+@unittest.skipUnless(importlib.util.find_spec("mediapipe"), "pose_estimator imports mediapipe")
+class TestPoseEstimatorRoi(unittest.TestCase):
+    def make_estimator(self, detector, video):
+        from mediapipe.tasks.python import vision
+        from processing.pose_estimator import PoseEstimator
+        mode = vision.RunningMode.VIDEO if video else vision.RunningMode.IMAGE
+        with unittest.mock.patch("processing.pose_estimator.create_pose_landmarker", return_value=detector):
+            return PoseEstimator(running_mode=mode)
+
+    def test_video_mode_runs_each_timestamp_once(self):
+        detector = StrictVideoDetector()
+        estimator = self.make_estimator(detector, video=True)
+        frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        for ts in (0, 33, 66):
+            self.assertIsNone(estimator.detect(frame, ts))
+        self.assertEqual(detector.timestamps, [0, 33, 66])
+        # A lost crop would retry the same timestamp: ROI tracking is refused up front
+        tracker = RoiTracker()
+        tracker.update(make_pose(0.5, 0.5), FRAME_SHAPE)
+        with self.assertRaises(ValueError):
+            estimator.detect(frame, 100, roi_tracker=tracker)
+        self.assertEqual(detector.timestamps, [0, 33, 66])
+
+    def test_image_mode_retries_the_full_frame(self):
+        detector = StrictVideoDetector()
+        estimator = self.make_estimator(detector, video=False)
+        tracker = RoiTracker()
+        tracker.update(make_pose(0.5, 0.5), FRAME_SHAPE)
+        self.assertIsNone(estimator.detect(np.zeros(FRAME_SHAPE, dtype=np.uint8), roi_tracker=tracker))
+        self.assertEqual(detector.calls, 2)
+        self.assertIsNone(tracker.roi)
+
+
+if __name__ == "__main__":
+    unittest.main()
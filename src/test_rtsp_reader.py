@@ -0,0 +1,117 @@
+import time
+import types
+import unittest
+import unittest.mock
+import numpy as np
+import camera.rtsp_reader as rtsp_reader
+from camera.frame_buffer import FrameBuffer
+from camera.rtsp_reader import RTSPReader
+
+FRAME = np.zeros((4, 4, 3), dtype=np.uint8)
+SOURCE_FPS = 30.0
+
+
+class FakeCapture:
+    """
+    Stands in for cv2.VideoCapture on a file of n_frames frames at SOURCE_FPS: each
+    grab() advances the fake clock by one frame interval. on_grab(i) runs before grab i
+    (e.g. a consumer taking frames).
+    """
+    def __init__(self, n_frames, on_grab=None):
+        self.n_frames = n_frames
+        self.on_grab = on_grab
+        self.clock = 100.0
+        self.grabs = 0
+        self.retrieves = 0
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.grabs >= self.n_frames:
+            return False
+        if self.on_grab:
+            self.on_grab(self.grabs)
+        self.grabs += 1
+        self.clock += 1.0 / SOURCE_FPS
+        return True
+
+    def retrieve(self):
+        self.retrieves += 1
+        return True, FRAME
+
+    def release(self):
+        pass
+
+
+class TestRTSPReaderDecimation(unittest.TestCase):
+    def run_reader(self, n_frames, buffer_size=1000, on_grab=None, **kwargs):
+        """Runs the reader loop to the end of a fake file; returns (reader, capture, buffer)."""
+        buffer = FrameBuffer(max_size=buffer_size)
+        capture = FakeCapture(n_frames, on_grab=on_grab and (lambda i: on_grab(i, buffer)))
+        clock = types.SimpleNamespace(time=time.time, sleep=time.sleep, monotonic=lambda: capture.clock)
+        reader = RTSPReader("clip.mp4", buffer, source_id="cam", **kwargs)
+        with unittest.mock.patch.object(rtsp_reader.cv2, "VideoCapture", return_value=capture), \
+                unittest.mock.patch.object(rtsp_reader, "time", clock):
+            reader.running = True
+            reader._run()
+        return reader, capture, buffer
+
+    def drain(self, buffer):
+        frames = []
+        while not buffer.empty():
+            frames.append(buffer.get(block=False))
+        return frames
+
+    def test_every_frame_without_decimation(self):
+        reader, capture, buffer = self.run_reader(30)
+        self.assertEqual((capture.grabs, capture.retrieves), (30, 30))
+        self.assertEqual((reader.frames_grabbed, reader.frames_skipped), (30, 0))
+        self.assertEqual([f.seq for f in self.drain(buffer)], list(range(30)))
+
+    def test_target_fps_retrieves_only_delivered_frames(self):
+        reader, capture, buffer = self.run_reader(90, target_fps=10.0)
+        # 3 s of 30 fps video at 10 fps: every third frame is decoded
+        self.assertEqual(capture.grabs, 90)
+        self.assertEqual(capture.retrieves, 30)
+        self.assertEqual((reader.frames_grabbed, reader.frames_skipped), (90, 60))
+        frames = self.drain(buffer)
+        self.assertEqual([f.seq for f in frames], list(range(30)))
+        self.assertEqual(reader.seq, 30)
+
+    def test_target_fps_above_source_rate_keeps_every_frame(self):
+        reader, capture, _ = self.run_reader(30, target_fps=60.0)
+        self.assertEqual((capture.retrieves, reader.frames_skipped), (30, 0))
+
+    def test_skip_when_busy_without_consumer(self):
+        reader, capture, buffer = self.run_reader(20, buffer_size=1, skip_when_busy=True)
+        # The first frame is never taken: nothing after it is decoded
+        self.assertEqual((capture.grabs, capture.retrieves), (20, 1))
+        self.assertEqual((reader.frames_grabbed, reader.frames_skipped), (20, 19))
+        self.assertEqual(buffer.dropped, 0)
+
+    def test_skip_when_busy_follows_the_consumer(self):
+        taken = []
+
+        def consumer(i, buffer):
+            # Takes the pending frame before every fourth grab
+            if i % 4 == 0 and not buffer.empty():
+                taken.append(buffer.get(block=False))
+
+        reader, capture, buffer = self.run_reader(20, buffer_size=1, on_grab=consumer, skip_when_busy=True)
+        # Delivered on grabs 0, 4, 8, 12, 16
+        self.assertEqual(capture.retrieves, 5)
+        self.assertEqual(reader.frames_skipped, 15)
+        self.assertEqual([f.seq for f in taken] + [f.seq for f in self.drain(buffer)], list(range(5)))
+        self.assertEqual(buffer.dropped, 0)
+
+    def test_target_fps_and_skip_when_busy(self):
+        reader, capture, _ = self.run_reader(
+            90, buffer_size=1, on_grab=lambda i, buffer: self.drain(buffer), target_fps=10.0, skip_when_busy=True
+        )
+        # An always-idle consumer leaves only the rate limit
+        self.assertEqual((capture.retrieves, reader.frames_skipped), (30, 60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import queue
+import unittest
+import multiprocessing
+import numpy as np
+from camera.frame_envelope import FrameEnvelope
+from camera.shared_frame_buffer import SharedFrameBuffer
+
+SHAPE = (48, 64, 3)
+
+
+def _consume(buffer, results):
+    # Runs in a child process: attach and read two frames
+    for _ in range(2):
+        with buffer.acquire(timeout=5.0) as shared:
+            results.put((shared.seq, int(shared.frame[0, 0, 0])))
+    buffer.close()
+
+
+def _acquire_and_die(buffer):
+    # Runs in a child process: checks a frame out and exits without releasing it
+    buffer.acquire(timeout=5.0)
+    os._exit(0)
+
+
+class TestSharedFrameBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = SharedFrameBuffer(SHAPE, max_size=2)
+
+    def tearDown(self):
+        self.buffer.close()
+        self.buffer.unlink()
+
+    def _frame(self, value):
+        return np.full(SHAPE, value, dtype=np.uint8)
+
+    def test_fifo_order(self):
+        self.buffer.put(self._frame(1))
+        self.buffer.put(self._frame(2))
+        self.assertEqual(self.buffer.qsize(), 2)
+        self.assertEqual(self.buffer.get().image[0, 0, 0], 1)
+        self.assertEqual(self.buffer.get().image[0, 0, 0], 2)
+        self.assertTrue(self.buffer.empty())
+
+    def test_drop_oldest_when_full(self):
+        for value in (1, 2, 3):
+            self.buffer.put(self._frame(value))
+        self.assertEqual(self.buffer.dropped, 1)
+        self.assertEqual(self.buffer.get().image[0, 0, 0], 2)
+        self.assertEqual(self.buffer.get().image[0, 0, 0], 3)
+
+    def test_slot_being_read_is_not_overwritten(self):
+        self.buffer.put(self._frame(1))
+        shared = self.buffer.acquire()
+        for value in (2, 3, 4):
+            self.buffer.put(self._frame(value))
+        self.assertEqual(shared.frame[0, 0, 0], 1)
+        shared.release()
+        self.assertEqual(self.buffer.get().image[0, 0, 0], 4)
+
+    def test_empty_raises(self):
+        with self.assertRaises(queue.Empty):
+            self.buffer.get(block=False)
+        with self.assertRaises(queue.Empty):
+            self.buffer.get(timeout=0.01)
+
+    def test_envelope_metadata_round_trip(self):
+        self.buffer.put(FrameEnvelope(self._frame(5), 1234.5, "cam1", 42))
+        envelope = self.buffer.get()
+        self.assertIsInstance(envelope, FrameEnvelope)
+        self.assertEqual(envelope.seq, 42)
+        self.assertEqual(envelope.capture_time, 1234.5)
+        self.assertEqual(envelope.image[0, 0, 0], 5)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.buffer.put(np.zeros((10, 10, 3), dtype=np.uint8))
+
+    def test_cross_process(self):
+        ctx = multiprocessing.get_context("spawn")
+        buffer = SharedFrameBuffer(SHAPE, max_size=2, ctx=ctx)
+        results = ctx.Queue()
+        try:
+            proc = ctx.Process(target=_consume, args=(buffer, results))
+            proc.start()
+            buffer.put(self._frame(7))
+            buffer.put(self._frame(8))
+            proc.join(timeout=30)
+            self.assertEqual(proc.exitcode, 0)
+            self.assertEqual([results.get(timeout=1) for _ in range(2)], [(0, 7), (1, 8)])
+        finally:
+            buffer.close()
+            buffer.unlink()
+
+    def test_slot_of_exited_reader_is_reclaimed(self):
+        ctx = multiprocessing.get_context("spawn")
+        buffer = SharedFrameBuffer(SHAPE, max_size=2, ctx=ctx)
+        try:
+            buffer.put(self._frame(1))
+            proc = ctx.Process(target=_acquire_and_die, args=(buffer,))
+            proc.start()
+            proc.join(timeout=30)
+            self.assertEqual(proc.exitcode, 0)
+
+            # Both slots are usable again: nothing is dropped
+            buffer.put(self._frame(2))
+            buffer.put(self._frame(3))
+            self.assertEqual(buffer.dropped, 0)
+            self.assertEqual([buffer.get().image[0, 0, 0] for _ in range(2)], [2, 3])
+        finally:
+            buffer.close()
+            buffer.unlink()
+
+    def test_slot_of_live_reader_is_kept(self):
+        self.buffer.put(self._frame(1))
+        shared = self.buffer.acquire()
+        self.buffer.put(self._frame(2))
+        self.buffer.put(self._frame(3))
+        self.assertEqual(self.buffer.dropped, 1)
+        self.assertEqual(shared.frame[0, 0, 0], 1)
+        shared.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import unittest
+import event_engine
+import event_replay
+from analysis.analysis_snapshot import AnalysisSnapshotEngine
+from event_test_utils import BASE_TS, EventStoreTestCase, make_event
+import storage.sqlite_store as sqlite_store
+from storage.sqlite_store import SqliteEventStore
+
+
+class TestSqliteEventStore(EventStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = SqliteEventStore(os.path.join(self.root, "events.db"))
+
+    def tearDown(self):
+        self.db.close()
+        super().tearDown()
+
+    def test_wal_mode_and_indexes(self):
+        self.assertEqual(self.db._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        plan = " ".join(str(r) for r in self.db._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT body FROM events WHERE event_type = ? AND timestamp >= ? ORDER BY timestamp",
+            ("POTENTIAL_FALL", 0.0)
+        ))
+        self.assertIn("idx_events_type_timestamp", plan)
+
+    def test_query_filters(self):
+        events = [make_event(i, "POTENTIAL_FALL" if i % 3 == 0 else "RAPID_VERTICAL_MOVEMENT") for i in range(10)]
+        self.db.extend(list(reversed(events)))
+        self.assertEqual([e["id"] for e in self.db.query()], [e["id"] for e in events])
+        self.assertEqual([e["id"] for e in self.db.query(start=BASE_TS + 2, end=BASE_TS + 5)], [e["id"] for e in events[2:5]])
+        self.assertEqual(
+            [e["id"] for e in self.db.query(start=BASE_TS + 1, event_types=["POTENTIAL_FALL"])],
+            [events[i]["id"] for i in (3, 6, 9)]
+        )
+        self.assertEqual(len(self.db.query(limit=4)), 4)
+
+    def test_extend_is_idempotent(self):
+        events = [make_event(i) for i in range(3)]
+        self.db.extend(events[:2])
+        self.db.extend(events[1:])
+        self.assertEqual(self.db.count(), 3)
+
+    def test_legacy_event_type(self):
+        self.db.append({"id": "old", "type": "FALL_DETECTED", "severity": "high", "timestamp": 5.0})
+        self.assertEqual([e["id"] for e in self.db.query(event_types=["FALL_DETECTED"])], ["old"])
+
+    def test_event_chain_links(self):
+        first, second = make_event(0), make_event(1)
+        fall = make_event(2, "POTENTIAL_FALL", chain=[second["id"], first["id"]])
+        self.db.extend([first, second, fall])
+        self.assertEqual([e["id"] for e in self.db.chain(fall["id"])], [second["id"], first["id"]])
+        self.assertEqual([e["id"] for e in self.db.referencing(first["id"])], [fall["id"]])
+        self.assertEqual(self.db.referencing(fall["id"]), [])
+
+
+class TestSqliteBackend(EventStoreTestCase):
+    EVENT_STORE = "sqlite"
+
+    def setUp(self):
+        super().setUp()
+        self.db_path = os.path.join(self.root, "events.db")
+
+    def tearDown(self):
+        shared = sqlite_store._stores.pop(os.path.abspath(self.db_path), None)
+        if shared is not None:
+            shared.close()
+        super().tearDown()
+
+    def test_emit_and_replay_with_pushdown(self):
+        atomic = event_engine.emit_event("RAPID_VERTICAL_MOVEMENT", event_engine.CATEGORY_MOTION, {})
+        composite = event_engine.emit_event(
+            "POTENTIAL_FALL", event_engine.CATEGORY_COMPOSITE, {}, event_chain=[atomic["id"]]
+        )
+        self.assertEqual(event_engine._event_log.path, os.path.abspath(self.db_path))
+
+        self.assertEqual([e["id"] for e in event_replay.load_events()], [atomic["id"], composite["id"]])
+        self.assertEqual([e["id"] for e in event_replay.load_events(event_type="POTENTIAL_FALL")], [composite["id"]])
+        self.assertEqual(event_replay.load_events(start=composite["timestamp"] + 1.0), [])
+        self.assertEqual([e["id"] for e in event_engine._event_log.referencing(atomic["id"])], [composite["id"]])
+
+    def test_snapshot_persisted_to_store(self):
+        engine = AnalysisSnapshotEngine()
+        snapshot = engine.analyze_window([make_event(0)], window_seconds=10.0)
+        self.assertEqual(engine.persist_snapshot(snapshot), os.path.abspath(self.db_path))
+
+        with SqliteEventStore(self.db_path) as db:
+            self.assertEqual([s["snapshot_id"] for s in db.query_snapshots()], [snapshot["snapshot_id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()